@@ -1,15 +1,32 @@
-import { LLMProvider, LLMConfig } from './base';
+import { LLMProvider, LLMConfig, LLMResponse } from './base';
+import { ProviderError } from './errors';
+import { nativeSchema, rejectsNative } from './structured';
+import { SchemaDialect } from '../utils/json-schema';
+import { readSSE } from './sse';
+import { transport } from './transport';
 
 export class AnthropicProvider implements LLMProvider {
     name = 'anthropic';
+    dialects: SchemaDialect[] = ['json'];
 
-    async call(systemPrompt: string, userMessage: string, config?: LLMConfig): Promise<string> {
+    resolveModel(config?: LLMConfig): string {
+        return config?.model || process.env.ANTHROPIC_MODEL || 'claude-3-opus-20240229';
+    }
+
+    baseUrl(): string {
+        return process.env.ANTHROPIC_BASE_URL || 'https://api.anthropic.com/v1';
+    }
+
+    private async request(systemPrompt: string, userMessage: string, config: LLMConfig | undefined, stream: boolean, signal?: AbortSignal, native: boolean = true): Promise<Response> {
         const apiKey = config?.apiKey || process.env.ANTHROPIC_API_KEY;
         if (!apiKey) throw new Error("Missing ANTHROPIC_API_KEY");
-        const model = config?.model || process.env.ANTHROPIC_MODEL || 'claude-3-opus-20240229';
+        const model = this.resolveModel(config);
+        // A single tool whose input is the response object, and a tool_choice forcing the model to call it
+        const output = native ? nativeSchema(this.name, model, config, this.dialects) : undefined;
 
-        const response = await fetch('[https://api.anthropic.com/v1/messages](https://api.anthropic.com/v1/messages)', {
+        const response = await transport.fetch(`${this.baseUrl()}/messages`, {
             method: 'POST',
+            signal,
             headers: {
                 'x-api-key': apiKey,
                 'anthropic-version': '2023-06-01',
@@ -20,16 +37,55 @@ export class AnthropicProvider implements LLMProvider {
                 system: systemPrompt,
                 messages: [{ role: 'user', content: userMessage }],
                 max_tokens: 4096,
-                temperature: config?.temperature || 0.7
+                temperature: config?.temperature || 0.7,
+                ...(output ? {
+                    tools: [{ name: output.name, description: 'Return the response object.', input_schema: output.schema }],
+                    tool_choice: { type: 'tool', name: output.name }
+                } : {}),
+                stream
             })
         });
 
         if (!response.ok) {
-            const err = await response.text();
-            throw new Error(`Anthropic API Error: ${err}`);
+            const error = await ProviderError.fromResponse('Anthropic', response);
+            if (output && rejectsNative(this.name, model, error)) return this.request(systemPrompt, userMessage, config, stream, signal, false);
+            throw error;
         }
+        return response;
+    }
 
+    async call(systemPrompt: string, userMessage: string, config?: LLMConfig, signal?: AbortSignal): Promise<LLMResponse> {
+        const response = await this.request(systemPrompt, userMessage, config, false, signal);
         const data = await response.json();
-        return data.content[0].text;
+        const usage = data.usage && { inputTokens: data.usage.input_tokens ?? 0, outputTokens: data.usage.output_tokens ?? 0 };
+        const tool = data.content.find((block: any) => block.type === 'tool_use');
+        return { text: tool ? JSON.stringify(tool.input) : data.content[0].text, usage };
+    }
+
+    async stream(systemPrompt: string, userMessage: string, config: LLMConfig | undefined, onText: (delta: string) => void, signal?: AbortSignal): Promise<LLMResponse> {
+        const response = await this.request(systemPrompt, userMessage, config, true, signal);
+        let text = '';
+        const usage = { inputTokens: 0, outputTokens: 0 };
+        for await (const event of readSSE(response)) {
+            const data = JSON.parse(event.data);
+            if (data.type === 'error') {
+                const kind = data.error?.type === 'overloaded_error' ? 'overloaded'
+                    : data.error?.type === 'rate_limit_error' ? 'rate_limit'
+                    : data.error?.type === 'api_error' ? 'server' : 'unknown';
+                throw new ProviderError('Anthropic', event.data, kind);
+            }
+            if (data.type === 'message_start') usage.inputTokens = data.message?.usage?.input_tokens ?? 0;
+            if (data.type === 'message_delta') usage.outputTokens = data.usage?.output_tokens ?? usage.outputTokens;
+            if (data.type === 'message_stop') break;
+            // Forced tool calls stream their input as partial JSON, which the field listener reads like text
+            const delta = data.type !== 'content_block_delta' ? undefined
+                : data.delta?.type === 'text_delta' ? data.delta.text
+                : data.delta?.type === 'input_json_delta' ? data.delta.partial_json : undefined;
+            if (delta) {
+                text += delta;
+                onText(delta);
+            }
+        }
+        return { text, usage: usage.inputTokens || usage.outputTokens ? usage : undefined };
     }
-}
\ No newline at end of file
+}
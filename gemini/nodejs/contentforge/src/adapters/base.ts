@@ -1,11 +1,36 @@
+import { OutputSchema } from './structured';
+import { SchemaDialect } from '../utils/json-schema';
+
 export interface LLMConfig {
     provider?: string;
     model?: string;
     apiKey?: string;
     temperature?: number;
+    // Sent through the vendor's structured-output or tool-use mechanism where supported (see structured.ts)
+    output?: OutputSchema;
 }
 
+// Token counts reported by the provider for one call
+export type TokenUsage = {
+    inputTokens: number;
+    outputTokens: number;
+};
+
+export type LLMResponse = {
+    text: string;
+    usage?: TokenUsage;
+};
+
 export interface LLMProvider {
     name: string;
-    call(systemPrompt: string, userMessage: string, config?: LLMConfig): Promise<string>;
+    resolveModel(config?: LLMConfig): string;
+    // API root the adapter sends requests to (overridable with <PROVIDER>_BASE_URL)
+    baseUrl(): string;
+    // Structured-output dialects the adapter can send, most preferred first (see structured.ts)
+    dialects: SchemaDialect[];
+    // Failures are thrown as ProviderError (see errors.ts) so callers can tell retryable ones apart;
+    // aborting `signal` cancels the request (used to drop the losing call of a hedged pair)
+    call(systemPrompt: string, userMessage: string, config?: LLMConfig, signal?: AbortSignal): Promise<LLMResponse>;
+    // Optional server-sent-events variant: reports text deltas as they arrive and resolves with the full text
+    stream?(systemPrompt: string, userMessage: string, config: LLMConfig | undefined, onText: (delta: string) => void, signal?: AbortSignal): Promise<LLMResponse>;
 }
\ No newline at end of file
@@ -0,0 +1,223 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as path from 'path';
+import { canonicalJSON } from '../store/artifacts';
+import { OutputMode } from './structured';
+
+// readwrite: normal caching; off: always call the provider (--no-cache);
+// only: never call the provider, fail on a miss (--cache-only)
+export type CacheMode = 'readwrite' | 'off' | 'only';
+
+export type CacheOptions = {
+    mode: CacheMode;
+    dir: string;
+    maxMemoryEntries: number;
+    maxDiskBytes: number;
+    maxAgeMs: number;
+};
+
+export type CacheStats = {
+    memoryHits: number;
+    diskHits: number;
+    misses: number;
+    coalesced: number;
+    writes: number;
+    evictions: number;
+};
+
+export type CacheKeyParts = {
+    provider: string;
+    model: string;
+    systemPrompt: string;
+    userMessage: string;
+    temperature?: number;
+    // How the response schema was requested; the same prompt in another mode can answer differently
+    output?: OutputMode;
+};
+
+type DiskEntry = { created: number; response: string };
+
+const PRUNE_EVERY_WRITES = 50;
+
+export class CacheMissError extends Error {
+    constructor(key: string) {
+        super(`LLM response cache miss for ${key.slice(0, 12)} in --cache-only mode`);
+        this.name = 'CacheMissError';
+    }
+}
+
+/**
+ * Response cache between the agents and the provider adapters.
+ * A bounded in-memory LRU sits in front of an on-disk store (one JSON file per key)
+ * that is pruned by age and total size; identical in-flight requests share one call.
+ */
+export class ResponseCache {
+    private overrides: Partial<CacheOptions> = {};
+    private resolved?: CacheOptions;
+    private memory = new Map<string, string>();
+    private inflight = new Map<string, Promise<string>>();
+    private writesSincePrune = PRUNE_EVERY_WRITES;
+    readonly stats: CacheStats = { memoryHits: 0, diskHits: 0, misses: 0, coalesced: 0, writes: 0, evictions: 0 };
+
+    static key(parts: CacheKeyParts): string {
+        return crypto.createHash('sha256').update(canonicalJSON(parts)).digest('hex');
+    }
+
+    configure(options: Partial<CacheOptions>) {
+        this.overrides = { ...this.overrides, ...options };
+        this.resolved = undefined;
+    }
+
+    // Resolved lazily so that values loaded by dotenv after import are honoured
+    get options(): CacheOptions {
+        if (!this.resolved) {
+            this.resolved = {
+                mode: 'readwrite',
+                dir: process.env.CONTENTFORGE_CACHE_DIR || path.join(process.cwd(), '.contentforge', 'cache'),
+                maxMemoryEntries: Number(process.env.CONTENTFORGE_CACHE_MEMORY_ENTRIES) || 256,
+                maxDiskBytes: (Number(process.env.CONTENTFORGE_CACHE_MAX_MB) || 512) * 1024 * 1024,
+                maxAgeMs: (Number(process.env.CONTENTFORGE_CACHE_MAX_AGE_DAYS) || 30) * 24 * 60 * 60 * 1000,
+                ...this.overrides,
+            };
+        }
+        return this.resolved;
+    }
+
+    /**
+     * Returns the cached response for `key`, or runs `call` once (even when several
+     * callers ask concurrently). Only responses accepted by `isValid` are stored, under `key`
+     * unless `call` names another one through `storeAs` (e.g. when a different provider answered).
+     */
+    async getOrCall(key: string, call: (storeAs: (key: string) => void) => Promise<string>, isValid: (response: string) => boolean = () => true): Promise<string> {
+        const { mode } = this.options;
+        if (mode === 'off') return call(() => undefined);
+
+        const cached = this.lookup(key);
+        if (cached !== undefined) return cached;
+
+        const pending = this.inflight.get(key);
+        if (pending) {
+            this.stats.coalesced++;
+            return pending;
+        }
+
+        this.stats.misses++;
+        if (mode === 'only') throw new CacheMissError(key);
+
+        let storeKey = key;
+        const promise = call(answered => { storeKey = answered; }).then(response => {
+            if (isValid(response)) this.store(storeKey, response);
+            return response;
+        });
+        this.inflight.set(key, promise);
+        try {
+            return await promise;
+        } finally {
+            this.inflight.delete(key);
+        }
+    }
+
+    private lookup(key: string): string | undefined {
+        const hit = this.memory.get(key);
+        if (hit !== undefined) {
+            // Re-insert to mark as most recently used
+            this.memory.delete(key);
+            this.memory.set(key, hit);
+            this.stats.memoryHits++;
+            return hit;
+        }
+
+        const file = this.fileFor(key);
+        let entry: DiskEntry;
+        try {
+            entry = JSON.parse(fs.readFileSync(file, 'utf-8'));
+        } catch (e) {
+            return undefined;
+        }
+        if (Date.now() - entry.created > this.options.maxAgeMs) {
+            this.remove(file);
+            return undefined;
+        }
+        // Touch so size-based pruning evicts the least recently used files first
+        const now = new Date();
+        try { fs.utimesSync(file, now, now); } catch (e) { /* best effort */ }
+        this.remember(key, entry.response);
+        this.stats.diskHits++;
+        return entry.response;
+    }
+
+    private store(key: string, response: string) {
+        this.remember(key, response);
+        const file = this.fileFor(key);
+        const entry: DiskEntry = { created: Date.now(), response };
+        fs.mkdirSync(path.dirname(file), { recursive: true });
+        const tmp = `${file}.${process.pid}.tmp`;
+        fs.writeFileSync(tmp, JSON.stringify(entry));
+        fs.renameSync(tmp, file);
+        this.stats.writes++;
+
+        if (++this.writesSincePrune >= PRUNE_EVERY_WRITES) {
+            this.writesSincePrune = 0;
+            this.prune();
+        }
+    }
+
+    private remember(key: string, response: string) {
+        this.memory.set(key, response);
+        while (this.memory.size > this.options.maxMemoryEntries) {
+            const oldest = this.memory.keys().next().value as string;
+            this.memory.delete(oldest);
+        }
+    }
+
+    // Drops expired files, then least recently used ones until the store fits in maxDiskBytes.
+    prune() {
+        const { dir, maxAgeMs, maxDiskBytes } = this.options;
+        if (!fs.existsSync(dir)) return;
+        const files: { file: string; size: number; mtime: number }[] = [];
+        for (const shard of fs.readdirSync(dir)) {
+            const shardDir = path.join(dir, shard);
+            if (!fs.statSync(shardDir).isDirectory()) continue;
+            for (const name of fs.readdirSync(shardDir)) {
+                const file = path.join(shardDir, name);
+                const stat = fs.statSync(file);
+                files.push({ file, size: stat.size, mtime: stat.mtimeMs });
+            }
+        }
+
+        const now = Date.now();
+        let total = 0;
+        const live: typeof files = [];
+        for (const f of files) {
+            if (now - f.mtime > maxAgeMs) {
+                this.remove(f.file);
+            } else {
+                live.push(f);
+                total += f.size;
+            }
+        }
+        live.sort((a, b) => a.mtime - b.mtime);
+        for (const f of live) {
+            if (total <= maxDiskBytes) break;
+            this.remove(f.file);
+            total -= f.size;
+        }
+    }
+
+    private remove(file: string) {
+        try {
+            fs.unlinkSync(file);
+            this.stats.evictions++;
+        } catch (e) { /* already gone */ }
+    }
+
+    private fileFor(key: string): string {
+        return path.join(this.options.dir, key.slice(0, 2), `${key}.json`);
+    }
+}
+
+export const responseCache = new ResponseCache();
+
+export function configureCache(options: Partial<CacheOptions>) {
+    responseCache.configure(options);
+}
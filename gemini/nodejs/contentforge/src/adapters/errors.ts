@@ -0,0 +1,78 @@
+export type ProviderErrorKind = 'rate_limit' | 'overloaded' | 'server' | 'timeout' | 'network' | 'auth' | 'bad_request' | 'unknown';
+
+const NETWORK_CODES = new Set(['ECONNRESET', 'ECONNREFUSED', 'ETIMEDOUT', 'EPIPE', 'EAI_AGAIN', 'ENOTFOUND', 'UND_ERR_SOCKET', 'UND_ERR_CONNECT_TIMEOUT']);
+
+// Seconds ("30"), an HTTP date, or a duration like "1m30s" / "250ms" as used by OpenAI's reset headers
+function parseDelay(value: string | null): number | undefined {
+    if (!value) return undefined;
+    if (/^\d+(\.\d+)?$/.test(value.trim())) return Math.ceil(parseFloat(value) * 1000);
+    const duration = value.match(/^(?:(\d+)h)?(?:(\d+)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+)ms)?$/);
+    if (duration && duration[0]) {
+        const [, h = '0', m = '0', s = '0', ms = '0'] = duration;
+        return Math.ceil(((+h * 60 + +m) * 60 + +s) * 1000 + +ms);
+    }
+    const date = Date.parse(value);
+    return Number.isNaN(date) ? undefined : Math.max(0, date - Date.now());
+}
+
+// The server's own hint for when to try again, from the standard and provider-specific headers.
+export function retryDelayFrom(headers: Headers): number | undefined {
+    const ms = headers.get('retry-after-ms');
+    if (ms && /^\d+$/.test(ms)) return parseInt(ms, 10);
+    return parseDelay(headers.get('retry-after'))
+        ?? parseDelay(headers.get('x-ratelimit-reset-requests'))
+        ?? parseDelay(headers.get('x-ratelimit-reset-tokens'))
+        ?? parseDelay(headers.get('anthropic-ratelimit-requests-reset'))
+        ?? parseDelay(headers.get('anthropic-ratelimit-tokens-reset'));
+}
+
+function kindOf(status: number): ProviderErrorKind {
+    if (status === 429) return 'rate_limit';
+    if (status === 529 || status === 503) return 'overloaded';
+    if (status === 408 || status === 504) return 'timeout';
+    if (status >= 500) return 'server';
+    if (status === 401 || status === 403) return 'auth';
+    if (status >= 400) return 'bad_request';
+    return 'unknown';
+}
+
+/**
+ * An error response (or failed stream) from a provider API, classified so callers know
+ * whether retrying can help and how long the server asked them to wait.
+ */
+export class ProviderError extends Error {
+    readonly provider: string;
+    readonly status?: number;
+    readonly kind: ProviderErrorKind;
+    readonly retryAfterMs?: number;
+
+    constructor(provider: string, message: string, kind: ProviderErrorKind, status?: number, retryAfterMs?: number) {
+        super(`${provider} API Error: ${message}`);
+        this.name = 'ProviderError';
+        this.provider = provider;
+        this.kind = kind;
+        this.status = status;
+        this.retryAfterMs = retryAfterMs;
+    }
+
+    // The server is shedding load: slow down, and honour `retryAfterMs` when given
+    get throttled(): boolean {
+        return this.kind === 'rate_limit' || this.kind === 'overloaded';
+    }
+
+    get retryable(): boolean {
+        return this.kind !== 'auth' && this.kind !== 'bad_request' && this.kind !== 'unknown';
+    }
+
+    static async fromResponse(provider: string, response: Response): Promise<ProviderError> {
+        const text = await response.text().catch(() => '');
+        return new ProviderError(provider, text || `HTTP ${response.status}`, kindOf(response.status), response.status, retryDelayFrom(response.headers));
+    }
+}
+
+// Provider errors carry their own classification; of everything else only connection failures are retried.
+export function isRetryable(error: unknown): boolean {
+    if (error instanceof ProviderError) return error.retryable;
+    const code = (error as any)?.code ?? (error as any)?.cause?.code;
+    return NETWORK_CODES.has(code) || (error instanceof TypeError && error.message === 'fetch failed');
+}
@@ -1,17 +1,40 @@
-import { LLMProvider, LLMConfig } from './base';
+import { LLMProvider, LLMConfig, LLMResponse, TokenUsage } from './base';
+import { ProviderError } from './errors';
+import { nativeSchema, rejectsNative } from './structured';
+import { SchemaDialect } from '../utils/json-schema';
+import { readSSE } from './sse';
+import { transport } from './transport';
+
+function usageOf(usage: any): TokenUsage | undefined {
+    return usage ? { inputTokens: usage.promptTokenCount ?? 0, outputTokens: usage.candidatesTokenCount ?? 0 } : undefined;
+}
 
 export class GeminiProvider implements LLMProvider {
     name = 'gemini';
+    dialects: SchemaDialect[] = ['gemini'];
+
+    resolveModel(config?: LLMConfig): string {
+        return config?.model || process.env.GEMINI_MODEL || 'gemini-1.5-pro';
+    }
+
+    baseUrl(): string {
+        return process.env.GEMINI_BASE_URL || 'https://generativelanguage.googleapis.com/v1beta';
+    }
 
-    async call(systemPrompt: string, userMessage: string, config?: LLMConfig): Promise<string> {
+    private async request(systemPrompt: string, userMessage: string, config: LLMConfig | undefined, stream: boolean, signal?: AbortSignal, native: boolean = true): Promise<Response> {
         const apiKey = config?.apiKey || process.env.GOOGLE_API_KEY;
         if (!apiKey) throw new Error("Missing GOOGLE_API_KEY");
-        const model = config?.model || process.env.GEMINI_MODEL || 'gemini-1.5-pro';
+        const model = this.resolveModel(config);
+        // responseSchema takes an OpenAPI subset; schemas with unions stay on plain JSON mode
+        const output = native ? nativeSchema(this.name, model, config, this.dialects) : undefined;
 
-        const url = `https://generativelanguage.googleapis.com/v1beta/models/${model}:generateContent?key=${apiKey}`;
+        const url = stream
+            ? `${this.baseUrl()}/models/${model}:streamGenerateContent?alt=sse&key=${apiKey}`
+            : `${this.baseUrl()}/models/${model}:generateContent?key=${apiKey}`;
 
-        const response = await fetch(url, {
+        const response = await transport.fetch(url, {
             method: 'POST',
+            signal,
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 contents: [{
@@ -19,17 +42,42 @@ export class GeminiProvider implements LLMProvider {
                 }],
                 generationConfig: {
                     temperature: config?.temperature || 0.7,
-                    responseMimeType: "application/json"
+                    responseMimeType: "application/json",
+                    ...(output ? { responseSchema: output.schema } : {})
                 }
             })
         });
 
         if (!response.ok) {
-            const err = await response.text();
-            throw new Error(`Gemini API Error: ${err}`);
+            const error = await ProviderError.fromResponse('Gemini', response);
+            if (output && rejectsNative(this.name, model, error)) return this.request(systemPrompt, userMessage, config, stream, signal, false);
+            throw error;
         }
+        return response;
+    }
 
+    async call(systemPrompt: string, userMessage: string, config?: LLMConfig, signal?: AbortSignal): Promise<LLMResponse> {
+        const response = await this.request(systemPrompt, userMessage, config, false, signal);
         const data = await response.json();
-        return data.candidates[0].content.parts[0].text;
+        return { text: data.candidates[0].content.parts[0].text, usage: usageOf(data.usageMetadata) };
+    }
+
+    async stream(systemPrompt: string, userMessage: string, config: LLMConfig | undefined, onText: (delta: string) => void, signal?: AbortSignal): Promise<LLMResponse> {
+        const response = await this.request(systemPrompt, userMessage, config, true, signal);
+        let text = '';
+        let usage: TokenUsage | undefined;
+        for await (const event of readSSE(response)) {
+            const data = JSON.parse(event.data);
+            // Every chunk carries running totals; the last one wins
+            usage = usageOf(data.usageMetadata) || usage;
+            const parts = data.candidates?.[0]?.content?.parts || [];
+            for (const part of parts) {
+                if (part.text) {
+                    text += part.text;
+                    onText(part.text);
+                }
+            }
+        }
+        return { text, usage };
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,167 @@
+export type HedgePolicy = {
+    // Provider (optionally "provider:model") that receives hedged and failed-over calls
+    fallback: string;
+    // Hedge once a call runs longer than this percentile of the agent's recent latencies;
+    // undefined disables hedging (failover still applies)
+    percentile?: number;
+    // Delay used until enough latencies are recorded, and the floor for the percentile
+    minDelayMs: number;
+};
+
+export type HedgeStats = {
+    hedged: number;
+    // Hedged calls answered first by the fallback
+    won: number;
+    // Calls sent straight to the fallback because the primary provider's circuit was open
+    failedOver: number;
+};
+
+export const hedgeStats: HedgeStats = { hedged: 0, won: 0, failedOver: 0 };
+
+function number(value: string | undefined): number | undefined {
+    const n = Number(value);
+    return value && Number.isFinite(n) ? n : undefined;
+}
+
+/**
+ * Hedging/failover policy for an agent from the environment: CONTENTFORGE_FALLBACK names the
+ * fallback, CONTENTFORGE_HEDGE_PERCENTILE (e.g. 0.95) turns on hedging, and
+ * CONTENTFORGE_HEDGE_AGENTS (comma-separated agent names) limits both to some agents.
+ */
+export function hedgePolicyFor(agent: string): HedgePolicy | undefined {
+    const fallback = process.env.CONTENTFORGE_FALLBACK;
+    if (!fallback) return undefined;
+    const agents = process.env.CONTENTFORGE_HEDGE_AGENTS;
+    if (agents && !agents.split(',').map(a => a.trim()).includes(agent)) return undefined;
+    return {
+        fallback,
+        percentile: number(process.env.CONTENTFORGE_HEDGE_PERCENTILE),
+        minDelayMs: number(process.env.CONTENTFORGE_HEDGE_MIN_DELAY_MS) ?? 2000,
+    };
+}
+
+// Recent call latencies per agent + provider, for the hedge delay.
+class LatencyTracker {
+    private samples = new Map<string, number[]>();
+    private window = 200;
+    private minSamples = 10;
+
+    record(key: string, ms: number) {
+        const list = this.samples.get(key) || [];
+        list.push(ms);
+        if (list.length > this.window) list.shift();
+        this.samples.set(key, list);
+    }
+
+    delay(key: string, policy: HedgePolicy): number {
+        const list = this.samples.get(key);
+        if (!list || list.length < this.minSamples || policy.percentile === undefined) return policy.minDelayMs;
+        const sorted = [...list].sort((a, b) => a - b);
+        const at = sorted[Math.min(sorted.length - 1, Math.ceil(policy.percentile * sorted.length) - 1)];
+        return Math.max(policy.minDelayMs, at);
+    }
+}
+
+export const latencies = new LatencyTracker();
+
+/**
+ * Opens a provider's circuit after `threshold` consecutive failed calls (retries included);
+ * while open, calls with a fallback go straight to it. After `cooldownMs` one call is let
+ * through again and its outcome closes or re-opens the circuit.
+ */
+class CircuitBreaker {
+    private failures = new Map<string, number>();
+    private openUntil = new Map<string, number>();
+    private threshold = Number(process.env.CONTENTFORGE_FAILOVER_THRESHOLD) || 3;
+    private cooldownMs = Number(process.env.CONTENTFORGE_FAILOVER_COOLDOWN_MS) || 30000;
+
+    isOpen(provider: string): boolean {
+        const until = this.openUntil.get(provider);
+        if (until === undefined) return false;
+        if (Date.now() < until) return true;
+        // Half-open: let the next call probe the provider
+        this.openUntil.delete(provider);
+        this.failures.set(provider, this.threshold - 1);
+        return false;
+    }
+
+    success(provider: string) {
+        this.failures.delete(provider);
+    }
+
+    failure(provider: string) {
+        const count = (this.failures.get(provider) || 0) + 1;
+        this.failures.set(provider, count);
+        if (count >= this.threshold) this.openUntil.set(provider, Date.now() + this.cooldownMs);
+    }
+}
+
+export const breaker = new CircuitBreaker();
+
+const isAbort = (error: unknown) => (error as any)?.name === 'AbortError';
+
+/**
+ * Starts `primary`, and `backup` as well if the primary hasn't produced an accepted result
+ * after `delayMs` (or has failed). The first accepted result wins and the other call is
+ * aborted. If neither is accepted, the first fulfilled value is returned (so the caller's
+ * own validation reports it), otherwise the primary's error is thrown.
+ */
+export function hedged<T>(
+    primary: (signal: AbortSignal) => Promise<T>,
+    backup: (signal: AbortSignal) => Promise<T>,
+    delayMs: number,
+    accept: (value: T) => boolean,
+): Promise<{ value: T; winner: 'primary' | 'backup' }> {
+    return new Promise((resolve, reject) => {
+        const controllers = { primary: new AbortController(), backup: new AbortController() };
+        const outcomes: { primary?: PromiseSettledResult<T>; backup?: PromiseSettledResult<T> } = {};
+        let backupStarted = false;
+        let done = false;
+        let timer: NodeJS.Timeout | undefined;
+
+        const finish = () => {
+            if (done || !outcomes.primary || (backupStarted && !outcomes.backup)) return;
+            done = true;
+            const fulfilled = (['primary', 'backup'] as const).find(k => outcomes[k]?.status === 'fulfilled');
+            if (fulfilled) resolve({ value: (outcomes[fulfilled] as PromiseFulfilledResult<T>).value, winner: fulfilled });
+            else reject((outcomes.primary as PromiseRejectedResult).reason);
+        };
+
+        const settle = (who: 'primary' | 'backup', outcome: PromiseSettledResult<T>) => {
+            if (done) return;
+            outcomes[who] = outcome;
+            if (outcome.status === 'fulfilled' && accept(outcome.value)) {
+                done = true;
+                clearTimeout(timer);
+                controllers[who === 'primary' ? 'backup' : 'primary'].abort();
+                resolve({ value: outcome.value, winner: who });
+                return;
+            }
+            // A failed or unusable primary doesn't wait for the hedge delay
+            if (who === 'primary') startBackup();
+            finish();
+        };
+
+        const run = (who: 'primary' | 'backup', call: (signal: AbortSignal) => Promise<T>) => {
+            call(controllers[who].signal).then(
+                value => settle(who, { status: 'fulfilled', value }),
+                reason => {
+                    if (isAbort(reason) && done) return;
+                    settle(who, { status: 'rejected', reason });
+                },
+            );
+        };
+
+        const startBackup = () => {
+            if (backupStarted) return;
+            backupStarted = true;
+            clearTimeout(timer);
+            hedgeStats.hedged++;
+            run('backup', backup);
+        };
+
+        run('primary', primary);
+        // setTimeout can't wait forever: an infinite delay means "only on failure"
+        if (Number.isFinite(delayMs)) timer = setTimeout(startBackup, delayMs);
+    });
+}
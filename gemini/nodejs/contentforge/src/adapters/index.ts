@@ -3,6 +3,7 @@ import { OpenAIProvider } from './openai';
 import { AnthropicProvider } from './anthropic';
 import { GeminiProvider } from './gemini';
 import { XAIProvider } from './xai';
+import { transport } from './transport';
 
 const providers: Record<string, LLMProvider> = {
     openai: new OpenAIProvider(),
@@ -17,4 +18,11 @@ export function getProvider(name: string): LLMProvider {
         throw new Error(`Unknown provider: ${name}`);
     }
     return provider;
+}
+
+// Opens connections to the given providers ahead of their first call (unknown names are left
+// for the call itself to report).
+export function preconnect(names: string[]) {
+    const known = names.filter(name => providers[name.toLowerCase()]);
+    transport.preconnect([...new Set(known.map(name => getProvider(name).baseUrl()))]);
 }
\ No newline at end of file
@@ -0,0 +1,185 @@
+import { ProviderError } from './errors';
+
+export type RateLimitOptions = {
+    // Requests and tokens (input + output) per minute; Infinity disables the bucket
+    rpm: number;
+    tpm: number;
+    // Upper bound for concurrent calls; the adaptive limit moves between 1 and this
+    maxConcurrency: number;
+};
+
+export type RateLimitStats = {
+    calls: number;
+    // Calls that had to wait for a bucket, a concurrency slot or a server retry hint
+    throttled: number;
+    waitedMs: number;
+    rateLimited: number;
+    serverErrors: number;
+};
+
+// Refills continuously up to `capacity`; may go negative when actual usage exceeds the estimate
+class TokenBucket {
+    private capacity: number;
+    private perMs: number;
+    private level: number;
+    private updated = Date.now();
+
+    constructor(capacity: number, perMs: number) {
+        this.capacity = capacity;
+        this.perMs = perMs;
+        this.level = capacity;
+    }
+
+    private refill() {
+        const now = Date.now();
+        this.level = Math.min(this.capacity, this.level + (now - this.updated) * this.perMs);
+        this.updated = now;
+    }
+
+    // Milliseconds until `amount` can be taken (a request larger than the bucket waits for a full one)
+    waitFor(amount: number): number {
+        if (!Number.isFinite(this.capacity)) return 0;
+        this.refill();
+        const needed = Math.min(amount, this.capacity) - this.level;
+        return needed <= 0 ? 0 : Math.ceil(needed / this.perMs);
+    }
+
+    take(amount: number) {
+        if (!Number.isFinite(this.capacity)) return;
+        this.refill();
+        this.level -= amount;
+    }
+
+    refund(amount: number) {
+        if (!Number.isFinite(this.capacity)) return;
+        this.refill();
+        this.level = Math.min(this.capacity, this.level + amount);
+    }
+}
+
+type Waiter = { tokens: number; enqueued: number; start: () => void };
+
+/**
+ * Scheduler for one provider + model: FIFO queue gated by RPM/TPM token buckets, server
+ * retry hints and an AIMD concurrency limit (halved on 429/5xx, grown by ~1 per window of
+ * successful calls). Shared by every agent and run in the process.
+ */
+export class RateLimiter {
+    private requests: TokenBucket;
+    private tokens: TokenBucket;
+    private maxConcurrency: number;
+    private limit: number;
+    private active = 0;
+    private queue: Waiter[] = [];
+    private blockedUntil = 0;
+    private timer?: NodeJS.Timeout;
+    readonly stats: RateLimitStats = { calls: 0, throttled: 0, waitedMs: 0, rateLimited: 0, serverErrors: 0 };
+
+    constructor(options: RateLimitOptions) {
+        this.requests = new TokenBucket(options.rpm, options.rpm / 60000);
+        this.tokens = new TokenBucket(options.tpm, options.tpm / 60000);
+        this.maxConcurrency = options.maxConcurrency;
+        this.limit = options.maxConcurrency;
+    }
+
+    get concurrency(): number {
+        return Math.floor(this.limit);
+    }
+
+    /**
+     * Runs `task` once the limits allow `estimatedTokens` more tokens. `actualTokens` reads
+     * the real usage from the result so the token bucket is corrected afterwards.
+     */
+    async run<T>(estimatedTokens: number, task: () => Promise<T>, actualTokens?: (result: T) => number | undefined): Promise<T> {
+        await this.acquire(estimatedTokens);
+        try {
+            const result = await task();
+            const actual = actualTokens?.(result);
+            if (actual !== undefined) {
+                if (actual > estimatedTokens) this.tokens.take(actual - estimatedTokens);
+                else this.tokens.refund(estimatedTokens - actual);
+            }
+            this.limit = Math.min(this.maxConcurrency, this.limit + 1 / this.limit);
+            return result;
+        } catch (error) {
+            this.onError(error);
+            throw error;
+        } finally {
+            this.active--;
+            this.pump();
+        }
+    }
+
+    private onError(error: unknown) {
+        if (!(error instanceof ProviderError)) return;
+        if (error.kind === 'rate_limit') this.stats.rateLimited++;
+        if (error.kind === 'server' || error.kind === 'overloaded') this.stats.serverErrors++;
+        if (error.throttled || error.kind === 'server') this.limit = Math.max(1, this.limit / 2);
+        if (error.throttled && error.retryAfterMs !== undefined) {
+            // The hint applies to the whole key, not just the call that received it
+            this.blockedUntil = Math.max(this.blockedUntil, Date.now() + error.retryAfterMs);
+        }
+    }
+
+    private acquire(tokens: number): Promise<void> {
+        this.stats.calls++;
+        return new Promise(resolve => {
+            this.queue.push({ tokens, enqueued: Date.now(), start: resolve });
+            this.pump();
+        });
+    }
+
+    // Starts queued calls in order while every limit allows; otherwise waits for a slot or the earliest refill.
+    private pump() {
+        if (this.timer) {
+            clearTimeout(this.timer);
+            this.timer = undefined;
+        }
+        while (this.queue.length > 0) {
+            if (this.active >= this.concurrency) return;
+            const head = this.queue[0];
+            const wait = Math.max(this.blockedUntil - Date.now(), this.requests.waitFor(1), this.tokens.waitFor(head.tokens));
+            if (wait > 0) {
+                this.timer = setTimeout(() => this.pump(), wait);
+                return;
+            }
+            this.queue.shift();
+            this.requests.take(1);
+            this.tokens.take(head.tokens);
+            this.active++;
+            const waited = Date.now() - head.enqueued;
+            if (waited > 0) {
+                this.stats.throttled++;
+                this.stats.waitedMs += waited;
+            }
+            head.start();
+        }
+    }
+}
+
+function limit(value: string | undefined, fallback: number): number {
+    const n = Number(value);
+    return value && Number.isFinite(n) && n > 0 ? n : fallback;
+}
+
+const limiters = new Map<string, RateLimiter>();
+
+// The shared limiter for a provider + model, configured from <PROVIDER>_RPM / _TPM / _MAX_CONCURRENCY.
+export function rateLimiterFor(provider: string, model: string): RateLimiter {
+    const key = `${provider}:${model}`;
+    let limiter = limiters.get(key);
+    if (!limiter) {
+        const prefix = provider.toUpperCase();
+        limiter = new RateLimiter({
+            rpm: limit(process.env[`${prefix}_RPM`], Infinity),
+            tpm: limit(process.env[`${prefix}_TPM`], Infinity),
+            maxConcurrency: limit(process.env[`${prefix}_MAX_CONCURRENCY`], 16),
+        });
+        limiters.set(key, limiter);
+    }
+    return limiter;
+}
+
+export function getRateLimitStats(): Record<string, RateLimitStats & { concurrency: number }> {
+    return Object.fromEntries([...limiters].map(([key, l]) => [key, { ...l.stats, concurrency: l.concurrency }]));
+}
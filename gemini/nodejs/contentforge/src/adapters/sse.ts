@@ -0,0 +1,54 @@
+export type SSEEvent = { event?: string; data: string };
+
+/**
+ * Reads a text/event-stream response body and yields one entry per event.
+ * Multi-line `data:` fields are joined with newlines, comments and ids are ignored.
+ */
+export async function* readSSE(response: Response): AsyncGenerator<SSEEvent> {
+    if (!response.body) throw new Error('Streaming response has no body');
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let event: string | undefined;
+    let data: string[] = [];
+    let finished = false;
+
+    const flush = (): SSEEvent | undefined => {
+        const out = data.length ? { event, data: data.join('\n') } : undefined;
+        event = undefined;
+        data = [];
+        return out;
+    };
+
+    try {
+        while (true) {
+            const { value, done } = await reader.read();
+            buffer += done ? decoder.decode() : decoder.decode(value, { stream: true });
+
+            let newline: number;
+            while ((newline = buffer.search(/\r?\n/)) !== -1) {
+                const line = buffer.slice(0, newline);
+                buffer = buffer.slice(newline + (buffer[newline] === '\r' ? 2 : 1));
+                if (line === '') {
+                    const ev = flush();
+                    if (ev) yield ev;
+                } else if (line.startsWith('data:')) {
+                    data.push(line.slice(5).replace(/^ /, ''));
+                } else if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                }
+            }
+            if (done) {
+                finished = true;
+                break;
+            }
+        }
+        if (buffer.startsWith('data:')) data.push(buffer.slice(5).replace(/^ /, ''));
+        const last = flush();
+        if (last) yield last;
+    } finally {
+        // Abandoned early (consumer stopped or threw): close the connection
+        if (!finished) await reader.cancel().catch(() => undefined);
+        reader.releaseLock();
+    }
+}
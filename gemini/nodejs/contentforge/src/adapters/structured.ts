@@ -0,0 +1,122 @@
+import * as crypto from 'crypto';
+import { ZodTypeAny } from 'zod';
+import { LLMConfig } from './base';
+import { ProviderError } from './errors';
+import { JsonSchema, SchemaDialect, toJsonSchema } from '../utils/json-schema';
+
+// The schema an agent's response must follow (LLMConfig.output)
+export type OutputSchema = {
+    name: string;
+    schema: ZodTypeAny;
+};
+
+// An OutputSchema converted for one vendor's structured-output or tool-use mechanism
+export type NativeSchema = {
+    name: string;
+    schema: JsonSchema;
+    dialect: SchemaDialect;
+};
+
+// How a response to an OutputSchema is requested, as part of response cache keys: the schema's
+// name, the dialect it is sent in ('plain' for the adapter's JSON mode) and a hash of its JSON Schema
+export type OutputMode = {
+    name: string;
+    dialect: SchemaDialect | 'plain';
+    schema?: string;
+};
+
+export type StructuredStats = {
+    requests: number;
+    // provider:model pairs that rejected a schema and were switched to plain JSON mode
+    fallbacks: string[];
+};
+
+// Models that predate native structured output; asking them would only cost a rejected request
+const KNOWN_UNSUPPORTED: Record<string, RegExp> = {
+    openai: /^(gpt-3\.5|gpt-4-turbo|gpt-4-\d{4}|gpt-4$)/,
+    xai: /^grok-beta$/,
+    anthropic: /^claude-(instant|2)/,
+    gemini: /^gemini-(1\.0|pro$)/,
+};
+
+const unsupported = new Set<string>();
+const stats: StructuredStats = { requests: 0, fallbacks: [] };
+const fingerprints = new WeakMap<JsonSchema, string>();
+const sendable = new WeakMap<JsonSchema, JsonSchema>();
+
+// Artifact links (`*_ref` fields) are set by the orchestrator, never by the model, and strict mode
+// would make them required, so they are left out of the schema sent
+function withoutRefs(schema: JsonSchema): JsonSchema {
+    let result = sendable.get(schema);
+    if (result) return result;
+    result = { ...schema };
+    if (schema.properties) {
+        const properties = Object.entries(schema.properties as Record<string, JsonSchema>).filter(([key]) => !key.endsWith('_ref'));
+        result.properties = Object.fromEntries(properties.map(([key, value]) => [key, withoutRefs(value)]));
+        if (Array.isArray(schema.required)) result.required = schema.required.filter(key => !key.endsWith('_ref'));
+    }
+    if (schema.items) result.items = withoutRefs(schema.items as JsonSchema);
+    if (Array.isArray(schema.anyOf)) result.anyOf = schema.anyOf.map(option => withoutRefs(option));
+    sendable.set(schema, result);
+    return result;
+}
+
+function select(provider: string, model: string, config: LLMConfig | undefined, dialects: SchemaDialect[]): NativeSchema | undefined {
+    if (!config?.output || process.env.CONTENTFORGE_STRUCTURED_OUTPUT === 'off') return undefined;
+    if (unsupported.has(`${provider}:${model}`) || KNOWN_UNSUPPORTED[provider]?.test(model)) return undefined;
+    for (const dialect of dialects) {
+        const schema = toJsonSchema(config.output.schema, dialect);
+        if (schema) {
+            // Tool and schema names are limited to [a-zA-Z0-9_-]{1,64}
+            const name = config.output.name.replace(/[^a-zA-Z0-9_-]/g, '_').slice(0, 64);
+            return { name, schema: withoutRefs(schema), dialect };
+        }
+    }
+    return undefined;
+}
+
+function fingerprint(schema: JsonSchema): string {
+    let hash = fingerprints.get(schema);
+    if (!hash) fingerprints.set(schema, hash = crypto.createHash('sha256').update(JSON.stringify(schema)).digest('hex'));
+    return hash;
+}
+
+/**
+ * The schema to send natively for this request, in the first of `dialects` it converts to, or
+ * undefined to use the adapter's plain JSON mode: structured output is off
+ * (CONTENTFORGE_STRUCTURED_OUTPUT=off), the model doesn't support it, or the schema can't be
+ * expressed in the vendor's subset.
+ */
+export function nativeSchema(provider: string, model: string, config: LLMConfig | undefined, dialects: SchemaDialect[]): NativeSchema | undefined {
+    const native = select(provider, model, config, dialects);
+    if (native) stats.requests++;
+    return native;
+}
+
+// What nativeSchema would choose for this request, without counting it; undefined without an output schema
+export function outputMode(provider: string, model: string, config: LLMConfig | undefined, dialects: SchemaDialect[]): OutputMode | undefined {
+    if (!config?.output) return undefined;
+    const native = select(provider, model, config, dialects);
+    if (native) return { name: native.name, dialect: native.dialect, schema: fingerprint(native.schema) };
+    // Plain JSON mode still validates against the schema
+    const schema = toJsonSchema(config.output.schema);
+    return { name: config.output.name, dialect: 'plain', schema: schema && fingerprint(schema) };
+}
+
+/**
+ * Whether `error` is the model refusing the schema or tool parameters. If so the model is
+ * remembered as unsupported for the rest of the process and the caller resends in plain JSON mode.
+ */
+export function rejectsNative(provider: string, model: string, error: ProviderError): boolean {
+    if (error.kind !== 'bad_request' || !/response_format|json_schema|schema|tool/i.test(error.message)) return false;
+    const key = `${provider}:${model}`;
+    if (!unsupported.has(key)) {
+        unsupported.add(key);
+        stats.fallbacks.push(key);
+    }
+    return true;
+}
+
+export function getStructuredStats(): StructuredStats {
+    return { requests: stats.requests, fallbacks: [...stats.fallbacks] };
+}
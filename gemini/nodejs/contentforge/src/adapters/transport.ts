@@ -0,0 +1,142 @@
+import * as http from 'http';
+import * as https from 'https';
+import { Readable } from 'stream';
+
+export type TransportOptions = {
+    // Concurrent connections per provider origin; further requests queue on the agent
+    maxSockets: number;
+    // Idle connections kept open per origin for reuse
+    maxFreeSockets: number;
+};
+
+export type TransportStats = {
+    requests: number;
+    // Requests sent on an already-open connection
+    reused: number;
+    // Connections opened (including preconnects) and the time spent on TCP + TLS setup
+    connections: number;
+    handshakeMs: number;
+    preconnects: number;
+};
+
+export type TransportRequest = {
+    method?: string;
+    headers?: Record<string, string>;
+    body?: string;
+    signal?: AbortSignal;
+};
+
+/**
+ * HTTP transport shared by every provider adapter: one keep-alive agent per origin, so batch
+ * runs reuse connections instead of paying a TLS handshake per call. Node's agents queue
+ * rather than pipeline requests, so `maxSockets` is the only concurrency knob.
+ */
+export class ProviderTransport {
+    private agents = new Map<string, http.Agent>();
+    private _options?: TransportOptions;
+    readonly stats: TransportStats = { requests: 0, reused: 0, connections: 0, handshakeMs: 0, preconnects: 0 };
+
+    private get options(): TransportOptions {
+        if (!this._options) {
+            this._options = {
+                maxSockets: Number(process.env.CONTENTFORGE_MAX_SOCKETS) || 16,
+                maxFreeSockets: Number(process.env.CONTENTFORGE_MAX_FREE_SOCKETS) || 8,
+            };
+        }
+        return this._options;
+    }
+
+    configure(options: Partial<TransportOptions>) {
+        this._options = { ...this.options, ...options };
+        for (const agent of this.agents.values()) agent.destroy();
+        this.agents.clear();
+    }
+
+    private agentFor(url: URL): http.Agent {
+        let agent = this.agents.get(url.origin);
+        if (!agent) {
+            const { maxSockets, maxFreeSockets } = this.options;
+            const Agent = url.protocol === 'https:' ? https.Agent : http.Agent;
+            agent = new Agent({ keepAlive: true, maxSockets, maxFreeSockets, scheduling: 'lifo' });
+            this.agents.set(url.origin, agent);
+        }
+        return agent;
+    }
+
+    // fetch()-compatible subset used by the adapters; the body streams, so SSE works unchanged
+    async fetch(url: string, init: TransportRequest = {}): Promise<Response> {
+        const target = new URL(url);
+        try {
+            return await this.send(target, init, true);
+        } catch (error: any) {
+            // A kept-alive connection the server already closed: retry once on a fresh one
+            if (error?.reusedSocket && error.code === 'ECONNRESET' && !init.signal?.aborted) {
+                return this.send(target, init, true);
+            }
+            throw error;
+        }
+    }
+
+    private send(target: URL, init: TransportRequest, counted: boolean): Promise<Response> {
+        const lib = target.protocol === 'https:' ? https : http;
+        return new Promise((resolve, reject) => {
+            const req = lib.request(target, {
+                method: init.method || 'GET',
+                headers: init.body !== undefined
+                    ? { ...init.headers, 'content-length': String(Buffer.byteLength(init.body)) }
+                    : init.headers,
+                agent: this.agentFor(target),
+                signal: init.signal,
+            }, res => {
+                const headers = new Headers();
+                for (let i = 0; i < res.rawHeaders.length; i += 2) headers.append(res.rawHeaders[i], res.rawHeaders[i + 1]);
+                const empty = res.statusCode === 204 || res.statusCode === 304 || init.method === 'HEAD';
+                if (empty) res.resume();
+                resolve(new Response(empty ? null : Readable.toWeb(res) as ReadableStream, {
+                    status: res.statusCode,
+                    statusText: res.statusMessage,
+                    headers,
+                }));
+            });
+            req.on('socket', socket => {
+                if (counted) this.stats.requests++;
+                if (req.reusedSocket) {
+                    if (counted) this.stats.reused++;
+                    return;
+                }
+                this.stats.connections++;
+                const start = Date.now();
+                socket.once(target.protocol === 'https:' ? 'secureConnect' : 'connect', () => {
+                    this.stats.handshakeMs += Date.now() - start;
+                });
+            });
+            req.on('error', error => {
+                (error as any).reusedSocket = req.reusedSocket;
+                reject(error);
+            });
+            req.end(init.body);
+        });
+    }
+
+    /**
+     * Opens a connection to each origin in the background (a HEAD request whose connection
+     * stays in the pool), so the first real call skips DNS, TCP and TLS setup. Origins that
+     * already have a connection are skipped; failures are ignored.
+     */
+    preconnect(urls: string[]) {
+        for (const url of urls) {
+            const target = new URL(url);
+            const agent = this.agentFor(target);
+            const open = Object.keys(agent.sockets).length + Object.keys(agent.freeSockets).length;
+            if (open > 0) continue;
+            this.stats.preconnects++;
+            this.send(new URL('/', target.origin), { method: 'HEAD' }, false).catch(() => undefined);
+        }
+    }
+}
+
+export const transport = new ProviderTransport();
+
+export function configureTransport(options: Partial<TransportOptions>) {
+    transport.configure(options);
+}
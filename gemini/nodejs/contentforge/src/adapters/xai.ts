@@ -1,16 +1,36 @@
-import { LLMProvider, LLMConfig } from './base';
+import { LLMProvider, LLMConfig, LLMResponse, TokenUsage } from './base';
+import { ProviderError } from './errors';
+import { nativeSchema, rejectsNative } from './structured';
+import { SchemaDialect } from '../utils/json-schema';
+import { readSSE } from './sse';
+import { transport } from './transport';
+
+function usageOf(usage: any): TokenUsage | undefined {
+    return usage ? { inputTokens: usage.prompt_tokens ?? 0, outputTokens: usage.completion_tokens ?? 0 } : undefined;
+}
 
 export class XAIProvider implements LLMProvider {
     name = 'xai';
+    dialects: SchemaDialect[] = ['strict', 'json'];
+
+    resolveModel(config?: LLMConfig): string {
+        return config?.model || process.env.XAI_MODEL || 'grok-2-1212';
+    }
+
+    baseUrl(): string {
+        return process.env.XAI_BASE_URL || 'https://api.x.ai/v1';
+    }
 
-    async call(systemPrompt: string, userMessage: string, config?: LLMConfig): Promise<string> {
+    private async request(systemPrompt: string, userMessage: string, config: LLMConfig | undefined, stream: boolean, signal?: AbortSignal, native: boolean = true): Promise<Response> {
         const apiKey = config?.apiKey || process.env.XAI_API_KEY;
         if (!apiKey) throw new Error("Missing XAI_API_KEY");
-        // Use grok-beta or grok-2 as default
-        const model = config?.model || process.env.XAI_MODEL || 'grok-beta';
+        const model = this.resolveModel(config);
+        // JSON Schema structured outputs; strict unless the schema falls outside the strict subset
+        const output = native ? nativeSchema(this.name, model, config, this.dialects) : undefined;
 
-        const response = await fetch('[https://api.x.ai/v1/chat/completions](https://api.x.ai/v1/chat/completions)', {
+        const response = await transport.fetch(`${this.baseUrl()}/chat/completions`, {
             method: 'POST',
+            signal,
             headers: {
                 'Content-Type': 'application/json',
                 'Authorization': `Bearer ${apiKey}`
@@ -22,16 +42,43 @@ export class XAIProvider implements LLMProvider {
                     { role: 'user', content: userMessage }
                 ],
                 temperature: config?.temperature || 0.7,
-                stream: false
+                ...(output
+                    ? { response_format: { type: 'json_schema', json_schema: { name: output.name, schema: output.schema, strict: output.dialect === 'strict' } } }
+                    : {}),
+                stream,
+                // Adds a final chunk carrying token usage to streamed responses
+                ...(stream ? { stream_options: { include_usage: true } } : {})
             })
         });
 
         if (!response.ok) {
-            const err = await response.text();
-            throw new Error(`xAI API Error: ${err}`);
+            const error = await ProviderError.fromResponse('xAI', response);
+            if (output && rejectsNative(this.name, model, error)) return this.request(systemPrompt, userMessage, config, stream, signal, false);
+            throw error;
         }
+        return response;
+    }
 
+    async call(systemPrompt: string, userMessage: string, config?: LLMConfig, signal?: AbortSignal): Promise<LLMResponse> {
+        const response = await this.request(systemPrompt, userMessage, config, false, signal);
         const data = await response.json();
-        return data.choices[0].message.content;
+        return { text: data.choices[0].message.content, usage: usageOf(data.usage) };
+    }
+
+    async stream(systemPrompt: string, userMessage: string, config: LLMConfig | undefined, onText: (delta: string) => void, signal?: AbortSignal): Promise<LLMResponse> {
+        const response = await this.request(systemPrompt, userMessage, config, true, signal);
+        let text = '';
+        let usage: TokenUsage | undefined;
+        for await (const event of readSSE(response)) {
+            if (event.data === '[DONE]') break;
+            const data = JSON.parse(event.data);
+            usage = usageOf(data.usage) || usage;
+            const delta = data.choices?.[0]?.delta?.content;
+            if (delta) {
+                text += delta;
+                onText(delta);
+            }
+        }
+        return { text, usage };
     }
-}
\ No newline at end of file
+}
@@ -1,56 +1,413 @@
 import * as fs from 'fs';
 import * as path from 'path';
-import { ZodSchema } from 'zod';
+import { AsyncLocalStorage } from 'async_hooks';
+import { ZodSchema, ZodTypeAny } from 'zod';
 import { getProvider } from '../adapters';
-import { LLMConfig } from '../adapters/base';
+import { LLMConfig, LLMProvider } from '../adapters/base';
+import { ResponseCache, responseCache } from '../adapters/cache';
+import { ProviderError, isRetryable } from '../adapters/errors';
+import { outputMode } from '../adapters/structured';
+import { rateLimiterFor } from '../adapters/ratelimit';
+import { HedgePolicy, breaker, hedgePolicyFor, hedged, hedgeStats, latencies } from '../adapters/hedge';
+import { CascadePolicy, EscalationReason, cascadeFor, recordCascade, tierConfig } from './cascade';
+import { Projection, estimateTokens, isMeasuringProjections, project, recordProjection } from './projection';
+import { FieldListener, JsonFieldStream } from './json-stream';
+import { createLimiter } from '../utils/limit';
+import { MetricLabels, metrics } from '../metrics';
+import { trace, tracer } from '../metrics/trace';
+import { JsonRepairError, decodeJson, recordDecode, recordRecall, setPath } from './repair';
+import { JsonFixSchema } from '../types';
+
+// Output tokens reserved against a provider's TPM budget before the real usage is known
+const OUTPUT_TOKEN_ESTIMATE = 1500;
+
+export type CallTiming = {
+    // Time to first streamed token (for non-streamed or cached calls, time to the full response)
+    ttftMs?: number;
+    totalMs?: number;
+};
+
+type Route = { provider: LLMProvider; config: LLMConfig };
+
+export type CallOptions = {
+    // Prompt file to use instead of the agent's own (e.g. for sub-tasks)
+    promptFile?: string;
+    // Schema a response must satisfy to be cached; defaults to `outputSchema`
+    schema?: ZodSchema<unknown>;
+    // Overrides `onField` for this call; null disables field streaming
+    listener?: FieldListener | null;
+    // false: don't ask the model to correct a response that fails `schema` even after local repair
+    repair?: boolean;
+    // Provider and model for this call, instead of `modelConfig` and the agent's cascade
+    model?: LLMConfig;
+};
+
+// Longest string value shown to the model for context when it corrects a response
+const FIX_CONTEXT_CHARS = 200;
+
+// Cancels the LLM calls made within `cancellable`
+const callSignal = new AsyncLocalStorage<AbortSignal>();
+
+/** Runs `fn` with every LLM call it makes (including ones still in flight) aborted once `signal` is. */
+export function cancellable<T>(signal: AbortSignal, fn: () => T): T {
+    return callSignal.run(signal, fn);
+}
 
 export abstract class BaseAgent<TInput, TOutput> {
     abstract name: string;
     abstract modelConfig: LLMConfig;
     abstract outputSchema: ZodSchema<TOutput>;
+    abstract inputProjection: Projection;
 
     protected promptPath: string;
+    protected promptDir: string;
+
+    // Set by the orchestrator to observe top-level output fields while a response streams in
+    onField?: FieldListener;
+    // Timing of the most recent LLM call
+    timing: CallTiming = {};
+    // Second provider for slow (hedged) and failing (failed-over) calls; defaults to the
+    // CONTENTFORGE_FALLBACK settings (see adapters/hedge.ts)
+    hedge?: HedgePolicy;
+    // Cheaper models to try first; defaults to the agent's entry in the config file or the
+    // CONTENTFORGE_CASCADE settings (see cascade.ts)
+    cascade?: CascadePolicy;
 
     constructor(promptFileName: string) {
-        this.promptPath = path.join(__dirname, '../../src/prompts', promptFileName);
+        this.promptDir = path.join(__dirname, '../../src/prompts');
+        this.promptPath = path.join(this.promptDir, promptFileName);
     }
 
-    protected loadPrompt(): string {
+    protected loadPrompt(promptFile?: string): string {
+        const promptPath = promptFile ? path.join(this.promptDir, promptFile) : this.promptPath;
         try {
-            return fs.readFileSync(this.promptPath, 'utf-8');
+            return trace('read prompt', 'io', () => fs.readFileSync(promptPath, 'utf-8'), { file: path.basename(promptPath) });
         } catch (e) {
-            throw new Error(`Could not load prompt file: ${this.promptPath}`);
+            throw new Error(`Could not load prompt file: ${promptPath}`);
         }
     }
 
-    protected async callLLM(userMessage: string): Promise<string> {
-        const systemPrompt = this.loadPrompt();
-        const providerName = this.modelConfig.provider || process.env.DEFAULT_PROVIDER || 'openai';
-        const provider = getProvider(providerName);
-        
-        // Exponential backoff retry logic
-        let retries = 0;
-        const maxRetries = 3;
-        
-        while (retries <= maxRetries) {
+    // Serializes only the fields declared in `inputProjection`; records the size saved when stats or a trace report it.
+    protected serializeInput(input: unknown, projection: Projection = this.inputProjection): string {
+        const projected = trace('serialize input', 'cpu', () => JSON.stringify(project(input, projection)));
+        if (isMeasuringProjections() || tracer.enabled) {
+            const full = trace('measure full input', 'cpu', () => JSON.stringify(input).length);
+            recordProjection(this.name, full, projected.length);
+        }
+        return projected;
+    }
+
+    protected async callLLM(userMessage: string, options: CallOptions = {}): Promise<string> {
+        const { text, timing } = await this.callLLMTimed(userMessage, options);
+        this.timing = timing;
+        return text;
+    }
+
+    // Like callLLM, but returns the timing alongside the text instead of storing it,
+    // so that concurrent calls from one agent don't overwrite each other's timings.
+    protected callLLMTimed(userMessage: string, options: CallOptions = {}): Promise<{ text: string; timing: CallTiming }> {
+        return trace(`${this.name} call`, 'llm', () => this.cascaded(userMessage, options), {
+            prompt: options.promptFile || path.basename(this.promptPath),
+            message_chars: userMessage.length,
+        });
+    }
+
+    /**
+     * Sends the call up the agent's model cascade: each tier but the last answers unless its
+     * response fails the schema (without asking the model to correct it), the call fails, or
+     * `escalation` finds the answer too close to call; the last tier is a normal call.
+     */
+    private async cascaded(userMessage: string, options: CallOptions): Promise<{ text: string; timing: CallTiming }> {
+        const policy = options.model ? undefined : this.cascade ?? cascadeFor(this.name);
+        if (!policy) return this.request(userMessage, options);
+        const schema = options.schema || this.outputSchema;
+        const listener = options.listener === undefined ? this.onField : options.listener;
+        const start = Date.now();
+        const reasons: EscalationReason[] = [];
+        const last = policy.tiers.length - 1;
+        for (let tier = 0; ; tier++) {
+            const final = tier === last;
+            const tierStart = Date.now();
+            let reason: EscalationReason = 'error';
             try {
-                return await provider.call(systemPrompt, userMessage, this.modelConfig);
+                const { text, timing } = await trace(`tier ${tier + 1}`, 'llm', () => this.request(userMessage, {
+                    ...options,
+                    model: tierConfig(policy.tiers[tier]),
+                    repair: final ? options.repair : false,
+                }), { model: policy.tiers[tier] });
+                const objection = final ? undefined : this.isParseable(text, schema) ? this.escalation(text, policy) : 'invalid';
+                if (!objection) {
+                    recordCascade(this.name, tier, reasons);
+                    const ttftMs = timing.ttftMs === undefined ? undefined : tierStart - start + timing.ttftMs;
+                    return { text, timing: { ttftMs, totalMs: Date.now() - start } };
+                }
+                reason = objection;
             } catch (error) {
-                retries++;
-                if (retries > maxRetries) throw error;
-                await new Promise(res => setTimeout(res, Math.pow(2, retries) * 1000));
+                if (final || callSignal.getStore()?.aborted) throw error;
+            }
+            reasons.push(reason);
+            // The next tier streams its answer from scratch
+            listener?.onReset?.();
+        }
+    }
+
+    /**
+     * Why an answer from a cheaper cascade tier isn't good enough to keep, if it isn't; called
+     * only for responses that satisfy the schema. `policy.margin` sets how close is too close.
+     */
+    protected escalation(response: string, policy: CascadePolicy): EscalationReason | undefined {
+        return undefined;
+    }
+
+    private async request(userMessage: string, options: CallOptions): Promise<{ text: string; timing: CallTiming }> {
+        const systemPrompt = this.loadPrompt(options.promptFile);
+        const schema = options.schema || this.outputSchema;
+        const listener = options.listener === undefined ? this.onField : options.listener;
+        const cancel = callSignal.getStore();
+        cancel?.throwIfAborted();
+        const modelConfig: LLMConfig = { ...this.modelConfig, ...options.model };
+        const providerName = modelConfig.provider || process.env.DEFAULT_PROVIDER || 'openai';
+        const provider = getProvider(providerName);
+        const model = provider.resolveModel(modelConfig);
+        // Adapters enforce the schema natively where the model supports it; decode() still validates
+        const config: LLMConfig = { ...modelConfig, output: { name: this.name, schema } };
+        // Keyed on the provider, model and structured-output mode that answer the request
+        const keyFor = (route: Route) => trace('cache key', 'cpu', () => {
+            const routeModel = route.provider.resolveModel(route.config);
+            return ResponseCache.key({
+                provider: route.provider.name,
+                model: routeModel,
+                systemPrompt,
+                userMessage,
+                temperature: route.config.temperature,
+                output: outputMode(route.provider.name, routeModel, route.config, route.provider.dialects),
+            });
+        });
+        const primary: Route = { provider, config };
+
+        const streaming = !!provider.stream && process.env.CONTENTFORGE_STREAM !== 'false';
+        const fields = listener ? new JsonFieldStream(listener) : undefined;
+        const start = Date.now();
+        let ttftMs: number | undefined;
+        const onText = (delta: string) => {
+            if (ttftMs === undefined) {
+                ttftMs = Date.now() - start;
+                tracer.instant('first token');
+            }
+            fields?.write(delta);
+        };
+
+        // One provider + model, with its own rate limiter and retries; `stream` sends text deltas to the listener
+        const attempt = (route: Route, signal?: AbortSignal, stream: boolean = streaming): Promise<string> =>
+            trace(`${route.provider.name} attempt`, 'llm', () => attemptRoute(route, cancel && signal ? AbortSignal.any([cancel, signal]) : cancel || signal, stream),
+                { model: route.provider.resolveModel(route.config), stream });
+        const attemptRoute = async (route: Route, signal: AbortSignal | undefined, stream: boolean): Promise<string> => {
+            const labels: MetricLabels = { agent: this.name, provider: route.provider.name, model: route.provider.resolveModel(route.config) };
+            const limiter = rateLimiterFor(labels.provider, labels.model);
+            // Reserve the prompt plus a typical response; corrected from the reported usage afterwards
+            const estimate = estimateTokens(systemPrompt.length + userMessage.length) + OUTPUT_TOKEN_ESTIMATE;
+            let retries = 0;
+            const maxRetries = 3;
+            const started = Date.now();
+            let firstTokenMs: number | undefined;
+            const onAttemptText = (delta: string) => {
+                if (firstTokenMs === undefined) firstTokenMs = Date.now() - started;
+                onText(delta);
+            };
+
+            while (true) {
+                try {
+                    if (stream) fields?.reset();
+                    firstTokenMs = undefined;
+                    const result = await trace(`try ${retries + 1}`, 'net', () => {
+                        const queued = tracer.now();
+                        return limiter.run(estimate, () => {
+                            tracer.complete('rate limit queue', 'wait', queued);
+                            return trace(stream ? 'stream response' : 'request', 'net', () => stream && route.provider.stream
+                                ? route.provider.stream(systemPrompt, userMessage, route.config, onAttemptText, signal)
+                                : route.provider.call(systemPrompt, userMessage, route.config, signal));
+                        }, result => result.usage && result.usage.inputTokens + result.usage.outputTokens);
+                    });
+                    const ms = Date.now() - started;
+                    metrics.recordCall({
+                        ...labels, outcome: 'ok', ms, ttftMs: firstTokenMs ?? ms, retries,
+                        inputTokens: result.usage?.inputTokens, outputTokens: result.usage?.outputTokens,
+                    });
+                    return result.text;
+                } catch (error) {
+                    // Bad requests, auth failures and bugs fail fast; only transient errors are retried
+                    if (signal?.aborted || !isRetryable(error) || retries >= maxRetries) {
+                        metrics.recordCall({
+                            ...labels, outcome: signal?.aborted ? 'cancelled' : 'error', ms: Date.now() - started, retries,
+                            error: error instanceof ProviderError ? error.kind : (error as Error)?.name,
+                        });
+                        throw error;
+                    }
+                    retries++;
+                    // A server hint is enforced by the limiter for every caller; otherwise back off with full jitter
+                    const hinted = error instanceof ProviderError && error.throttled && error.retryAfterMs !== undefined;
+                    if (!hinted) await trace('backoff', 'wait', () => new Promise(res => setTimeout(res, Math.random() * Math.pow(2, retries) * 1000)));
+                }
             }
+        };
+
+        // The response and the route that gave it
+        const callProviders = async (): Promise<{ text: string; route: Route }> => {
+            const policy = this.hedge ?? hedgePolicyFor(this.name);
+            if (!policy) return { text: await attempt(primary), route: primary };
+
+            const [fallbackName, fallbackModel] = policy.fallback.split(':');
+            const backup: Route = {
+                provider: getProvider(fallbackName),
+                config: { ...config, provider: fallbackName, model: fallbackModel },
+            };
+            if (breaker.isOpen(provider.name)) {
+                hedgeStats.failedOver++;
+                return { text: await attempt(backup), route: backup };
+            }
+
+            const latencyKey = `${this.name}:${provider.name}:${model}`;
+            const tracked = async (signal: AbortSignal) => {
+                const started = Date.now();
+                try {
+                    const text = await attempt(primary, signal);
+                    breaker.success(provider.name);
+                    latencies.record(latencyKey, Date.now() - started);
+                    return text;
+                } catch (error) {
+                    if (!signal.aborted && !cancel?.aborted) breaker.failure(provider.name);
+                    throw error;
+                }
+            };
+            // Without a percentile the backup only steps in when the primary fails
+            const delay = policy.percentile === undefined ? Infinity : latencies.delay(latencyKey, policy);
+            const { value, winner } = await hedged(tracked, signal => attempt(backup, signal, false), delay,
+                text => this.isParseable(text, schema));
+            if (winner === 'backup') {
+                hedgeStats.won++;
+                // Replace whatever the primary had streamed with the winning text
+                if (ttftMs !== undefined) {
+                    fields?.reset();
+                    fields?.write(value);
+                }
+            }
+            return { text: value, route: winner === 'backup' ? backup : primary };
+        };
+
+        let called = false;
+        const response = await responseCache.getOrCall(keyFor(primary), async storeAs => {
+            called = true;
+            const { text, route } = await callProviders();
+            // After the call, so a model that just rejected its schema is keyed in plain mode
+            storeAs(keyFor(route));
+            if (options.repair === false) return text;
+            const corrected = await this.correct(text, schema, modelConfig);
+            // Listeners saw the uncorrected text
+            if (corrected !== text && ttftMs !== undefined) {
+                fields?.reset();
+                fields?.write(corrected);
+            }
+            return corrected;
+        }, response => this.isParseable(response, schema));
+
+        if (!called) {
+            metrics.recordCall({ agent: this.name, provider: provider.name, model, outcome: 'cache_hit', ms: Date.now() - start, retries: 0 });
+        }
+        // Cache hits, coalesced and non-streamed calls deliver the whole text at once
+        if (ttftMs === undefined) onText(response);
+        return { text: response, timing: { ttftMs, totalMs: Date.now() - start } };
+    }
+
+    /**
+     * Runs `worker` for every item concurrently (at most `concurrency` at once). Workers make
+     * their LLM calls through the supplied `call`, and this run's timing becomes the earliest
+     * first token across all of them.
+     */
+    protected async fanOut<T, R>(
+        items: T[],
+        worker: (item: T, index: number, call: (message: string, options?: CallOptions) => Promise<string>) => Promise<R>,
+        concurrency: number = items.length,
+    ): Promise<R[]> {
+        const start = Date.now();
+        let firstTokenMs: number | undefined;
+        const call = async (message: string, options: CallOptions = {}) => {
+            const callStart = Date.now();
+            const { text, timing } = await this.callLLMTimed(message, options);
+            if (timing.ttftMs !== undefined) {
+                const at = callStart - start + timing.ttftMs;
+                firstTokenMs = firstTokenMs === undefined ? at : Math.min(firstTokenMs, at);
+            }
+            return text;
+        };
+        const limit = createLimiter(Math.max(1, concurrency));
+        const results = await Promise.all(items.map((item, i) => limit(() => worker(item, i, call))));
+        this.timing = { ttftMs: firstTokenMs, totalMs: Date.now() - start };
+        return results;
+    }
+
+    /**
+     * When a response fails `schema` even after local repair but parses to an object, asks the
+     * model that wrote it for just the failing fields (a small call instead of regenerating the response)
+     * and returns the patched response. Anything else is returned unchanged for `parse` to report.
+     */
+    private async correct(response: string, schema: ZodSchema<unknown>, model: LLMConfig): Promise<string> {
+        let failure: JsonRepairError;
+        try {
+            decodeJson(response, schema);
+            return response;
+        } catch (e) {
+            if (!(e instanceof JsonRepairError) || !e.partial || typeof e.partial !== 'object' || !e.issues.length) return response;
+            failure = e;
+        }
+        recordRecall(this.name);
+        const shorten = (value: unknown): unknown => {
+            if (typeof value === 'string') return value.length > FIX_CONTEXT_CHARS ? `${value.slice(0, FIX_CONTEXT_CHARS)}…` : value;
+            if (Array.isArray(value)) return value.map(shorten);
+            if (value && typeof value === 'object') return Object.fromEntries(Object.entries(value).map(([k, v]) => [k, shorten(v)]));
+            return value;
+        };
+        try {
+            const { text } = await this.callLLMTimed(JSON.stringify({ issues: failure.issues, object: shorten(failure.partial) }), {
+                promptFile: 'json-fix.md',
+                schema: JsonFixSchema,
+                listener: null,
+                repair: false,
+                model,
+            });
+            const fixed = JSON.parse(JSON.stringify(failure.partial));
+            for (const fix of decodeJson(text, JsonFixSchema).value.fixes) setPath(fixed, fix.path, fix.value, schema as unknown as ZodTypeAny);
+            return JSON.stringify(decodeJson(JSON.stringify(fixed), schema).value);
+        } catch (e) {
+            return response;
+        }
+    }
+
+    // Decodes with local repairs (see repair.ts); throws JsonRepairError when nothing validates
+    protected decode<T>(jsonString: string, schema: ZodSchema<T>) {
+        return trace('decode', 'parse', () => decodeJson(jsonString, schema), { chars: jsonString.length });
+    }
+
+    // Used to keep responses that would fail `parse` out of the response cache
+    protected isParseable(jsonString: string, schema: ZodSchema<unknown> = this.outputSchema): boolean {
+        try {
+            this.decode(jsonString, schema);
+            return true;
+        } catch (e) {
+            return false;
         }
-        return "";
     }
 
-    protected parse(jsonString: string): TOutput {
+    protected parse(jsonString: string): TOutput;
+    protected parse<T>(jsonString: string, schema: ZodSchema<T>): T;
+    protected parse(jsonString: string, schema: ZodSchema<unknown> = this.outputSchema): unknown {
         try {
-            // Clean markdown fences if present
-            const cleaned = jsonString.replace(/```json/g, '').replace(/```/g, '').trim();
-            const parsed = JSON.parse(cleaned);
-            return this.outputSchema.parse(parsed);
+            const { value, repairs } = this.decode(jsonString, schema);
+            recordDecode(this.name, repairs);
+            return value;
         } catch (e) {
+            recordDecode(this.name, null);
+            const provider = getProvider(this.modelConfig.provider || process.env.DEFAULT_PROVIDER || 'openai');
+            metrics.recordParseFailure({ agent: this.name, provider: provider.name, model: provider.resolveModel(this.modelConfig) });
             console.error(`Error parsing JSON from ${this.name}:`, jsonString);
             throw new Error(`Failed to parse JSON from ${this.name}: ${e}`);
         }
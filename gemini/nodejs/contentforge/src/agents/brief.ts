@@ -5,6 +5,7 @@ export class BriefAgent extends BaseAgent<string, ContentBrief> {
     name = "BriefAgent";
     modelConfig = {}; 
     outputSchema = ContentBriefSchema;
+    inputProjection = { topic: true };
 
     constructor() {
         super('brief.md');
@@ -12,7 +13,7 @@ export class BriefAgent extends BaseAgent<string, ContentBrief> {
 
     async run(input: string): Promise<ContentBrief> {
         // We pass the raw topic wrapped in a simple JSON structure to the LLM
-        const response = await this.callLLM(JSON.stringify({ topic: input }));
+        const response = await this.callLLM(this.serializeInput({ topic: input }));
         return this.parse(response);
     }
 }
\ No newline at end of file
@@ -0,0 +1,105 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { z } from 'zod';
+import { LLMConfig } from '../adapters/base';
+
+export const CascadePolicySchema = z.object({
+    // Models to try, cheapest first, as "provider" or "provider:model"; a single tier just pins
+    // the agent to that model
+    tiers: z.array(z.string().min(1)).min(1),
+    // How many points from flipping its verdict a score may be and still count as borderline
+    // (agents that score things, see EditorAgent); 0 only escalates invalid or failed calls
+    margin: z.number().min(0).optional(),
+});
+export type CascadePolicy = z.infer<typeof CascadePolicySchema>;
+
+const ConfigSchema = z.object({
+    // Per agent name; "default" applies to agents without their own entry
+    cascades: z.record(CascadePolicySchema).optional(),
+}).passthrough();
+
+// invalid: the response failed the schema; error: the call failed; anything else comes from the agent
+export type EscalationReason = 'invalid' | 'error' | string;
+
+export type CascadeStats = {
+    // Calls that went through the cascade
+    calls: number;
+    // ...that needed a stronger model than the first one, and why
+    escalated: number;
+    byReason: Record<string, number>;
+    // Calls answered by each tier
+    byTier: number[];
+};
+
+const stats = new Map<string, CascadeStats>();
+
+function statsFor(agent: string): CascadeStats {
+    let entry = stats.get(agent);
+    if (!entry) {
+        entry = { calls: 0, escalated: 0, byReason: {}, byTier: [] };
+        stats.set(agent, entry);
+    }
+    return entry;
+}
+
+// One call: the tier that answered it, and the reasons the tiers before it were passed over
+export function recordCascade(agent: string, tier: number, reasons: EscalationReason[]) {
+    const entry = statsFor(agent);
+    entry.calls++;
+    if (reasons.length) entry.escalated++;
+    for (const reason of reasons) entry.byReason[reason] = (entry.byReason[reason] || 0) + 1;
+    entry.byTier[tier] = (entry.byTier[tier] || 0) + 1;
+}
+
+export function getCascadeStats(): Record<string, CascadeStats> {
+    return Object.fromEntries(stats);
+}
+
+// "provider:model" (or just "provider", for its default model) as a model config
+export function tierConfig(tier: string): LLMConfig {
+    const colon = tier.indexOf(':');
+    return colon < 0 ? { provider: tier } : { provider: tier.slice(0, colon), model: tier.slice(colon + 1) };
+}
+
+const configs = new Map<string, Record<string, CascadePolicy>>();
+
+// Cascades from CONTENTFORGE_CONFIG, or contentforge.config.json in the working directory if there is one
+function loadConfig(): Record<string, CascadePolicy> {
+    const explicit = process.env.CONTENTFORGE_CONFIG;
+    const file = path.resolve(explicit || 'contentforge.config.json');
+    const cached = configs.get(file);
+    if (cached) return cached;
+    let cascades: Record<string, CascadePolicy> = {};
+    if (explicit || fs.existsSync(file)) {
+        try {
+            cascades = ConfigSchema.parse(JSON.parse(fs.readFileSync(file, 'utf-8'))).cascades || {};
+        } catch (e) {
+            console.error(`Ignoring cascades in ${file}: ${e}`);
+        }
+    }
+    configs.set(file, cascades);
+    return cascades;
+}
+
+function number(value: string | undefined): number | undefined {
+    const n = Number(value);
+    return value && Number.isFinite(n) ? n : undefined;
+}
+
+/**
+ * Cascade policy for an agent: its entry in the config file, else the file's "default", else
+ * CONTENTFORGE_CASCADE (comma-separated tiers, cheapest first) for the agents in
+ * CONTENTFORGE_CASCADE_AGENTS (all when unset). CONTENTFORGE_CASCADE=off turns cascades off.
+ */
+export function cascadeFor(agent: string): CascadePolicy | undefined {
+    const tiers = process.env.CONTENTFORGE_CASCADE;
+    if (tiers === 'off') return undefined;
+    const config = loadConfig();
+    const configured = config[agent] || config.default;
+    if (configured) return configured;
+    if (!tiers) return undefined;
+    const agents = process.env.CONTENTFORGE_CASCADE_AGENTS;
+    if (agents && !agents.split(',').map(a => a.trim()).includes(agent)) return undefined;
+    const list = tiers.split(',').map(t => t.trim()).filter(Boolean);
+    return list.length ? { tiers: list, margin: number(process.env.CONTENTFORGE_CASCADE_MARGIN) } : undefined;
+}
@@ -1,24 +1,206 @@
 import { BaseAgent } from './base';
-import { ContentBrief, ResearchPackage, ArticleOutline, ArticleDraft, ArticleDraftSchema } from '../types';
+import { ContentBrief, ResearchPackage, ArticleOutline, ArticleDraft, ArticleDraftSchema, DraftSectionSchema, SectionFeedback } from '../types';
+import { countWords, topByOverlap } from '../utils/text';
+import { formatSection, headingKey, splitSections } from '../utils/markdown';
 
 type Input = { 
     brief: ContentBrief; 
     research: ResearchPackage; 
     outline: ArticleOutline; 
-    previousDraft?: ArticleDraft 
+    previousDraft?: ArticleDraft;
+    // Redraft only these sections of previousDraft, keeping the rest of its body as is
+    sectionsToRedraft?: SectionFeedback[];
+};
+
+type OutlineSection = ArticleOutline['sections'][number];
+
+// A section of the assembled article: kept `text`, or a `message` to write it from
+type Slot = { heading: string; text?: string; message?: string };
+
+// single: one call writes the whole article; sections: outline sections are written concurrently
+export type DraftMode = 'single' | 'sections';
+
+// full: a failed edit regenerates the whole draft; sections: only the sections the editor marked down
+export type RedraftMode = 'full' | 'sections';
+
+const BRIEF_FIELDS = {
+    working_title: true,
+    target_audience: true,
+    purpose: true,
+    angle: true,
+    content_type: true,
+    tone: true,
+    what_to_avoid: true,
+    estimated_word_count: true,
 };
 
 export class DraftAgent extends BaseAgent<Input, ArticleDraft> {
     name = "DraftAgent";
     modelConfig = {};
     outputSchema = ArticleDraftSchema;
+    inputProjection = {
+        brief: BRIEF_FIELDS,
+        research: {
+            key_facts: true,
+            supporting_examples: true,
+            counterarguments: true,
+            suggested_sources: true,
+        },
+        outline: {
+            sections: true,
+            intro_hook: true,
+            conclusion_cta: true,
+            total_estimated_words: true,
+        },
+        previousDraft: {
+            title: true,
+            body: true,
+            draft_version: true,
+            feedback_for_redraft: true,
+        },
+    };
+    sectionProjection = {
+        brief: BRIEF_FIELDS,
+        article_title: true,
+        section: true,
+        current_body: true,
+        position: true,
+        previous_heading: true,
+        next_heading: true,
+        research: true,
+        feedback_for_redraft: true,
+    };
+    mode: DraftMode;
 
-    constructor() {
+    constructor(mode: DraftMode = (process.env.DRAFT_MODE as DraftMode) || 'single') {
         super('draft.md');
+        this.mode = mode;
     }
 
     async run(input: Input): Promise<ArticleDraft> {
-        const response = await this.callLLM(JSON.stringify(input));
+        if (input.previousDraft && input.sectionsToRedraft?.length) {
+            return this.redraftSections(input);
+        }
+        if (this.mode === 'sections' && input.outline.sections.length > 0) {
+            return this.runSections(input);
+        }
+        const response = await this.callLLM(this.serializeInput(input));
         return this.parse(response);
     }
-}
\ No newline at end of file
+
+    // Writes every outline section concurrently and assembles them locally around the
+    // intro hook and conclusion CTA, so latency tracks the slowest section rather than the sum.
+    private async runSections(input: Input): Promise<ArticleDraft> {
+        const { brief, research, outline, previousDraft } = input;
+        const sections = outline.sections;
+        const title = previousDraft?.title || brief.working_title;
+        const intro = `# ${title}\n\n${outline.intro_hook.trim()}`;
+        const slots: Slot[] = sections.map((section, i) => ({
+            heading: section.heading,
+            message: this.sectionMessage(input, title, section, i, sections.map(s => s.heading), {
+                feedback_for_redraft: previousDraft?.feedback_for_redraft,
+            }),
+        }));
+        const body = await this.writeSections(title, intro, slots, outline.conclusion_cta.trim());
+        return {
+            title,
+            body,
+            word_count: countWords(body),
+            draft_version: previousDraft ? previousDraft.draft_version + 1 : 1,
+        };
+    }
+
+    // Rewrites only the sections the editor marked down and splices them into the previous body,
+    // ahead of the conclusion CTA. Falls back to a full redraft when none of the flagged headings
+    // can be found in the draft.
+    private async redraftSections(input: Input): Promise<ArticleDraft> {
+        const previousDraft = input.previousDraft!;
+        const { preamble, sections, tail } = splitSections(previousDraft.body, input.outline.conclusion_cta);
+        const feedback = new Map(input.sectionsToRedraft!.map(f => [headingKey(f.heading), f]));
+        if (!sections.some(s => feedback.has(headingKey(s.heading)))) {
+            return this.run({ ...input, sectionsToRedraft: undefined });
+        }
+
+        const headings = sections.map(s => s.heading);
+        const outlineByHeading = new Map(input.outline.sections.map(s => [headingKey(s.heading), s]));
+        const slots: Slot[] = sections.map((current, i) => {
+            const critique = feedback.get(headingKey(current.heading));
+            if (!critique) return { heading: current.heading, text: formatSection(current) };
+            const section = outlineByHeading.get(headingKey(current.heading))
+                || { heading: current.heading, points: [], estimated_words: countWords(current.body) };
+            return {
+                heading: current.heading,
+                message: this.sectionMessage(input, previousDraft.title, section, i, headings, {
+                    current_body: current.body,
+                    feedback_for_redraft: [critique.feedback, previousDraft.feedback_for_redraft].filter(Boolean).join('\n'),
+                }),
+            };
+        });
+        const body = await this.writeSections(previousDraft.title, preamble, slots, tail);
+        return {
+            title: previousDraft.title,
+            body,
+            word_count: countWords(body),
+            draft_version: previousDraft.draft_version + 1,
+        };
+    }
+
+    private sectionMessage(
+        input: Input,
+        title: string,
+        section: OutlineSection,
+        index: number,
+        headings: string[],
+        extra: { current_body?: string; feedback_for_redraft?: string },
+    ): string {
+        const { brief, research } = input;
+        const query = `${section.heading} ${section.points.join(' ')}`;
+        return this.serializeInput({
+            brief,
+            article_title: title,
+            section,
+            position: `${index + 1} of ${headings.length}`,
+            previous_heading: headings[index - 1],
+            next_heading: headings[index + 1],
+            research: {
+                key_facts: topByOverlap(query, research.key_facts, 6),
+                supporting_examples: topByOverlap(query, research.supporting_examples, 3),
+                counterarguments: topByOverlap(query, research.counterarguments, 2),
+            },
+            ...extra,
+        }, this.sectionProjection);
+    }
+
+    // Writes the slots that have a message concurrently, keeps the others verbatim, and streams
+    // finished sections to `onField` in order, so live output reads top to bottom.
+    private async writeSections(title: string, head: string, slots: Slot[], tail: string): Promise<string> {
+        const written: (string | undefined)[] = slots.map(slot => slot.text);
+        let emitted = 0;
+        this.onField?.onReset?.();
+        this.onField?.onValue?.('title', title);
+        if (head) this.onField?.onDelta?.('body', head);
+        const flush = () => {
+            while (emitted < slots.length && written[emitted] !== undefined) {
+                const separator = emitted > 0 || head ? '\n\n' : '';
+                this.onField?.onDelta?.('body', separator + written[emitted++]);
+            }
+        };
+        flush();
+
+        const pending = slots.map((slot, i) => ({ slot, i })).filter(x => x.slot.message !== undefined);
+        const concurrency = Number(process.env.DRAFT_SECTION_CONCURRENCY) || pending.length;
+        await this.fanOut(pending, async ({ slot, i }, _n, call) => {
+            const text = await call(slot.message!, {
+                promptFile: 'draft-section.md',
+                schema: DraftSectionSchema,
+                listener: null,
+            });
+            const result = this.parse(text, DraftSectionSchema);
+            written[i] = formatSection({ heading: slot.heading, body: result.body.trim() });
+            flush();
+        }, concurrency);
+
+        if (tail) this.onField?.onDelta?.('body', '\n\n' + tail);
+        return [head, ...written, tail].filter(Boolean).join('\n\n');
+    }
+}
@@ -1,19 +1,132 @@
 import { BaseAgent } from './base';
-import { ContentBrief, ArticleDraft, EditedArticle, EditedArticleSchema } from '../types';
+import { CascadePolicy, EscalationReason } from './cascade';
+import { ContentBrief, ArticleDraft, EditedArticle, EditedArticleSchema, EditPatchSchema, SectionFeedback } from '../types';
+import { applyEdits, PatchError } from '../utils/patch';
+import { countWords } from '../utils/text';
 
 type Input = { brief: ContentBrief; draft: ArticleDraft };
 
+// full: the editor returns the whole edited body; patch: edit operations applied locally to the draft
+export type EditorMode = 'full' | 'patch';
+
+// Same bar as the overall quality scores (see editor.md)
+export const SECTION_PASS_SCORE = 7;
+
+// The verdict of a review, in both full and patch responses
+const VerdictSchema = EditedArticleSchema.pick({ quality_scores: true, passed_quality_threshold: true });
+
+// Sections the editor scored below the pass mark
+export function failingSections(edited: EditedArticle): SectionFeedback[] {
+    return (edited.section_feedback || []).filter(s => s.score < SECTION_PASS_SCORE);
+}
+
+export type EditStats = {
+    passes: number;
+    // Patches rejected by the local applier (each followed by a full-body edit)
+    rejected: number;
+    // Characters the editor actually returned, and what a full-body response would have been
+    outputChars: number;
+    fullOutputChars: number;
+    // Time spent generating output (after the first token) and the estimated time for full bodies
+    generationMs: number;
+    fullGenerationMs: number;
+};
+
+const stats = new Map<EditorMode, EditStats>();
+
+function recordEdit(mode: EditorMode, outputChars: number, fullOutputChars: number, generationMs: number, rejected: boolean) {
+    const entry = stats.get(mode) || { passes: 0, rejected: 0, outputChars: 0, fullOutputChars: 0, generationMs: 0, fullGenerationMs: 0 };
+    entry.passes++;
+    if (rejected) entry.rejected++;
+    entry.outputChars += outputChars;
+    entry.fullOutputChars += fullOutputChars;
+    entry.generationMs += generationMs;
+    // Output time scales with length, so extrapolate from this response's own throughput
+    entry.fullGenerationMs += outputChars > 0 ? generationMs * fullOutputChars / outputChars : 0;
+    stats.set(mode, entry);
+}
+
+export function getEditStats(): Partial<Record<EditorMode, EditStats>> {
+    return Object.fromEntries(stats);
+}
+
 export class EditorAgent extends BaseAgent<Input, EditedArticle> {
     name = "EditorAgent";
     modelConfig = {};
     outputSchema = EditedArticleSchema;
+    inputProjection = {
+        brief: {
+            working_title: true,
+            target_audience: true,
+            purpose: true,
+            angle: true,
+            tone: true,
+            key_points: true,
+            what_to_avoid: true,
+            estimated_word_count: true,
+            success_criteria: true,
+        },
+        draft: {
+            title: true,
+            body: true,
+            word_count: true,
+            draft_version: true,
+        },
+    };
+    mode: EditorMode;
 
-    constructor() {
+    constructor(mode: EditorMode = (process.env.EDITOR_MODE as EditorMode) || 'full') {
         super('editor.md');
+        this.mode = mode;
     }
 
     async run(input: Input): Promise<EditedArticle> {
-        const response = await this.callLLM(JSON.stringify(input));
-        return this.parse(response);
+        const message = this.serializeInput(input);
+        if (this.mode === 'patch') {
+            const edited = await this.runPatch(input.draft, message);
+            if (edited) return edited;
+        }
+        const response = await this.callLLM(message);
+        const edited = this.parse(response);
+        recordEdit('full', response.length, response.length, this.generationMs(), false);
+        return edited;
+    }
+
+    // Returns undefined when the patch doesn't apply to the draft, so run() can fall back to a full edit.
+    private async runPatch(draft: ArticleDraft, message: string): Promise<EditedArticle | undefined> {
+        const response = await this.callLLM(message, { promptFile: 'editor-patch.md', schema: EditPatchSchema });
+        const patch = this.parse(response, EditPatchSchema);
+        const { edits, title, ...review } = patch;
+        let body: string;
+        try {
+            body = applyEdits(draft.body, edits);
+        } catch (e) {
+            if (!(e instanceof PatchError)) throw e;
+            recordEdit('patch', response.length, response.length, this.generationMs(), true);
+            return undefined;
+        }
+        const edited: EditedArticle = { ...review, title: title || draft.title, body, word_count: countWords(body) };
+        // What the same review would have cost as a full-body response
+        const fullChars = JSON.stringify(edited).length;
+        recordEdit('patch', response.length, fullChars, this.generationMs(), false);
+        return edited;
+    }
+
+    /**
+     * A cheaper model's review is escalated when its lowest score is within `margin` points
+     * (default 1) of flipping the verdict, or when its verdict contradicts its own scores.
+     */
+    protected escalation(response: string, policy: CascadePolicy): EscalationReason | undefined {
+        const { quality_scores, passed_quality_threshold } = this.decode(response, VerdictSchema).value;
+        const lowest = Math.min(...Object.values(quality_scores));
+        if (passed_quality_threshold !== lowest >= SECTION_PASS_SCORE) return 'inconsistent';
+        const margin = policy.margin ?? 1;
+        if (lowest >= SECTION_PASS_SCORE - margin && lowest < SECTION_PASS_SCORE + margin) return 'borderline';
+        return undefined;
+    }
+
+    private generationMs(): number {
+        const { ttftMs = 0, totalMs = 0 } = this.timing;
+        return Math.max(0, totalMs - ttftMs);
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,149 @@
+export type FieldListener = {
+    // Decoded text of a top-level string field, as it arrives
+    onDelta?(field: string, delta: string): void;
+    // Any top-level field, once its value is complete
+    onValue?(field: string, value: unknown): void;
+    // The stream restarted from scratch (e.g. the call is being retried)
+    onReset?(): void;
+};
+
+type State = 'start' | 'key' | 'keyString' | 'colon' | 'value' | 'string' | 'raw' | 'done';
+
+const ESCAPES: Record<string, string> = { '"': '"', '\\': '\\', '/': '/', b: '\b', f: '\f', n: '\n', r: '\r', t: '\t' };
+
+/**
+ * Incremental parser for the top-level fields of a JSON object streamed in arbitrary chunks.
+ * String fields are reported character-by-character (escapes decoded); other values are
+ * reported once complete. Anything before the first `{` (e.g. a ```json fence) is skipped.
+ */
+export class JsonFieldStream {
+    private listener: FieldListener;
+    private state: State = 'start';
+    private key = '';
+    private text = '';
+    private raw = '';
+    private depth = 0;
+    private rawInString = false;
+    private escape = false;
+    private unicode: string | null = null;
+
+    constructor(listener: FieldListener) {
+        this.listener = listener;
+    }
+
+    // Forget everything seen so far (used when a streamed call is retried from scratch)
+    reset() {
+        this.state = 'start';
+        this.key = this.text = this.raw = '';
+        this.depth = 0;
+        this.rawInString = this.escape = false;
+        this.unicode = null;
+        this.listener.onReset?.();
+    }
+
+    write(chunk: string) {
+        let delta = '';
+        for (const ch of chunk) {
+            switch (this.state) {
+                case 'start':
+                    if (ch === '{') this.state = 'key';
+                    break;
+                case 'key':
+                    if (ch === '"') { this.state = 'keyString'; this.key = ''; }
+                    else if (ch === '}') this.state = 'done';
+                    break;
+                case 'keyString': {
+                    const decoded = this.decode(ch);
+                    if (decoded === null) this.state = 'colon';
+                    else this.key += decoded;
+                    break;
+                }
+                case 'colon':
+                    if (ch === ':') this.state = 'value';
+                    break;
+                case 'value':
+                    if (/\s/.test(ch)) break;
+                    if (ch === '"') {
+                        this.state = 'string';
+                        this.text = '';
+                    } else {
+                        this.state = 'raw';
+                        this.raw = '';
+                        this.depth = 0;
+                        this.rawInString = false;
+                        this.rawChar(ch);
+                    }
+                    break;
+                case 'string': {
+                    const decoded = this.decode(ch);
+                    if (decoded === null) {
+                        this.emitDelta(delta);
+                        delta = '';
+                        this.listener.onValue?.(this.key, this.text);
+                        this.state = 'key';
+                    } else {
+                        this.text += decoded;
+                        delta += decoded;
+                    }
+                    break;
+                }
+                case 'raw':
+                    this.rawChar(ch);
+                    break;
+                case 'done':
+                    return;
+            }
+        }
+        if (this.state === 'string') this.emitDelta(delta);
+    }
+
+    private emitDelta(delta: string) {
+        if (delta) this.listener.onDelta?.(this.key, delta);
+    }
+
+    // Decodes one character of a JSON string body; returns null on the closing quote
+    private decode(ch: string): string | null {
+        if (this.unicode !== null) {
+            this.unicode += ch;
+            if (this.unicode.length < 4) return '';
+            const out = String.fromCharCode(parseInt(this.unicode, 16));
+            this.unicode = null;
+            return out;
+        }
+        if (this.escape) {
+            this.escape = false;
+            if (ch === 'u') {
+                this.unicode = '';
+                return '';
+            }
+            return ESCAPES[ch] ?? ch;
+        }
+        if (ch === '\\') {
+            this.escape = true;
+            return '';
+        }
+        return ch === '"' ? null : ch;
+    }
+
+    // Accumulates a non-string value until the comma or brace that ends it at depth 0
+    private rawChar(ch: string) {
+        if (this.rawInString) {
+            if (this.escape) this.escape = false;
+            else if (ch === '\\') this.escape = true;
+            else if (ch === '"') this.rawInString = false;
+            this.raw += ch;
+            return;
+        }
+        if (this.depth === 0 && (ch === ',' || ch === '}')) {
+            try {
+                this.listener.onValue?.(this.key, JSON.parse(this.raw));
+            } catch (e) { /* malformed value: left to the full parse to report */ }
+            this.state = ch === '}' ? 'done' : 'key';
+            return;
+        }
+        if (ch === '"') this.rawInString = true;
+        else if (ch === '{' || ch === '[') this.depth++;
+        else if (ch === '}' || ch === ']') this.depth--;
+        this.raw += ch;
+    }
+}
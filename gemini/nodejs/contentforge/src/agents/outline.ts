@@ -7,13 +7,32 @@ export class OutlineAgent extends BaseAgent<Input, ArticleOutline> {
     name = "OutlineAgent";
     modelConfig = {};
     outputSchema = ArticleOutlineSchema;
+    inputProjection = {
+        brief: {
+            working_title: true,
+            target_audience: true,
+            purpose: true,
+            angle: true,
+            content_type: true,
+            tone: true,
+            key_points: true,
+            what_to_avoid: true,
+            estimated_word_count: true,
+        },
+        research: {
+            key_facts: true,
+            key_questions_answered: true,
+            supporting_examples: true,
+            counterarguments: true,
+        },
+    };
 
     constructor() {
         super('outline.md');
     }
 
     async run(input: Input): Promise<ArticleOutline> {
-        const response = await this.callLLM(JSON.stringify(input));
+        const response = await this.callLLM(this.serializeInput(input));
         return this.parse(response);
     }
 }
\ No newline at end of file
@@ -0,0 +1,58 @@
+// An input projection lists exactly the fields an agent's prompt reads.
+// `true` keeps a value as-is; a nested projection picks fields from an object
+// (applied element-wise when the value is an array). Anything not listed, or set to `false`, is dropped.
+export type Projection = { [field: string]: boolean | Projection };
+
+export type ProjectionStats = {
+    calls: number;
+    fullChars: number;
+    projectedChars: number;
+};
+
+const stats = new Map<string, ProjectionStats>();
+
+// Measuring the full input costs a second, larger serialization per call, so it only runs
+// while something reports the saving (see measureProjections)
+let measuring = false;
+
+export function project(value: unknown, projection: Projection): unknown {
+    if (Array.isArray(value)) {
+        return value.map(item => project(item, projection));
+    }
+    if (!value || typeof value !== 'object') {
+        return value;
+    }
+    const source = value as Record<string, unknown>;
+    const result: Record<string, unknown> = {};
+    for (const [field, rule] of Object.entries(projection)) {
+        if (rule === false || source[field] === undefined) continue;
+        result[field] = rule === true ? source[field] : project(source[field], rule);
+    }
+    return result;
+}
+
+// Rough prompt-token estimate (~4 characters per token for English JSON).
+export function estimateTokens(chars: number): number {
+    return Math.ceil(chars / 4);
+}
+
+// Turns on full-input measurement, e.g. for a run that prints its stats table
+export function measureProjections(enabled: boolean) {
+    measuring = enabled;
+}
+
+export function isMeasuringProjections(): boolean {
+    return measuring;
+}
+
+export function recordProjection(agent: string, fullChars: number, projectedChars: number) {
+    const entry = stats.get(agent) || { calls: 0, fullChars: 0, projectedChars: 0 };
+    entry.calls++;
+    entry.fullChars += fullChars;
+    entry.projectedChars += projectedChars;
+    stats.set(agent, entry);
+}
+
+export function getProjectionStats(): Record<string, ProjectionStats> {
+    return Object.fromEntries(stats);
+}
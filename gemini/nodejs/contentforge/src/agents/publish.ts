@@ -1,17 +1,152 @@
 import { BaseAgent } from './base';
-import { EditedArticle, PublishedArticle, PublishedArticleSchema } from '../types';
+import { ArticleOutline, ContentBrief, EditedArticle, PublishedArticle, PublishedArticleSchema, PublishMetadata, PublishMetadataSchema } from '../types';
+import { cleanMarkdown, frontMatter, headingKey, splitSections } from '../utils/markdown';
+import { countWords, readingTimeMinutes, tokenize } from '../utils/text';
+
+// llm: the model returns the whole formatted article; hybrid: formatting, counts and front matter
+// are computed locally and the model only writes the description and tags; local: no model call
+export type PublishMode = 'llm' | 'hybrid' | 'local';
+
+// Enough of the opening for the model to see what the article is about
+const EXCERPT_CHARS = 1200;
+const DESCRIPTION_CHARS = 160;
+
+// The parts of an edited article that publishing reads
+export type PublishInput = Pick<EditedArticle, 'title' | 'body' | 'word_count'>;
+
+export type MetadataInput = { title: string; headings: string[]; excerpt: string };
+
+/**
+ * Whether metadata written for `guessed` describes the article behind `actual`: the headings,
+ * which decide what the description and tags cover, are all there, with at most one more
+ * (typically a conclusion). The title's wording and the excerpt don't change the answer.
+ */
+export function metadataHolds(guessed: MetadataInput, actual: MetadataInput): boolean {
+    const headings = new Set(actual.headings.map(headingKey));
+    return guessed.headings.length > 0
+        && guessed.headings.every(heading => headings.has(headingKey(heading)))
+        && headings.size <= guessed.headings.length + 1;
+}
+
+// Body text without headings, list markers or emphasis, as one line
+function plainText(markdown: string): string {
+    return markdown
+        .split('\n')
+        .filter(line => !/^#{1,6}\s/.test(line))
+        .join(' ')
+        .replace(/^\s*[-*+]\s+/gm, '')
+        .replace(/[*_`]+/g, '')
+        .replace(/\[([^\]]*)\]\([^)]*\)/g, '$1')
+        .replace(/\s+/g, ' ')
+        .trim();
+}
+
+// Title, headings and opening of a cleaned-up body
+function metadataOf(title: string, body: string): MetadataInput {
+    const { preamble, sections } = splitSections(body);
+    return {
+        title,
+        headings: sections.map(s => s.heading),
+        excerpt: plainText([preamble, ...sections.map(s => s.body)].join('\n')).slice(0, EXCERPT_CHARS),
+    };
+}
+
+// Metadata without a model: the opening sentences as the description, the most frequent
+// topic words (headings count triple) as tags
+function localMetadata(input: MetadataInput, body: string): PublishMetadata {
+    const sentences = input.excerpt.match(/[^.!?]+[.!?]+/g) || [input.excerpt];
+    let description = '';
+    for (const sentence of sentences) {
+        if ((description + sentence).trim().length > DESCRIPTION_CHARS) break;
+        description += sentence;
+    }
+    description = description.trim() || `${input.excerpt.slice(0, DESCRIPTION_CHARS - 1).trimEnd()}…`;
+
+    const counts = new Map<string, number>();
+    const add = (text: string, weight: number) => {
+        for (const token of tokenize(text)) {
+            if (token.length > 3 && !/^\d+$/.test(token)) counts.set(token, (counts.get(token) || 0) + weight);
+        }
+    };
+    add([input.title, ...input.headings].join(' '), 3);
+    add(plainText(body), 1);
+    const tags: string[] = [];
+    for (const [token] of [...counts.entries()].sort((a, b) => b[1] - a[1])) {
+        if (tags.length === 5) break;
+        // "cache" and "caching" are one tag
+        if (!tags.some(tag => tag.slice(0, 4) === token.slice(0, 4))) tags.push(token);
+    }
+    return { description, tags };
+}
 
 export class PublishAgent extends BaseAgent<EditedArticle, PublishedArticle> {
     name = "PublishAgent";
     modelConfig = {};
     outputSchema = PublishedArticleSchema;
+    // Formatting and tagging only need the finished article itself
+    inputProjection = {
+        title: true,
+        body: true,
+        word_count: true,
+    };
+    metadataProjection = {
+        title: true,
+        headings: true,
+        excerpt: true,
+    };
+    mode: PublishMode;
 
-    constructor() {
+    constructor(mode: PublishMode = (process.env.PUBLISH_MODE as PublishMode) || 'hybrid') {
         super('publish.md');
+        this.mode = mode;
+    }
+
+    /**
+     * Publishes an edited article. `metadata` is a description and tags written ahead of time
+     * (see `metadataFromOutline`); hybrid mode uses it instead of calling the model.
+     */
+    async run(input: PublishInput, metadata?: PublishMetadata): Promise<PublishedArticle> {
+        if (this.mode === 'llm') {
+            const response = await this.callLLM(this.serializeInput(input));
+            return this.parse(response);
+        }
+
+        const title = input.title.trim();
+        const body = cleanMarkdown(input.body, title);
+        const word_count = countWords(body);
+        const reading_time_minutes = readingTimeMinutes(word_count);
+        const meta = metadataOf(title, body);
+        if (metadata || this.mode === 'local') this.timing = {};
+        const { description, tags } = this.mode === 'local' ? localMetadata(meta, body) : metadata || await this.writeMetadata(meta);
+        return {
+            title,
+            description,
+            tags,
+            markdown: frontMatter({ title, description, tags, word_count, reading_time_minutes }) + body,
+            word_count,
+            reading_time_minutes,
+        };
+    }
+
+    // What the metadata call sees of an article: its title, headings and opening
+    metadataInput(input: PublishInput): MetadataInput {
+        const title = input.title.trim();
+        return metadataOf(title, cleanMarkdown(input.body, title));
+    }
+
+    // The metadata call's input as far as it is known before drafting: the working title, the
+    // outline's headings, and its hook and section points in place of the opening
+    metadataFromOutline(brief: ContentBrief, outline: ArticleOutline): MetadataInput {
+        return {
+            title: brief.working_title,
+            headings: outline.sections.map(s => s.heading),
+            excerpt: [outline.intro_hook, ...outline.sections.flatMap(s => s.points)].join(' ').slice(0, EXCERPT_CHARS),
+        };
     }
 
-    async run(input: EditedArticle): Promise<PublishedArticle> {
-        const response = await this.callLLM(JSON.stringify(input));
-        return this.parse(response);
+    // One short call on an excerpt: the response is two fields instead of the whole article
+    async writeMetadata(meta: MetadataInput): Promise<PublishMetadata> {
+        const response = await this.callLLM(this.serializeInput(meta, this.metadataProjection), { promptFile: 'publish-meta.md', schema: PublishMetadataSchema });
+        return this.parse(response, PublishMetadataSchema);
     }
-}
\ No newline at end of file
+}
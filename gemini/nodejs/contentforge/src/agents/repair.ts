@@ -0,0 +1,458 @@
+import { ZodTypeAny, ZodSchema } from 'zod';
+
+// Local fixes tried on a response that isn't valid JSON for its schema, in this order
+export type RepairKind = 'lenient' | 'extract' | 'coerce' | 'close';
+
+export type Decoded<T> = { value: T; repairs: RepairKind[] };
+
+export type SchemaIssue = { path: string; message: string };
+
+/**
+ * Thrown when no local repair produces a valid value. `partial` is the best parse that was
+ * reached (after coercion), and `issues` what the schema still rejects in it; with both, a
+ * targeted correction can ask the model for just the failing fields.
+ */
+export class JsonRepairError extends Error {
+    readonly partial?: unknown;
+    readonly issues: SchemaIssue[];
+
+    constructor(message: string, issues: SchemaIssue[] = [], partial?: unknown) {
+        super(message);
+        this.name = 'JsonRepairError';
+        this.issues = issues;
+        this.partial = partial;
+    }
+}
+
+export type RepairStats = {
+    // Responses decoded by the agent
+    parsed: number;
+    // ...that needed a local repair, by kind
+    repaired: number;
+    byKind: Partial<Record<RepairKind, number>>;
+    // ...for which the model was asked for a targeted correction
+    recalled: number;
+    failed: number;
+};
+
+const stats = new Map<string, RepairStats>();
+
+function statsFor(agent: string): RepairStats {
+    let entry = stats.get(agent);
+    if (!entry) {
+        entry = { parsed: 0, repaired: 0, byKind: {}, recalled: 0, failed: 0 };
+        stats.set(agent, entry);
+    }
+    return entry;
+}
+
+export function recordDecode(agent: string, repairs: RepairKind[] | null) {
+    const entry = statsFor(agent);
+    entry.parsed++;
+    if (repairs === null) {
+        entry.failed++;
+        return;
+    }
+    if (repairs.length) entry.repaired++;
+    for (const kind of repairs) entry.byKind[kind] = (entry.byKind[kind] || 0) + 1;
+}
+
+export function recordRecall(agent: string) {
+    statsFor(agent).recalled++;
+}
+
+export function getRepairStats(): Record<string, RepairStats> {
+    return Object.fromEntries(stats);
+}
+
+// A single Markdown fence around the whole reply; fences anywhere else may be string content
+const WRAPPING_FENCE = /^\s*```(?:json)?[^\S\n]*\n([\s\S]*?)\n?```\s*$/;
+
+export function stripFences(text: string): string {
+    const match = text.match(WRAPPING_FENCE);
+    return (match ? match[1] : text).trim();
+}
+
+// Python-style literals some models emit outside strings
+const LITERALS: Record<string, string> = { True: 'true', False: 'false', None: 'null' };
+
+/**
+ * Rewrites common near-JSON into JSON: comments, trailing commas, single or curly quotes,
+ * unquoted keys, Python literals and raw control characters inside strings. Works on a
+ * single pass over the text, so string contents are never touched otherwise.
+ */
+export function lenient(text: string): string {
+    let out = '';
+    // Last non-whitespace character written
+    let last = '';
+    let i = 0;
+    while (i < text.length) {
+        const ch = text[i];
+        // Strings, re-emitted with double quotes and escaped control characters. Single and
+        // curly quotes only open a string where a key or value can start (not "Here's" in prose).
+        if (ch === '"' || ((ch === '\'' || ch === '“') && '{[,:'.includes(last) && last !== '')) {
+            const close = ch === '“' ? '”' : ch;
+            out += '"';
+            i++;
+            while (i < text.length && text[i] !== close) {
+                const c = text[i];
+                if (c === '\\' && i + 1 < text.length) {
+                    // \' is not a JSON escape
+                    out += text[i + 1] === '\'' ? '\'' : c + text[i + 1];
+                    i += 2;
+                    continue;
+                }
+                if (c === '"') out += '\\"';
+                else if (c === '\n') out += '\\n';
+                else if (c === '\r') out += '\\r';
+                else if (c === '\t') out += '\\t';
+                else if (c < ' ') out += `\\u${c.charCodeAt(0).toString(16).padStart(4, '0')}`;
+                else out += c;
+                i++;
+            }
+            if (i < text.length) out += '"';
+            last = '"';
+            i++;
+            continue;
+        }
+        if (ch === '/' && text[i + 1] === '/') {
+            while (i < text.length && text[i] !== '\n') i++;
+            continue;
+        }
+        if (ch === '/' && text[i + 1] === '*') {
+            const end = text.indexOf('*/', i + 2);
+            i = end === -1 ? text.length : end + 2;
+            continue;
+        }
+        if (ch === ',') {
+            let j = i + 1;
+            while (j < text.length && /\s/.test(text[j])) j++;
+            if (text[j] === '}' || text[j] === ']') {
+                i++;
+                continue;
+            }
+        }
+        if (/[A-Za-z_$]/.test(ch)) {
+            let j = i;
+            while (j < text.length && /[\w$]/.test(text[j])) j++;
+            const word = text.slice(i, j);
+            let k = j;
+            while (k < text.length && /[ \t]/.test(text[k])) k++;
+            if (text[k] === ':' && (last === '{' || last === ',')) out += `"${word}"`;
+            else out += LITERALS[word] ?? word;
+            last = word[word.length - 1];
+            i = j;
+            continue;
+        }
+        out += ch;
+        if (!/\s/.test(ch)) last = ch;
+        i++;
+    }
+    return out;
+}
+
+// End index (inclusive) of the balanced value starting at `start`, or -1 if it never closes
+function balancedEnd(text: string, start: number): number {
+    let depth = 0;
+    let inString = false;
+    for (let i = start; i < text.length; i++) {
+        const ch = text[i];
+        if (inString) {
+            if (ch === '\\') i++;
+            else if (ch === '"') inString = false;
+        } else if (ch === '"') {
+            inString = true;
+        } else if (ch === '{' || ch === '[') {
+            depth++;
+        } else if (ch === '}' || ch === ']') {
+            depth--;
+            if (depth === 0) return i;
+        }
+    }
+    return -1;
+}
+
+/** The longest balanced {...} in the text, e.g. JSON wrapped in prose. */
+export function extractLargestObject(text: string): string | undefined {
+    let best: string | undefined;
+    let i = text.indexOf('{');
+    while (i !== -1) {
+        const end = balancedEnd(text, i);
+        if (end !== -1) {
+            if (!best || end + 1 - i > best.length) best = text.slice(i, end + 1);
+            i = text.indexOf('{', end + 1);
+        } else {
+            i = text.indexOf('{', i + 1);
+        }
+    }
+    return best;
+}
+
+/**
+ * Completes JSON that stops mid-way (a response cut off by the token limit): closes an open
+ * string, drops a dangling key, comma or partial literal, then closes every open array and
+ * object. Values that were cut off are lost, not invented.
+ */
+export function closeTruncated(text: string): string | undefined {
+    const start = text.indexOf('{');
+    if (start === -1) return undefined;
+    let body = text.slice(start);
+    const stack: string[] = [];
+    let inString = false;
+    for (let i = 0; i < body.length; i++) {
+        const ch = body[i];
+        if (inString) {
+            if (ch === '\\') i++;
+            else if (ch === '"') inString = false;
+        } else if (ch === '"') {
+            inString = true;
+        } else if (ch === '{' || ch === '[') {
+            stack.push(ch === '{' ? '}' : ']');
+        } else if (ch === '}' || ch === ']') {
+            stack.pop();
+            if (!stack.length) return undefined;
+        }
+    }
+    if (!stack.length) return undefined;
+    if (inString) body = body.replace(/\\(u[0-9a-fA-F]{0,3})?$/, '') + '"';
+
+    const string = '"(?:[^"\\\\]|\\\\.)*"';
+    for (let previous = ''; previous !== body;) {
+        previous = body;
+        body = body.trimEnd()
+            // A partial literal or number: "tru", "nul", "12.", "1e", "-"
+            .replace(/([:\[,]\s*)(?:t|tr|tru|f|fa|fal|fals|n|nu|nul)$/, '$1')
+            .replace(/([:\[,]\s*)(?:-|-?\d+\.|-?\d+(?:\.\d+)?[eE][+-]?)$/, '$1')
+            .replace(/,$/, '')
+            // A key without a value
+            .replace(new RegExp(`([{,])\\s*${string}\\s*:$`), '$1');
+        // A lone string right after "{" or "," in an object is a key whose value never came
+        if (stack[stack.length - 1] === '}') body = body.replace(new RegExp(`([{,])\\s*${string}$`), '$1');
+    }
+    return body.replace(/,$/, '') + stack.reverse().join('');
+}
+
+type Def = { typeName?: string; [key: string]: any };
+
+const NUMBER = /^\s*(-?\d+(?:\.\d+)?)(?:\s*\/\s*\d+)?\s*$/;
+
+/**
+ * Nudges a parsed value towards `schema`: numeric strings ("8", "8/10") become numbers and
+ * are clamped to min/max, numbers and booleans become strings where strings are expected,
+ * "true"/"false" become booleans, enum and literal values match case-insensitively, null
+ * optional fields are dropped and a lone value becomes a one-element array.
+ */
+export function coerce(value: unknown, schema: ZodTypeAny): unknown {
+    const def: Def = (schema as any)._def;
+    switch (def.typeName) {
+        case 'ZodOptional':
+            return value === null || value === undefined ? undefined : coerce(value, def.innerType);
+        case 'ZodNullable':
+            return value === null ? null : coerce(value, def.innerType);
+        case 'ZodDefault':
+            return value === undefined ? value : coerce(value, def.innerType);
+        case 'ZodEffects':
+            return coerce(value, def.schema);
+        case 'ZodObject': {
+            if (!value || typeof value !== 'object' || Array.isArray(value)) return value;
+            const shape = (schema as any).shape as Record<string, ZodTypeAny>;
+            const result: Record<string, unknown> = { ...(value as Record<string, unknown>) };
+            for (const [key, field] of Object.entries(shape)) {
+                const coerced = coerce(result[key], field);
+                if (coerced === undefined) delete result[key];
+                else result[key] = coerced;
+            }
+            return result;
+        }
+        case 'ZodArray':
+            if (value === undefined || value === null) return value;
+            return (Array.isArray(value) ? value : [value]).map(item => coerce(item, def.type));
+        case 'ZodNumber': {
+            let n = value;
+            if (typeof n === 'string' && NUMBER.test(n)) n = parseFloat(n.match(NUMBER)![1]);
+            if (typeof n !== 'number' || Number.isNaN(n)) return value;
+            for (const check of def.checks || []) {
+                if (check.kind === 'int') n = Math.round(n as number);
+                if (check.kind === 'min') n = Math.max(n as number, check.value);
+                if (check.kind === 'max') n = Math.min(n as number, check.value);
+            }
+            return n;
+        }
+        case 'ZodString':
+            return typeof value === 'number' || typeof value === 'boolean' ? String(value) : value;
+        case 'ZodBoolean':
+            if (typeof value === 'string' && /^(true|yes)$/i.test(value.trim())) return true;
+            if (typeof value === 'string' && /^(false|no)$/i.test(value.trim())) return false;
+            return value;
+        case 'ZodEnum':
+            if (typeof value !== 'string') return value;
+            return (def.values as string[]).find(option => option.toLowerCase() === value.trim().toLowerCase()) ?? value;
+        case 'ZodLiteral':
+            return typeof value === 'string' && typeof def.value === 'string' && value.trim().toLowerCase() === def.value.toLowerCase()
+                ? def.value
+                : value;
+        case 'ZodDiscriminatedUnion': {
+            if (!value || typeof value !== 'object') return value;
+            const tag = (value as Record<string, unknown>)[def.discriminator];
+            const option = (def.options as ZodTypeAny[]).find(o => {
+                const literal = (o as any).shape[def.discriminator]._def.value;
+                return typeof tag === 'string' && String(literal).toLowerCase() === tag.trim().toLowerCase();
+            });
+            return option ? coerce(value, option) : value;
+        }
+        case 'ZodUnion':
+            for (const option of def.options as ZodTypeAny[]) {
+                const coerced = coerce(value, option);
+                if (option.safeParse(coerced).success) return coerced;
+            }
+            return value;
+        default:
+            return value;
+    }
+}
+
+/**
+ * Removes null optional fields. Strict structured outputs require every field and send absent
+ * optional ones as null, so this is the response format rather than something to repair.
+ */
+function dropOptionalNulls(value: unknown, schema: ZodTypeAny): unknown {
+    const def: Def = (schema as any)._def;
+    switch (def.typeName) {
+        case 'ZodOptional':
+        case 'ZodNullable':
+        case 'ZodDefault':
+            return dropOptionalNulls(value, def.innerType);
+        case 'ZodEffects':
+            return dropOptionalNulls(value, def.schema);
+        case 'ZodObject': {
+            if (!value || typeof value !== 'object' || Array.isArray(value)) return value;
+            const shape = (schema as any).shape as Record<string, ZodTypeAny>;
+            const result: Record<string, unknown> = { ...(value as Record<string, unknown>) };
+            for (const [key, field] of Object.entries(shape)) {
+                if (result[key] === null && field.isOptional() && !field.isNullable()) delete result[key];
+                else if (result[key] !== undefined) result[key] = dropOptionalNulls(result[key], field);
+            }
+            return result;
+        }
+        case 'ZodArray':
+            return Array.isArray(value) ? value.map(item => dropOptionalNulls(item, def.type)) : value;
+        case 'ZodDiscriminatedUnion': {
+            if (!value || typeof value !== 'object') return value;
+            const option = (def.options as ZodTypeAny[]).find(o => (o as any).shape[def.discriminator]._def.value === (value as Record<string, unknown>)[def.discriminator]);
+            return option ? dropOptionalNulls(value, option) : value;
+        }
+        default:
+            return value;
+    }
+}
+
+// Path segments that would reach an object's prototype instead of a field
+const FORBIDDEN_KEYS = new Set(['__proto__', 'constructor', 'prototype']);
+
+const hasOwn = (object: object, key: string) => Object.prototype.hasOwnProperty.call(object, key);
+
+// Schema of the field `key` under `schema`, or undefined when the schema has no such field
+function fieldSchema(schema: ZodTypeAny, key: string): ZodTypeAny | undefined {
+    const def: Def = (schema as any)._def;
+    switch (def.typeName) {
+        case 'ZodOptional':
+        case 'ZodNullable':
+        case 'ZodDefault':
+            return fieldSchema(def.innerType, key);
+        case 'ZodEffects':
+            return fieldSchema(def.schema, key);
+        case 'ZodObject': {
+            const shape = (schema as any).shape as Record<string, ZodTypeAny>;
+            return hasOwn(shape, key) ? shape[key] : undefined;
+        }
+        case 'ZodArray':
+            return /^\d+$/.test(key) ? def.type : undefined;
+        case 'ZodRecord':
+            return def.valueType;
+        case 'ZodDiscriminatedUnion':
+        case 'ZodUnion':
+            for (const option of def.options as ZodTypeAny[]) {
+                const field = fieldSchema(option, key);
+                if (field) return field;
+            }
+            return undefined;
+        default:
+            return undefined;
+    }
+}
+
+/**
+ * Sets a dotted path ("quality_scores.clarity", "edits.0.find") in a parsed response, creating
+ * objects on the way. Only paths `schema` declares are written, only through own properties, and
+ * never through prototype keys; returns false (and leaves `target` as it was) otherwise.
+ */
+export function setPath(target: Record<string, unknown>, path: string, value: unknown, schema: ZodTypeAny): boolean {
+    const keys = path.split('.').filter(Boolean);
+    if (!keys.length || keys.some(key => FORBIDDEN_KEYS.has(key))) return false;
+    let field: ZodTypeAny | undefined = schema;
+    for (const key of keys) {
+        field = fieldSchema(field, key);
+        if (!field) return false;
+    }
+    let node: any = target;
+    for (const key of keys.slice(0, -1)) {
+        if (!hasOwn(node, key) || !node[key] || typeof node[key] !== 'object') node[key] = {};
+        node = node[key];
+    }
+    node[keys[keys.length - 1]] = value;
+    return true;
+}
+
+function issuesOf(error:{ issues: { path: (string | number)[]; message: string }[] }): SchemaIssue[] {
+    return error.issues.map(issue => ({ path: issue.path.join('.'), message: issue.message }));
+}
+
+/**
+ * Decodes a model response into `schema`, repairing it locally when needed: first as-is (then
+ * without a Markdown fence wrapping the whole reply), then with each text fix applied on top of the last (lenient syntax, largest balanced object,
+ * closing a truncated tail), validating each parse after schema-guided coercion. Throws a
+ * JsonRepairError when nothing validates.
+ */
+export function decodeJson<T>(text: string, schema: ZodSchema<T>): Decoded<T> {
+    const raw = text.trim();
+    const cleaned = stripFences(raw);
+    let best: { value: unknown; issues: SchemaIssue[] } | undefined;
+    let lastError = '';
+
+    const attempt = (candidate: string | undefined, repairs: RepairKind[]): Decoded<T> | undefined => {
+        if (candidate === undefined) return undefined;
+        let parsed: unknown;
+        try {
+            parsed = dropOptionalNulls(JSON.parse(candidate), schema as unknown as ZodTypeAny);
+        } catch (e) {
+            lastError = String(e);
+            return undefined;
+        }
+        const direct = schema.safeParse(parsed);
+        if (direct.success) return { value: direct.data, repairs };
+        const coerced = coerce(parsed, schema as unknown as ZodTypeAny);
+        const result = schema.safeParse(coerced);
+        if (result.success) return { value: result.data, repairs: [...repairs, 'coerce'] };
+        const issues = issuesOf(result.error);
+        if (!best || issues.length < best.issues.length) best = { value: coerced, issues };
+        lastError = result.error.message;
+        return undefined;
+    };
+
+    const strict = attempt(raw, []) ?? (cleaned !== raw ? attempt(cleaned, []) : undefined);
+    if (strict) return strict;
+    const lenientText = lenient(cleaned);
+    const relaxed = lenientText !== cleaned ? attempt(lenientText, ['lenient']) : undefined;
+    if (relaxed) return relaxed;
+    const applied: RepairKind[] = lenientText !== cleaned ? ['lenient'] : [];
+
+    const extracted = extractLargestObject(lenientText);
+    if (extracted !== undefined && extracted !== lenientText) {
+        const result = attempt(extracted, [...applied, 'extract']);
+        if (result) return result;
+    }
+    const closed = attempt(closeTruncated(lenientText), [...applied, 'close']);
+    if (closed) return closed;
+
+    throw new JsonRepairError(lastError || 'No JSON object found', best?.issues, best?.value);
+}
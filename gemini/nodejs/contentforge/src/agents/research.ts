@@ -1,17 +1,188 @@
 import { BaseAgent } from './base';
-import { ContentBrief, ResearchPackage, ResearchPackageSchema } from '../types';
+import { ContentBrief, ResearchExtension, ResearchExtensionSchema, ResearchPackage, ResearchPackageSchema, ResearchFacetSchema } from '../types';
+import { KnowledgeBase, KnowledgeHit, KnowledgeKind, KNOWLEDGE_KINDS, knowledgeBase } from '../store/knowledge';
+import { trace } from '../metrics/trace';
+import { dedupeNear, notCoveredBy } from '../utils/text';
+
+// single: one call fills the whole package; facets: one concurrent call per list;
+// key_points: one concurrent call per brief key point, each filling every list
+export type ResearchMode = 'single' | 'facets' | 'key_points';
+
+type FacetName = 'key_facts' | 'key_questions_answered' | 'supporting_examples' | 'counterarguments' | 'suggested_sources';
+
+const FACETS: { name: FacetName; description: string; count: number }[] = [
+    { name: 'key_facts', description: 'Key facts and statistics a writer can cite', count: 10 },
+    { name: 'key_questions_answered', description: 'Questions the reader will have, each with a short answer', count: 6 },
+    { name: 'supporting_examples', description: 'Concrete real-world examples, case studies or anecdotes', count: 6 },
+    { name: 'counterarguments', description: 'Counterarguments, risks and limitations to acknowledge', count: 4 },
+    { name: 'suggested_sources', description: 'Realistic or well-known sources (organisations, papers, reports) to consult', count: 6 },
+];
+
+// Known items retrieved per key point, the fewest worth building a call on, and the most sent in one call
+const KB_TOP_K = parseInt(process.env.CONTENTFORGE_RESEARCH_KB_TOP_K || '', 10) || 6;
+const KB_MIN_ITEMS = 4;
+const KB_MAX_ITEMS = 40;
+
+// An item retrieved from the knowledge base, as the model sees it
+type Known = { id: string; list: KnowledgeKind; text: string };
+
+export type KnowledgeStats = {
+    // Calls that extended retrieved research instead of starting from scratch
+    calls: number;
+    retrieved: number;
+    kept: number;
+    added: number;
+};
+
+const kbStats: KnowledgeStats = { calls: 0, retrieved: 0, kept: 0, added: 0 };
+
+export function getKnowledgeStats(): KnowledgeStats {
+    return { ...kbStats };
+}
 
 export class ResearchAgent extends BaseAgent<ContentBrief, ResearchPackage> {
     name = "ResearchAgent";
     modelConfig = {}; 
     outputSchema = ResearchPackageSchema;
+    // The brief minus tone and success criteria, which don't shape the research
+    inputProjection = {
+        topic: true,
+        working_title: true,
+        target_audience: true,
+        purpose: true,
+        angle: true,
+        content_type: true,
+        key_points: true,
+        what_to_avoid: true,
+    };
+    shardProjection = {
+        brief: this.inputProjection,
+        facet: true,
+        key_point: true,
+    };
+    extendProjection = {
+        brief: this.inputProjection,
+        key_point: true,
+        known: true,
+    };
+    mode: ResearchMode;
+    // Earlier research to build on; CONTENTFORGE_RESEARCH_KB=off always researches from scratch
+    knowledge?: KnowledgeBase = process.env.CONTENTFORGE_RESEARCH_KB === 'off' ? undefined : knowledgeBase();
 
-    constructor() {
+    constructor(mode: ResearchMode = (process.env.RESEARCH_MODE as ResearchMode) || 'single') {
         super('research.md');
+        this.mode = mode;
     }
 
     async run(input: ContentBrief): Promise<ResearchPackage> {
-        const response = await this.callLLM(JSON.stringify(input));
+        if (this.mode === 'facets') return this.runFacets(input);
+        if (this.mode === 'key_points' && input.key_points.length > 0) return this.runKeyPoints(input);
+        const known = this.retrieve(input, input.key_points);
+        if (known.length >= KB_MIN_ITEMS) {
+            const message = this.serializeInput({ brief: input, known }, this.extendProjection);
+            const response = await this.callLLM(message, { promptFile: 'research-extend.md', schema: ResearchExtensionSchema });
+            return this.combine(this.parse(response, ResearchExtensionSchema), known);
+        }
+        const response = await this.callLLM(this.serializeInput(input));
         return this.parse(response);
     }
-}
\ No newline at end of file
+
+    // The most relevant items from earlier research for each key point, best first
+    private retrieve(brief: ContentBrief, keyPoints: string[]): Known[] {
+        const knowledge = this.knowledge;
+        if (!knowledge) return [];
+        return trace('knowledge lookup', 'cpu', () => {
+            const hits = new Map<number, KnowledgeHit>();
+            for (const point of keyPoints) {
+                for (const hit of knowledge.search(`${point} ${brief.topic}`, KB_TOP_K)) {
+                    if ((hits.get(hit.id)?.score ?? -1) < hit.score) hits.set(hit.id, hit);
+                }
+            }
+            return [...hits.values()]
+                .sort((a, b) => b.score - a.score)
+                .slice(0, KB_MAX_ITEMS)
+                .map((hit, i) => ({ id: `K${i + 1}`, list: hit.kind, text: hit.text }));
+        });
+    }
+
+    // The retrieved items the model kept, followed by the ones it added
+    private combine(extension: ResearchExtension, known: Known[]): ResearchPackage {
+        const keep = new Set(extension.keep);
+        const kept = known.filter(k => keep.has(k.id));
+        const list = (kind: KnowledgeKind) =>
+            dedupeNear([...kept.filter(k => k.list === kind).map(k => k.text), ...extension[kind]]);
+        kbStats.calls++;
+        kbStats.retrieved += known.length;
+        kbStats.kept += kept.length;
+        kbStats.added += KNOWLEDGE_KINDS.reduce((n, kind) => n + extension[kind].length, 0);
+        return {
+            key_facts: list('key_facts'),
+            key_questions_answered: list('key_questions_answered'),
+            supporting_examples: list('supporting_examples'),
+            counterarguments: list('counterarguments'),
+            suggested_sources: list('suggested_sources'),
+            research_gaps: extension.research_gaps,
+        };
+    }
+
+    // One small call per list, so wall-clock time tracks the slowest facet.
+    private async runFacets(brief: ContentBrief): Promise<ResearchPackage> {
+        const lists = await this.fanOut(FACETS, async (facet, _i, call) => {
+            const message = this.serializeInput({ brief, facet }, this.shardProjection);
+            const text = await call(message, { promptFile: 'research-facet.md', schema: ResearchFacetSchema, listener: null });
+            return this.parse(text, ResearchFacetSchema).items;
+        });
+        const pkg: ResearchPackage = {
+            key_facts: [],
+            key_questions_answered: [],
+            supporting_examples: [],
+            counterarguments: [],
+            suggested_sources: [],
+        };
+        FACETS.forEach((facet, i) => { pkg[facet.name] = dedupeNear(lists[i]); });
+        return pkg;
+    }
+
+    // One call per key point; shards overlap, so lists are merged and near-duplicates dropped.
+    private async runKeyPoints(brief: ContentBrief): Promise<ResearchPackage> {
+        return this.merge(await this.researchKeyPoints(brief, brief.key_points));
+    }
+
+    /**
+     * Extends the package an earlier run built for a similar brief: only the key points that
+     * brief didn't cover are researched, one call each, and merged into it. Returns the key
+     * points that were researched (none when the earlier package covers them all).
+     */
+    async topUp(brief: ContentBrief, seed: ResearchPackage, seedBrief: ContentBrief): Promise<{ research: ResearchPackage; researched: string[] }> {
+        const missing = notCoveredBy(brief.key_points, seedBrief.key_points);
+        const shards = missing.length > 0 ? await this.researchKeyPoints(brief, missing) : [];
+        return { research: this.merge([seed, ...shards]), researched: missing };
+    }
+
+    private researchKeyPoints(brief: ContentBrief, keyPoints: string[]): Promise<ResearchPackage[]> {
+        return this.fanOut(keyPoints, async (keyPoint, _i, call) => {
+            const known = this.retrieve(brief, [keyPoint]);
+            if (known.length >= KB_MIN_ITEMS) {
+                const message = this.serializeInput({ brief, key_point: keyPoint, known }, this.extendProjection);
+                const text = await call(message, { promptFile: 'research-extend.md', schema: ResearchExtensionSchema, listener: null });
+                return this.combine(this.parse(text, ResearchExtensionSchema), known);
+            }
+            const message = this.serializeInput({ brief, key_point: keyPoint }, this.shardProjection);
+            const text = await call(message, { promptFile: 'research-point.md', listener: null });
+            return this.parse(text);
+        });
+    }
+
+    private merge(shards: ResearchPackage[]): ResearchPackage {
+        const merge = (pick: (shard: ResearchPackage) => string[] | undefined) =>
+            dedupeNear(shards.flatMap(shard => pick(shard) || []));
+        return {
+            key_facts: merge(s => s.key_facts),
+            key_questions_answered: merge(s => s.key_questions_answered),
+            supporting_examples: merge(s => s.supporting_examples),
+            counterarguments: merge(s => s.counterarguments),
+            suggested_sources: merge(s => s.suggested_sources),
+            research_gaps: merge(s => s.research_gaps),
+        };
+    }
+}
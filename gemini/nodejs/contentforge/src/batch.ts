@@ -0,0 +1,150 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import * as readline from 'readline';
+import { Writable } from 'stream';
+import chalk from 'chalk';
+import { Orchestrator, OrchestratorOptions, RunResult } from './orchestrator';
+import { Semaphore } from './utils/limit';
+
+export type TopicFormat = 'jsonl' | 'csv';
+
+export type BatchOptions = {
+    concurrency: number;
+    out?: string;
+    format?: TopicFormat;
+    // Passed to every Orchestrator (quiet is always on in batch mode)
+    orchestrator?: OrchestratorOptions;
+};
+
+export type BatchSummary = {
+    total: number;
+    published: number;
+    forced: number;
+    failed: number;
+    // Runs that reused a brief or research from an earlier run on a similar topic
+    reused: number;
+    duration_ms: number;
+};
+
+// Splits one CSV record, honouring double-quoted fields ("" escapes a quote).
+export function parseCsvLine(line: string): string[] {
+    const fields: string[] = [];
+    let current = '';
+    let quoted = false;
+    for (let i = 0; i < line.length; i++) {
+        const ch = line[i];
+        if (quoted) {
+            if (ch === '"' && line[i + 1] === '"') { current += '"'; i++; }
+            else if (ch === '"') quoted = false;
+            else current += ch;
+        } else if (ch === '"') {
+            quoted = true;
+        } else if (ch === ',') {
+            fields.push(current);
+            current = '';
+        } else {
+            current += ch;
+        }
+    }
+    fields.push(current);
+    return fields.map(f => f.trim());
+}
+
+/**
+ * Streams topics from a file without loading it into memory.
+ * JSONL lines may be a JSON string or an object with a `topic` field.
+ * CSV files use the `topic` column when a header names one, otherwise the first column.
+ */
+export async function* readTopics(file: string, format?: TopicFormat): AsyncGenerator<string> {
+    const fmt = format || (path.extname(file).toLowerCase() === '.csv' ? 'csv' : 'jsonl');
+    const lines = readline.createInterface({ input: fs.createReadStream(file), crlfDelay: Infinity });
+    let column = -1;
+    let lineNo = 0;
+
+    for await (const line of lines) {
+        lineNo++;
+        if (!line.trim()) continue;
+
+        if (fmt === 'jsonl') {
+            let value: any;
+            try {
+                value = JSON.parse(line);
+            } catch (e) {
+                throw new Error(`${file}:${lineNo}: invalid JSON`);
+            }
+            const topic = typeof value === 'string' ? value : value?.topic;
+            if (typeof topic !== 'string' || !topic.trim()) {
+                throw new Error(`${file}:${lineNo}: expected a string or an object with a "topic" field`);
+            }
+            yield topic.trim();
+            continue;
+        }
+
+        const fields = parseCsvLine(line);
+        if (column === -1) {
+            const header = fields.findIndex(f => f.toLowerCase() === 'topic');
+            column = header === -1 ? 0 : header;
+            if (header !== -1) continue;
+        }
+        if (fields[column]) yield fields[column];
+    }
+}
+
+function writeLine(stream: Writable, line: string): Promise<void> {
+    return new Promise(resolve => {
+        if (stream.write(line + '\n')) resolve();
+        else stream.once('drain', resolve);
+    });
+}
+
+/**
+ * Runs the pipeline for every topic in `file`, at most `concurrency` at a time,
+ * and writes one NDJSON result per topic as soon as it finishes.
+ */
+export async function runBatch(file: string, options: BatchOptions): Promise<BatchSummary> {
+    const start = Date.now();
+    const semaphore = new Semaphore(options.concurrency);
+    const out: Writable = options.out ? fs.createWriteStream(options.out, { flags: 'a' }) : process.stdout;
+    const summary: BatchSummary = { total: 0, published: 0, forced: 0, failed: 0, reused: 0, duration_ms: 0 };
+    const pending = new Set<Promise<void>>();
+    // Serializes writes so lines never interleave and backpressure is respected
+    let writing: Promise<void> = Promise.resolve();
+
+    const record = (res: RunResult) => {
+        if (res.status === 'published') summary.published++;
+        else if (res.status === 'published_forced') summary.forced++;
+        else summary.failed++;
+        if (res.reused) summary.reused++;
+        writing = writing.then(() => writeLine(out, JSON.stringify(res)));
+        const mark = res.status === 'failed' ? chalk.red('✗') : chalk.green('✓');
+        const source = res.reused?.research?.run_id || res.reused?.brief?.run_id;
+        const reused = source ? chalk.gray(`, reused ${source}`) : '';
+        console.error(`${mark} [${summary.published + summary.forced + summary.failed}/${summary.total}] ${res.topic} (${(res.duration_ms / 1000).toFixed(1)}s${reused})`);
+        return writing;
+    };
+
+    try {
+        for await (const topic of readTopics(file, options.format)) {
+            summary.total++;
+            // Blocking here keeps reading in step with completion, so memory stays bounded
+            const release = await semaphore.acquire();
+            const task = new Orchestrator({ ...options.orchestrator, quiet: true }).run(topic)
+                .then(record)
+                .finally(() => {
+                    release();
+                    pending.delete(task);
+                });
+            pending.add(task);
+        }
+        await Promise.all(pending);
+    } finally {
+        // Also when reading fails part-way: let started topics finish, flush their lines and close the file
+        await Promise.allSettled(pending);
+        await writing;
+        if (out !== process.stdout) {
+            await new Promise(resolve => out.end(resolve));
+        }
+    }
+    summary.duration_ms = Date.now() - start;
+    return summary;
+}
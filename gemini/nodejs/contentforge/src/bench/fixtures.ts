@@ -0,0 +1,168 @@
+import { ArticleOutline, ContentBrief, EditOperation } from '../types';
+import { splitSections } from '../utils/markdown';
+import { countWords } from '../utils/text';
+
+export type FixtureOptions = {
+    // Editor rejects drafts up to this draft_version, so redraft loops are exercised
+    editorRejections: number;
+    // Words per drafted article, split across the outline sections
+    articleWords: number;
+};
+
+const WORDS = [
+    'pipeline', 'latency', 'throughput', 'editor', 'research', 'signal', 'pattern', 'team', 'budget',
+    'system', 'reader', 'market', 'model', 'context', 'outcome', 'strategy', 'metric', 'review',
+    'practical', 'measured', 'reliable', 'concrete', 'careful', 'common', 'clear', 'early', 'steady',
+];
+
+// Deterministic filler: every sentence carries its own counter, so it is unique within an article
+function sentences(seed: string, words: number): string {
+    const out: string[] = [];
+    let n = 0;
+    let h = [...seed].reduce((acc, ch) => (acc * 31 + ch.charCodeAt(0)) >>> 0, 7);
+    while (n < words) {
+        const len = 8 + (h % 9);
+        const sentence: string[] = [];
+        for (let i = 0; i < len; i++) {
+            h = (h * 1103515245 + 12345) >>> 0;
+            sentence.push(WORDS[h % WORDS.length]);
+        }
+        sentence.push(`no. ${out.length + 1}`);
+        const text = sentence.join(' ');
+        out.push(text[0].toUpperCase() + text.slice(1) + '.');
+        n += sentence.length + 1;
+    }
+    return out.join(' ');
+}
+
+function list(prefix: string, count: number): string[] {
+    return Array.from({ length: count }, (_, i) => `${prefix} ${i + 1}: ${sentences(`${prefix}${i}`, 18)}`);
+}
+
+function brief(topic: string): ContentBrief {
+    return {
+        topic,
+        working_title: `A Practical Guide to ${topic}`,
+        target_audience: 'Engineering leads evaluating the approach',
+        purpose: `Explain ${topic} and when it pays off`,
+        angle: 'Evidence first, with concrete trade-offs',
+        content_type: 'Blog Post',
+        tone: ['clear', 'practical'],
+        key_points: [`What ${topic} is`, 'Why it matters now', 'How to adopt it', 'Common pitfalls', 'Measuring results'],
+        what_to_avoid: 'Hype and unsupported claims',
+        estimated_word_count: 1200,
+        success_criteria: ['Reader can explain the trade-offs', 'Reader knows the first step'],
+    };
+}
+
+function research(keyPoints: string[] = []) {
+    return {
+        key_facts: list('Fact', 8).concat(keyPoints.map(p => `Fact on ${p}`)),
+        key_questions_answered: list('Question', 5),
+        supporting_examples: list('Example', 4),
+        counterarguments: list('Counterpoint', 3),
+        suggested_sources: list('Source', 4),
+        research_gaps: list('Gap', 2),
+    };
+}
+
+function outline(b: ContentBrief, articleWords: number): ArticleOutline {
+    const per = Math.round(articleWords / b.key_points.length);
+    return {
+        sections: b.key_points.map(point => ({ heading: point, points: [`${point}: first`, `${point}: second`], estimated_words: per })),
+        intro_hook: sentences(`${b.topic} intro`, 40),
+        conclusion_cta: sentences(`${b.topic} outro`, 30),
+        total_estimated_words: articleWords,
+    };
+}
+
+function draft(input: any, articleWords: number) {
+    const o: ArticleOutline = input.outline;
+    const title = input.previousDraft?.title || input.brief?.working_title || 'Untitled';
+    const per = Math.round(articleWords / Math.max(1, o.sections.length));
+    const body = [
+        `# ${title}`,
+        o.intro_hook,
+        ...o.sections.map((s: any) => `## ${s.heading}\n\n${sentences(s.heading + (input.previousDraft?.draft_version ?? 0), per)}`),
+        o.conclusion_cta,
+    ].join('\n\n');
+    return { title, body, word_count: countWords(body), draft_version: (input.previousDraft?.draft_version ?? 0) + 1 };
+}
+
+function review(input: any, options: FixtureOptions) {
+    const passed = (input.draft?.draft_version ?? 1) > options.editorRejections;
+    const headings = splitSections(input.draft?.body || '').sections.map(s => s.heading);
+    const score = passed ? 8 : 6;
+    return {
+        edit_notes: passed ? 'Tightened wording.' : 'First section lacks evidence.',
+        quality_scores: { clarity: 8, accuracy: score, tone_match: 8, structure: 8 },
+        passed_quality_threshold: passed,
+        feedback_for_redraft: passed ? undefined : 'Support the opening section with concrete data.',
+        section_feedback: headings.map((heading, i) => ({
+            heading,
+            score: i === 0 ? score : 8,
+            feedback: i === 0 && !passed ? 'Add a statistic and an example.' : undefined,
+        })),
+    };
+}
+
+function edits(input: any): EditOperation[] {
+    const first = splitSections(input.draft?.body || '').sections[0];
+    return first ? [{ op: 'insert_after_heading', heading: first.heading, text: sentences('inserted', 25) }] : [];
+}
+
+/**
+ * A response that satisfies the schema the prompt asks for. The prompt is recognised by
+ * its first line (e.g. "# DraftAgent Section Prompt"); the user message is the agent's JSON input.
+ */
+export function fixtureResponse(systemPrompt: string, userMessage: string, options: FixtureOptions): unknown {
+    const title = systemPrompt.split('\n', 1)[0].replace(/^#\s*/, '');
+    let input: any = {};
+    try {
+        input = JSON.parse(userMessage);
+    } catch (e) { /* plain-text input */ }
+
+    switch (title) {
+        case 'BriefAgent System Prompt':
+            return brief(input.topic || userMessage);
+        case 'ResearchAgent System Prompt':
+            return research(input.key_points);
+        case 'ResearchAgent Facet Prompt':
+            return { items: list(input.facet?.name || 'Item', input.facet?.count || 5) };
+        case 'ResearchAgent Key Point Prompt':
+            return research([input.key_point]);
+        case 'ResearchAgent Extend Prompt':
+            // Keeps every retrieved item and adds one new fact per key point
+            return {
+                keep: (input.known || []).map((k: { id: string }) => k.id),
+                key_facts: (input.key_point ? [input.key_point] : input.brief?.key_points || []).map((p: string) => `New fact on ${p}`),
+                key_questions_answered: [],
+                supporting_examples: [],
+                counterarguments: [],
+                suggested_sources: [],
+            };
+        case 'OutlineAgent System Prompt':
+            return outline(input.brief, options.articleWords);
+        case 'DraftAgent System Prompt':
+            return draft(input, options.articleWords);
+        case 'DraftAgent Section Prompt':
+            return { heading: input.section?.heading, body: sentences(input.section?.heading + (input.current_body ? 'v2' : ''), input.section?.estimated_words || 200) };
+        case 'EditorAgent System Prompt':
+            return { title: input.draft?.title, body: input.draft?.body, word_count: input.draft?.word_count, ...review(input, options) };
+        case 'EditorAgent Patch Prompt':
+            return { edits: edits(input), ...review(input, options) };
+        case 'PublishAgent System Prompt':
+            return {
+                title: input.title,
+                description: sentences('description', 25),
+                tags: ['guide', 'engineering', 'practice'],
+                markdown: `---\ntitle: ${input.title}\n---\n\n${input.body}`,
+                word_count: input.word_count,
+                reading_time_minutes: Math.max(1, Math.round((input.word_count || 0) / 200)),
+            };
+        case 'PublishAgent Metadata Prompt':
+            return { description: sentences(`description ${input.title}`, 20), tags: ['guide', 'engineering', 'practice'] };
+        default:
+            throw new Error(`No fixture for prompt "${title}"`);
+    }
+}
@@ -0,0 +1,223 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { Orchestrator, OrchestratorOptions, RunResult } from '../orchestrator';
+import { runBatch } from '../batch';
+import { configureCache } from '../adapters/cache';
+import { transport, TransportStats } from '../adapters/transport';
+import { MockProviderServer, MockServerOptions, ServerStats } from './server';
+
+export type Scenario = 'single' | 'batch';
+
+export type BenchmarkOptions = {
+    scenarios: Scenario[];
+    // Sequential runs in the single scenario, topics in the batch scenario
+    runs: number;
+    topics: number;
+    concurrency: number;
+    provider: string;
+    label?: string;
+    server?: Partial<MockServerOptions>;
+    orchestrator?: OrchestratorOptions;
+};
+
+export type Percentiles = { count: number; p50: number; p90: number; p99: number; max: number };
+
+export type ScenarioReport = {
+    runs: number;
+    published: number;
+    failed: number;
+    wall_ms: number;
+    runs_per_minute: number;
+    requests_per_second: number;
+    peak_rss_mb: number;
+    run_ms: Percentiles;
+    // Runs by the reason their draft-edit loop ended (see critique.ts)
+    critique_stops: Record<string, number>;
+    stage_ms: Record<string, Percentiles>;
+    stage_ttft_ms: Record<string, Percentiles>;
+    // Bytes on the wire per prompt, as seen by the stand-in server
+    payload_bytes: Record<string, { requests: number; request: number; response: number }>;
+    injected_errors: Record<string, number>;
+    connections: TransportStats & { reuse_rate: number; avg_handshake_ms: number };
+};
+
+export type BenchmarkReport = {
+    label?: string;
+    created_at: string;
+    node: string;
+    platform: string;
+    options: BenchmarkOptions;
+    scenarios: Partial<Record<Scenario, ScenarioReport>>;
+};
+
+export function percentiles(values: number[]): Percentiles {
+    const sorted = [...values].sort((a, b) => a - b);
+    const at = (q: number) => sorted.length ? sorted[Math.min(sorted.length - 1, Math.ceil(q * sorted.length) - 1)] : 0;
+    return { count: sorted.length, p50: at(0.5), p90: at(0.9), p99: at(0.99), max: sorted[sorted.length - 1] ?? 0 };
+}
+
+function groupStages(results: RunResult[], pick: (s: RunResult['stages'][number]) => number | undefined): Record<string, Percentiles> {
+    const byAgent = new Map<string, number[]>();
+    for (const res of results) {
+        for (const stage of res.stages) {
+            const value = pick(stage);
+            if (value === undefined) continue;
+            byAgent.set(stage.agent, [...(byAgent.get(stage.agent) || []), value]);
+        }
+    }
+    return Object.fromEntries([...byAgent].map(([agent, values]) => [agent, percentiles(values)]));
+}
+
+// Samples RSS while a scenario runs; process-wide maxRSS can't be reset between scenarios.
+function trackRss(): () => number {
+    let peak = process.memoryUsage().rss;
+    const timer = setInterval(() => { peak = Math.max(peak, process.memoryUsage().rss); }, 25);
+    return () => {
+        clearInterval(timer);
+        return Math.max(peak, process.memoryUsage().rss) / (1024 * 1024);
+    };
+}
+
+function diffTraffic(before: ServerStats, after: ServerStats) {
+    const payload: ScenarioReport['payload_bytes'] = {};
+    for (const [prompt, t] of Object.entries(after.byPrompt)) {
+        const b = before.byPrompt[prompt] || { requests: 0, requestBytes: 0, responseBytes: 0 };
+        if (t.requests === b.requests) continue;
+        payload[prompt] = { requests: t.requests - b.requests, request: t.requestBytes - b.requestBytes, response: t.responseBytes - b.responseBytes };
+    }
+    const errors: Record<string, number> = {};
+    for (const [status, n] of Object.entries(after.errors)) {
+        if (n - (before.errors[status] || 0) > 0) errors[status] = n - (before.errors[status] || 0);
+    }
+    return { payload, errors, requests: after.requests - before.requests };
+}
+
+async function runScenario(scenario: Scenario, options: BenchmarkOptions, server: MockProviderServer, workDir: string): Promise<ScenarioReport> {
+    const before: ServerStats = JSON.parse(JSON.stringify(server.stats));
+    const connectionsBefore = { ...transport.stats };
+    const rss = trackRss();
+    const start = Date.now();
+    let results: RunResult[] = [];
+
+    if (scenario === 'single') {
+        for (let i = 0; i < options.runs; i++) {
+            results.push(await new Orchestrator({ ...options.orchestrator, quiet: true }).run(`benchmark topic ${i + 1}`));
+        }
+    } else {
+        const input = path.join(workDir, 'topics.jsonl');
+        const out = path.join(workDir, 'batch.ndjson');
+        fs.writeFileSync(input, Array.from({ length: options.topics }, (_, i) => JSON.stringify(`batch topic ${i + 1}`)).join('\n'));
+        fs.rmSync(out, { force: true });
+        await runBatch(input, { concurrency: options.concurrency, out, orchestrator: options.orchestrator });
+        results = fs.readFileSync(out, 'utf-8').split('\n').filter(Boolean).map(line => JSON.parse(line));
+    }
+
+    const wall = Date.now() - start;
+    const traffic = diffTraffic(before, server.stats);
+    const connections = Object.fromEntries(Object.entries(transport.stats)
+        .map(([k, v]) => [k, v - connectionsBefore[k as keyof TransportStats]])) as TransportStats;
+    return {
+        runs: results.length,
+        published: results.filter(r => r.status !== 'failed').length,
+        failed: results.filter(r => r.status === 'failed').length,
+        wall_ms: wall,
+        runs_per_minute: +(results.length / (wall / 60000)).toFixed(2),
+        requests_per_second: +(traffic.requests / (wall / 1000)).toFixed(2),
+        peak_rss_mb: +rss().toFixed(1),
+        run_ms: percentiles(results.map(r => r.duration_ms)),
+        critique_stops: results.reduce((stops: Record<string, number>, r) => {
+            if (r.critique) stops[r.critique.stop] = (stops[r.critique.stop] || 0) + 1;
+            return stops;
+        }, {}),
+        stage_ms: groupStages(results, s => s.ms),
+        stage_ttft_ms: groupStages(results, s => s.ttft_ms),
+        payload_bytes: traffic.payload,
+        injected_errors: traffic.errors,
+        connections: {
+            ...connections,
+            reuse_rate: connections.requests ? +(connections.reused / connections.requests).toFixed(3) : 0,
+            avg_handshake_ms: connections.connections ? +(connections.handshakeMs / connections.connections).toFixed(1) : 0,
+        },
+    };
+}
+
+/**
+ * Runs the pipeline against a local stand-in for the provider APIs (see server.ts), with the
+ * response cache, topic reuse and research knowledge base off, and reports latency percentiles
+ * per stage, bytes per prompt, peak RSS and throughput. Runs happen in a temporary working directory, so `output/` is untouched.
+ */
+export async function runBenchmark(options: BenchmarkOptions): Promise<BenchmarkReport> {
+    const server = new MockProviderServer(options.server);
+    const origin = await server.start();
+    // Runs happen in a temporary directory, so point them at the project's cascades
+    const config = path.resolve(process.env.CONTENTFORGE_CONFIG || 'contentforge.config.json');
+    const env = {
+        ...(fs.existsSync(config) ? { CONTENTFORGE_CONFIG: config } : {}),
+        ...MockProviderServer.baseUrls(origin),
+        DEFAULT_PROVIDER: options.provider,
+        OPENAI_API_KEY: 'bench', ANTHROPIC_API_KEY: 'bench', GOOGLE_API_KEY: 'bench', XAI_API_KEY: 'bench',
+        // Benchmark topics differ only in a number, so every run would reuse the first one's research
+        CONTENTFORGE_REUSE: 'off',
+        CONTENTFORGE_RESEARCH_KB: 'off',
+    };
+    const saved = Object.fromEntries(Object.keys(env).map(k => [k, process.env[k]]));
+    Object.assign(process.env, env);
+    configureCache({ mode: 'off' });
+
+    const cwd = process.cwd();
+    const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-bench-'));
+    process.chdir(workDir);
+    const report: BenchmarkReport = {
+        label: options.label,
+        created_at: new Date().toISOString(),
+        node: process.version,
+        platform: `${process.platform}-${process.arch}`,
+        options,
+        scenarios: {},
+    };
+    try {
+        for (const scenario of options.scenarios) {
+            report.scenarios[scenario] = await runScenario(scenario, options, server, workDir);
+        }
+    } finally {
+        process.chdir(cwd);
+        fs.rmSync(workDir, { recursive: true, force: true });
+        for (const [k, v] of Object.entries(saved)) {
+            if (v === undefined) delete process.env[k];
+            else process.env[k] = v;
+        }
+        await server.stop();
+    }
+    return report;
+}
+
+export type Regression = { metric: string; baseline: number; current: number; change_pct: number };
+
+// Flattens the numbers worth tracking between versions and reports the relative change of each.
+export function compareReports(baseline: BenchmarkReport, current: BenchmarkReport): Regression[] {
+    const flatten = (report: BenchmarkReport) => {
+        const out: Record<string, number> = {};
+        for (const [name, s] of Object.entries(report.scenarios)) {
+            if (!s) continue;
+            out[`${name}.run_ms.p50`] = s.run_ms.p50;
+            out[`${name}.run_ms.p90`] = s.run_ms.p90;
+            out[`${name}.runs_per_minute`] = s.runs_per_minute;
+            out[`${name}.peak_rss_mb`] = s.peak_rss_mb;
+            out[`${name}.connections.opened`] = s.connections.connections;
+            for (const [agent, p] of Object.entries(s.stage_ms)) out[`${name}.stage_ms.${agent}.p50`] = p.p50;
+            for (const [prompt, b] of Object.entries(s.payload_bytes)) out[`${name}.request_bytes.${prompt}`] = b.request;
+        }
+        return out;
+    };
+    const before = flatten(baseline);
+    const after = flatten(current);
+    return Object.keys(after)
+        .filter(metric => metric in before)
+        .map(metric => ({
+            metric,
+            baseline: before[metric],
+            current: after[metric],
+            change_pct: before[metric] ? +(((after[metric] - before[metric]) / before[metric]) * 100).toFixed(1) : 0,
+        }));
+}
@@ -0,0 +1,234 @@
+import * as http from 'http';
+import { AddressInfo } from 'net';
+import { fixtureResponse, FixtureOptions } from './fixtures';
+
+export type MockServerOptions = FixtureOptions & {
+    // Time to first token: log-normal around the median, `jitter` is the log-space standard deviation
+    latencyMs: number;
+    jitter: number;
+    // Median time to first token for individual providers (openai, xai, anthropic, gemini)
+    providerLatencyMs?: Record<string, number>;
+    // Output speed once the first token is out (~4 characters per token)
+    tokensPerSecond: number;
+    // Share of requests answered with 429 / 5xx instead of a completion
+    rate429: number;
+    rate5xx: number;
+    seed: number;
+};
+
+export const DEFAULT_MOCK_OPTIONS: MockServerOptions = {
+    latencyMs: 400,
+    jitter: 0.3,
+    tokensPerSecond: 80,
+    rate429: 0,
+    rate5xx: 0,
+    seed: 1,
+    editorRejections: 1,
+    articleWords: 1200,
+};
+
+export type AgentTraffic = {
+    requests: number;
+    requestBytes: number;
+    responseBytes: number;
+};
+
+export type ServerStats = {
+    requests: number;
+    errors: Record<string, number>;
+    byPrompt: Record<string, AgentTraffic>;
+};
+
+// `tool`: the forced tool of an Anthropic tool-use request, answered with a tool_use block
+type Completion = { systemPrompt: string; userMessage: string; stream: boolean; tool?: string };
+type Dialect = 'openai' | 'anthropic' | 'gemini';
+
+// mulberry32: small seeded PRNG, so a benchmark config always injects the same latencies and errors
+function random(seed: number): () => number {
+    let a = seed >>> 0;
+    return () => {
+        a = (a + 0x6D2B79F5) >>> 0;
+        let t = a;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * Local stand-in for the four provider APIs. Each provider lives under its own path prefix,
+ * matching the adapters' base URLs (see `baseUrls()`):
+ *   /openai/v1/chat/completions, /xai/v1/chat/completions, /anthropic/v1/messages,
+ *   /gemini/v1beta/models/<model>:generateContent | :streamGenerateContent?alt=sse
+ * Responses come from `fixtureResponse`, paced by the configured latency and token rate.
+ */
+export class MockProviderServer {
+    private server: http.Server;
+    private options: MockServerOptions;
+    private rand: () => number;
+    readonly stats: ServerStats = { requests: 0, errors: {}, byPrompt: {} };
+
+    constructor(options: Partial<MockServerOptions> = {}) {
+        this.options = { ...DEFAULT_MOCK_OPTIONS, ...options };
+        this.rand = random(this.options.seed);
+        this.server = http.createServer((req, res) => {
+            this.handle(req, res).catch(error => {
+                if (!res.headersSent) res.writeHead(500, { 'content-type': 'application/json' });
+                res.end(JSON.stringify({ error: { message: String(error) } }));
+            });
+        });
+    }
+
+    async start(port: number = 0): Promise<string> {
+        await new Promise<void>(resolve => this.server.listen(port, '127.0.0.1', resolve));
+        return `http://127.0.0.1:${(this.server.address() as AddressInfo).port}`;
+    }
+
+    async stop(): Promise<void> {
+        this.server.closeAllConnections?.();
+        await new Promise(resolve => this.server.close(resolve));
+    }
+
+    // Base-URL environment variables that point every adapter at this server
+    static baseUrls(origin: string): Record<string, string> {
+        return {
+            OPENAI_BASE_URL: `${origin}/openai/v1`,
+            XAI_BASE_URL: `${origin}/xai/v1`,
+            ANTHROPIC_BASE_URL: `${origin}/anthropic/v1`,
+            GEMINI_BASE_URL: `${origin}/gemini/v1beta`,
+        };
+    }
+
+    private async handle(req: http.IncomingMessage, res: http.ServerResponse) {
+        // Connection warm-up (see ProviderTransport.preconnect)
+        if (req.method === 'HEAD') {
+            res.writeHead(204);
+            res.end();
+            return;
+        }
+        const chunks: Buffer[] = [];
+        for await (const chunk of req) chunks.push(chunk as Buffer);
+        const raw = Buffer.concat(chunks).toString('utf-8');
+        const url = new URL(req.url || '/', 'http://localhost');
+
+        let dialect: Dialect;
+        if (/^\/(openai|xai)\/v1\/chat\/completions$/.test(url.pathname)) dialect = 'openai';
+        else if (url.pathname === '/anthropic/v1/messages') dialect = 'anthropic';
+        else if (/^\/gemini\/v1beta\/models\/[^/]+:(stream)?[gG]enerateContent$/.test(url.pathname)) dialect = 'gemini';
+        else return this.fail(res, 404, 'not_found');
+
+        const completion = this.parseRequest(dialect, raw, url);
+        const prompt = completion.systemPrompt.split('\n', 1)[0].replace(/^#\s*/, '');
+        this.stats.requests++;
+        const traffic = this.stats.byPrompt[prompt] || (this.stats.byPrompt[prompt] = { requests: 0, requestBytes: 0, responseBytes: 0 });
+        traffic.requests++;
+        traffic.requestBytes += Buffer.byteLength(raw);
+
+        const median = this.options.providerLatencyMs?.[url.pathname.split('/')[1]] ?? this.options.latencyMs;
+        const ttft = median * Math.exp(this.options.jitter * this.gaussian());
+        const roll = this.rand();
+        if (roll < this.options.rate429) {
+            await sleep(ttft / 4);
+            return this.fail(res, 429, 'rate_limit_exceeded', { 'retry-after': '1' });
+        }
+        if (roll < this.options.rate429 + this.options.rate5xx) {
+            await sleep(ttft);
+            return this.fail(res, this.rand() < 0.5 ? 500 : 503, 'server_error');
+        }
+
+        const text = JSON.stringify(fixtureResponse(completion.systemPrompt, completion.userMessage, this.options));
+        const usage = { input: Math.ceil((completion.systemPrompt.length + completion.userMessage.length) / 4), output: Math.ceil(text.length / 4) };
+        traffic.responseBytes += Buffer.byteLength(text);
+        const charsPerMs = this.options.tokensPerSecond * 4 / 1000;
+        await sleep(ttft);
+
+        if (!completion.stream) {
+            await sleep(text.length / charsPerMs);
+            res.writeHead(200, { 'content-type': 'application/json' });
+            res.end(JSON.stringify(this.envelope(dialect, text, usage, completion.tool)));
+            return;
+        }
+
+        res.writeHead(200, { 'content-type': 'text/event-stream', 'cache-control': 'no-cache' });
+        if (dialect === 'anthropic') this.event(res, { type: 'message_start', message: { usage: { input_tokens: usage.input, output_tokens: 1 } } }, 'message_start');
+        // ~50 chunks a second, each carrying the text generated since the last one
+        const tickMs = 20;
+        const perTick = Math.max(1, Math.round(charsPerMs * tickMs));
+        for (let at = 0; at < text.length; at += perTick) {
+            this.event(res, this.delta(dialect, text.slice(at, at + perTick), completion.tool), dialect === 'anthropic' ? 'content_block_delta' : undefined);
+            if (at + perTick < text.length) await sleep(tickMs);
+        }
+        if (dialect === 'anthropic') {
+            this.event(res, { type: 'message_delta', delta: { stop_reason: 'end_turn' }, usage: { output_tokens: usage.output } }, 'message_delta');
+            this.event(res, { type: 'message_stop' }, 'message_stop');
+        }
+        if (dialect === 'gemini') this.event(res, { candidates: [{ content: { parts: [], role: 'model' }, finishReason: 'STOP' }], usageMetadata: this.usage(dialect, usage) });
+        if (dialect === 'openai') {
+            this.event(res, { choices: [], usage: this.usage(dialect, usage) });
+            res.write('data: [DONE]\n\n');
+        }
+        res.end();
+    }
+
+    private parseRequest(dialect: Dialect, raw: string, url: URL): Completion {
+        const body = JSON.parse(raw);
+        if (dialect === 'openai') {
+            return {
+                systemPrompt: body.messages.find((m: any) => m.role === 'system')?.content || '',
+                userMessage: body.messages.find((m: any) => m.role === 'user')?.content || '',
+                stream: !!body.stream,
+            };
+        }
+        if (dialect === 'anthropic') {
+            return { systemPrompt: body.system || '', userMessage: body.messages[0]?.content || '', stream: !!body.stream, tool: body.tool_choice?.name };
+        }
+        // The Gemini adapter sends one text part: system prompt, then "Human: " and the input
+        const text: string = body.contents[0].parts[0].text;
+        const split = text.lastIndexOf('\n\nHuman: ');
+        return {
+            systemPrompt: split === -1 ? text : text.slice(0, split),
+            userMessage: split === -1 ? '' : text.slice(split + '\n\nHuman: '.length),
+            stream: url.pathname.includes(':streamGenerateContent'),
+        };
+    }
+
+    private usage(dialect: Dialect, usage: { input: number; output: number }): unknown {
+        if (dialect === 'openai') return { prompt_tokens: usage.input, completion_tokens: usage.output, total_tokens: usage.input + usage.output };
+        if (dialect === 'anthropic') return { input_tokens: usage.input, output_tokens: usage.output };
+        return { promptTokenCount: usage.input, candidatesTokenCount: usage.output, totalTokenCount: usage.input + usage.output };
+    }
+
+    private envelope(dialect: Dialect, text: string, usage: { input: number; output: number }, tool?: string): unknown {
+        if (dialect === 'openai') return { choices: [{ index: 0, message: { role: 'assistant', content: text }, finish_reason: 'stop' }], usage: this.usage(dialect, usage) };
+        if (dialect === 'anthropic' && tool) {
+            return { type: 'message', content: [{ type: 'tool_use', id: 'toolu_bench', name: tool, input: JSON.parse(text) }], stop_reason: 'tool_use', usage: this.usage(dialect, usage) };
+        }
+        if (dialect === 'anthropic') return { type: 'message', content: [{ type: 'text', text }], stop_reason: 'end_turn', usage: this.usage(dialect, usage) };
+        return { candidates: [{ content: { parts: [{ text }], role: 'model' }, finishReason: 'STOP' }], usageMetadata: this.usage(dialect, usage) };
+    }
+
+    private delta(dialect: Dialect, text: string, tool?: string): unknown {
+        if (dialect === 'openai') return { choices: [{ index: 0, delta: { content: text } }] };
+        if (dialect === 'anthropic' && tool) return { type: 'content_block_delta', index: 0, delta: { type: 'input_json_delta', partial_json: text } };
+        if (dialect === 'anthropic') return { type: 'content_block_delta', index: 0, delta: { type: 'text_delta', text } };
+        return { candidates: [{ content: { parts: [{ text }], role: 'model' } }] };
+    }
+
+    private event(res: http.ServerResponse, data: unknown, event?: string) {
+        res.write(`${event ? `event: ${event}\n` : ''}data: ${JSON.stringify(data)}\n\n`);
+    }
+
+    private fail(res: http.ServerResponse, status: number, code: string, headers: Record<string, string> = {}) {
+        this.stats.errors[status] = (this.stats.errors[status] || 0) + 1;
+        res.writeHead(status, { 'content-type': 'application/json', ...headers });
+        res.end(JSON.stringify({ error: { type: code, message: `Injected ${status} from the benchmark server` } }));
+    }
+
+    // Standard normal sample (Box-Muller)
+    private gaussian(): number {
+        const u = 1 - this.rand();
+        return Math.sqrt(-2 * Math.log(u)) * Math.cos(2 * Math.PI * this.rand());
+    }
+}
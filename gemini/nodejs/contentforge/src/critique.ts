@@ -0,0 +1,116 @@
+import { CallUsage } from './metrics';
+import { ArtifactRef, EditedArticle } from './types';
+
+// Why the draft-edit loop ended
+export type StopReason = 'passed' | 'max_attempts' | 'converged' | 'time_budget' | 'token_budget';
+
+export const STOP_MESSAGES: Record<StopReason, string> = {
+    passed: 'Quality threshold met.',
+    max_attempts: 'Maximum redraft attempts reached.',
+    converged: 'Scores stopped improving.',
+    time_budget: 'Another redraft would overrun the time budget.',
+    token_budget: 'Another redraft would overrun the token budget.',
+};
+
+export type CritiqueBudget = {
+    // Redrafts after the first edit
+    maxRedrafts: number;
+    // Wall-clock time and provider tokens (input + output) for the whole run; undefined: no limit
+    timeMs?: number;
+    tokens?: number;
+    // Rise in the mean quality score that counts as progress (a higher lowest score always
+    // does); a redraft that doesn't beat the best edit so far ends the loop
+    minGain: number;
+};
+
+// One edited version of the article, from the edit pass `attempt`
+export type Candidate = { attempt: number; edited: EditedArticle; ref: ArtifactRef };
+
+export type CritiqueOutcome = {
+    stop: StopReason;
+    edits: number;
+    // Edit pass whose version is published, and the mean quality score of every pass
+    best: number;
+    scores: number[];
+};
+
+export function meanScore(edited: EditedArticle): number {
+    const scores = Object.values(edited.quality_scores);
+    return scores.reduce((sum, s) => sum + s, 0) / scores.length;
+}
+
+function lowestScore(edited: EditedArticle): number {
+    return Math.min(...Object.values(edited.quality_scores));
+}
+
+// Passed first, then the higher lowest score (what the pass mark applies to), then the higher mean
+function better(a: Candidate, b: Candidate): boolean {
+    if (a.edited.passed_quality_threshold !== b.edited.passed_quality_threshold) return a.edited.passed_quality_threshold;
+    if (lowestScore(a.edited) !== lowestScore(b.edited)) return lowestScore(a.edited) > lowestScore(b.edited);
+    return meanScore(a.edited) > meanScore(b.edited);
+}
+
+/**
+ * Decides when the draft-edit loop stops and which version gets published. Every edited
+ * version is kept; the loop ends when one passes, when the redrafts run out, when a redraft
+ * doesn't improve on the best version so far, or when another redraft and edit (estimated
+ * from the last one) would overrun the run's time or token budget. The best version is
+ * published even when a later one scored lower.
+ */
+export class CritiqueLoop {
+    private budget: CritiqueBudget;
+    private usage: CallUsage;
+    private runStart: number;
+    private candidates: Candidate[] = [];
+    // Time and tokens spent on the most recent draft and its edit, and where the next one starts
+    private cycle = { ms: 0, tokens: 0 };
+    private cycleStart: { at: number; tokens: number };
+
+    // `usage` is the run's own (see MetricsRegistry.track), started at `runStart`
+    constructor(budget: CritiqueBudget, usage: CallUsage, runStart: number) {
+        this.budget = budget;
+        this.usage = usage;
+        this.runStart = runStart;
+        this.cycleStart = { at: Date.now(), tokens: this.tokens() };
+    }
+
+    /** Adds an edited version; returns why the loop should stop, or undefined to redraft it. */
+    add(candidate: Candidate): StopReason | undefined {
+        const previousBest = this.candidates.length ? this.best() : undefined;
+        this.candidates.push(candidate);
+        const now = { at: Date.now(), tokens: this.tokens() };
+        this.cycle = { ms: now.at - this.cycleStart.at, tokens: now.tokens - this.cycleStart.tokens };
+        this.cycleStart = now;
+
+        if (candidate.edited.passed_quality_threshold) return 'passed';
+        if (candidate.attempt >= this.budget.maxRedrafts) return 'max_attempts';
+        if (previousBest && !this.improves(candidate, previousBest)) return 'converged';
+        const { timeMs, tokens } = this.budget;
+        if (timeMs !== undefined && now.at - this.runStart + this.cycle.ms > timeMs) return 'time_budget';
+        if (tokens !== undefined && now.tokens + this.cycle.tokens > tokens) return 'token_budget';
+        return undefined;
+    }
+
+    // The version to publish (the latest among equals, as it has had the most feedback)
+    best(): Candidate {
+        return this.candidates.reduce((best, c) => better(best, c) ? best : c);
+    }
+
+    outcome(stop: StopReason): CritiqueOutcome {
+        return {
+            stop,
+            edits: this.candidates.length,
+            best: this.best().attempt,
+            scores: this.candidates.map(c => +meanScore(c.edited).toFixed(2)),
+        };
+    }
+
+    private improves(candidate: Candidate, best: Candidate): boolean {
+        return lowestScore(candidate.edited) > lowestScore(best.edited)
+            || meanScore(candidate.edited) - meanScore(best.edited) >= Math.max(this.budget.minGain, Number.EPSILON);
+    }
+
+    private tokens(): number {
+        return this.usage.inputTokens + this.usage.outputTokens;
+    }
+}
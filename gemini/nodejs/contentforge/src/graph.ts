@@ -0,0 +1,122 @@
+import { canonicalJSON } from './store/artifacts';
+import { CallUsage, emptyUsage, metrics, SpeculationOutcome } from './metrics';
+import { trace } from './metrics/trace';
+
+export type SpeculationSpec<S, D extends keyof S, I, T> = {
+    // Stage name in metrics and traces
+    name: string;
+    // Agent doing the work
+    agent: string;
+    after: D[];
+    // The input the stage is expected to get, from the results it depends on
+    guess: (inputs: Pick<S, D>) => I;
+    // `signal` is aborted when the speculation is discarded, so its calls stop costing anything
+    run: (input: I, signal: AbortSignal) => Promise<T>;
+    // Whether a result computed from `guessed` holds for `actual` (default: equal inputs)
+    matches?: (guessed: I, actual: I) => boolean;
+};
+
+/**
+ * Work started before its real input is known. `commit` hands out the result when the guessed
+ * input matches the real one; otherwise (or if the guess failed) the work is discarded and its
+ * signal aborted. Either way the outcome is recorded once the work has settled, with the calls
+ * discarded work made.
+ */
+export class Speculation<I, T> {
+    readonly name: string;
+    private agent: string;
+    private guessed: Promise<I>;
+    private result: Promise<T>;
+    private matches: (guessed: I, actual: I) => boolean;
+    private usage: CallUsage = emptyUsage();
+    private outcome?: SpeculationOutcome;
+    private controller = new AbortController();
+
+    constructor(name: string, agent: string, guessed: Promise<I>, run: (input: I, signal: AbortSignal) => Promise<T>, matches: (guessed: I, actual: I) => boolean) {
+        this.name = name;
+        this.agent = agent;
+        this.guessed = guessed;
+        this.matches = matches;
+        this.result = guessed.then(input => metrics.track(this.usage, () => trace(`${name} (speculative)`, 'stage', () => run(input, this.controller.signal))));
+        // Failures only mean the stage runs for real
+        this.result.catch(() => {});
+    }
+
+    /** The speculative result if it holds for `actual`; undefined once discarded. */
+    async commit(actual: I): Promise<T | undefined> {
+        if (this.outcome) return undefined;
+        try {
+            if (this.matches(await this.guessed, actual)) {
+                const value = await this.result;
+                this.settle('committed');
+                return value;
+            }
+        } catch (e) { /* the guess or the work itself failed */ }
+        this.discard();
+        return undefined;
+    }
+
+    // Gives up on the work (its input turned out different, or nothing will commit it) and cancels it
+    discard() {
+        if (this.outcome) return;
+        this.settle('discarded');
+        this.controller.abort();
+    }
+
+    private settle(outcome: SpeculationOutcome) {
+        this.outcome = outcome;
+        // Discarded work may still be running; its calls are counted when it ends
+        const record = () => metrics.recordSpeculation(this.name, this.agent, outcome, this.usage);
+        this.result.then(record, record);
+    }
+}
+
+/**
+ * A small dependency-graph executor for the stages of a run. Each stage names the stages whose
+ * results it needs and starts as soon as all of them have finished, so stages that don't
+ * depend on each other run concurrently. A stage's dependencies must already be in the graph.
+ * Speculative stages (`speculate`) start on a guess at their input and are committed or
+ * discarded by whoever needs their result.
+ */
+export class StageGraph<S extends Record<string, unknown>> {
+    private tasks = new Map<keyof S, Promise<unknown>>();
+    private speculations: { discard(): void }[] = [];
+
+    add<K extends keyof S, D extends keyof S = never>(name: K, after: D[], run: (inputs: Pick<S, D>) => Promise<S[K]> | S[K]): Promise<S[K]> {
+        if (this.tasks.has(name)) throw new Error(`Stage "${String(name)}" is already in the graph`);
+        const task = this.inputs(after).then(run);
+        // Failures reach whoever awaits the stage (or `settled`), not the unhandled-rejection handler
+        task.catch(() => {});
+        this.tasks.set(name, task);
+        return task;
+    }
+
+    get<K extends keyof S>(name: K): Promise<S[K]> {
+        const task = this.tasks.get(name);
+        if (!task) throw new Error(`Stage "${String(name)}" is not in the graph`);
+        return task as Promise<S[K]>;
+    }
+
+    speculate<D extends keyof S, I, T>(spec: SpeculationSpec<S, D, I, T>): Speculation<I, T> {
+        const matches = spec.matches || ((guessed: I, actual: I) => canonicalJSON(guessed) === canonicalJSON(actual));
+        const speculation = new Speculation(spec.name, spec.agent, this.inputs(spec.after).then(spec.guess), spec.run, matches);
+        this.speculations.push(speculation);
+        return speculation;
+    }
+
+    /** Waits for every stage, rejecting with the first failure, and discards uncommitted speculation. */
+    async settled(): Promise<void> {
+        try {
+            await Promise.all(this.tasks.values());
+        } finally {
+            for (const speculation of this.speculations) speculation.discard();
+        }
+    }
+
+    private async inputs<D extends keyof S>(after: D[]): Promise<Pick<S, D>> {
+        const values = await Promise.all(after.map(dep => this.get(dep)));
+        const inputs = {} as Pick<S, D>;
+        after.forEach((dep, i) => { inputs[dep] = values[i]; });
+        return inputs;
+    }
+}
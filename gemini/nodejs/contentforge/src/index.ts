@@ -1,12 +1,85 @@
 #!/usr/bin/env node
-import { Command } from 'commander';
+import { Command, InvalidArgumentError, Option } from 'commander';
 import * as dotenv from 'dotenv';
 import { Orchestrator } from './orchestrator';
 import { BriefAgent } from './agents/brief';
+import { configureCache } from './adapters/cache';
+import { runBatch } from './batch';
+import { OrchestratorOptions } from './orchestrator';
+import { compareReports, runBenchmark, Scenario } from './bench';
+import { MetricsRegistry, formatSpeculation, formatSummary, metrics as liveMetrics } from './metrics';
+import * as fs from 'fs';
 import chalk from 'chalk';
 
 dotenv.config();
 
+// Parser for numeric flags; commander reports the error and exits on anything else
+function number(value: string): number {
+  const n = Number(value);
+  if (!value.trim() || !Number.isFinite(n) || n < 0) throw new InvalidArgumentError('Expected a non-negative number.');
+  return n;
+}
+
+// Parser for whole-number flags (e.g. a seed)
+function integer(value: string): number {
+  const n = number(value);
+  if (!Number.isInteger(n)) throw new InvalidArgumentError('Expected a whole number.');
+  return n;
+}
+
+// Parser for counts that must be at least 1 (e.g. concurrency)
+function count(value: string): number {
+  const n = integer(value);
+  if (n < 1) throw new InvalidArgumentError('Expected a positive whole number.');
+  return n;
+}
+
+// Parser for name=number lists (e.g. openai=2000,anthropic=300)
+function numberMap(value: string): Record<string, number> {
+  return Object.fromEntries(value.split(',').map(pair => {
+    const [name, n = ''] = pair.split('=');
+    return [name.trim(), number(n)];
+  }));
+}
+
+type PipelineOption = { flags: string; description: string; parse?: (value: string) => number; choices?: string[] };
+
+// Pipeline flags taken by `run`, `resume`, `batch` and `bench`, read by pipelineOptions
+const PIPELINE_OPTIONS: PipelineOption[] = [
+  { flags: '--no-cache', description: 'Always call the provider, bypassing the LLM response cache' },
+  { flags: '--cache-only', description: 'Only use cached LLM responses; fail on a cache miss' },
+  { flags: '--draft-mode <mode>', description: 'single (one call) or sections (outline sections drafted in parallel)', choices: ['single', 'sections'] },
+  { flags: '--research-mode <mode>', description: 'single (one call), facets (one call per list) or key_points (one call per key point)', choices: ['single', 'facets', 'key_points'] },
+  { flags: '--redraft-mode <mode>', description: 'full (rewrite the whole draft) or sections (rewrite only sections the editor scored low)', choices: ['full', 'sections'] },
+  { flags: '--editor-mode <mode>', description: 'full (editor returns the whole body) or patch (editor returns edit operations)', choices: ['full', 'patch'] },
+  { flags: '--publish-mode <mode>', description: 'hybrid (formatted locally, model writes description and tags), local (no model call) or llm (model formats the article)', choices: ['hybrid', 'local', 'llm'] },
+  { flags: '--speculate <mode>', description: 'on (publish metadata written from the outline during drafting), eager (also publish each draft during its edit, llm publish mode) or off', choices: ['on', 'eager', 'off'] },
+  { flags: '--max-redrafts <n>', description: 'Redrafts after the first edit before the best version is published (default 3)', parse: number },
+  { flags: '--time-budget <seconds>', description: 'No redraft starts that would likely take the run past this time', parse: number },
+  { flags: '--token-budget <n>', description: 'No redraft starts that would likely take the run past this many tokens', parse: number },
+  { flags: '--min-gain <points>', description: 'Rise in the mean editor score a redraft must bring to keep redrafting (default 0.25)', parse: number },
+  { flags: '--no-reuse', description: 'Generate the brief and research from scratch even for near-duplicates of earlier topics' },
+];
+
+// Adds the pipeline flags to `command`, except those listed in `skip` (e.g. '--no-reuse')
+function withPipelineOptions(command: Command, skip: string[] = []): Command {
+  for (const option of PIPELINE_OPTIONS) {
+    if (skip.includes(option.flags.split(' ')[0])) continue;
+    const added = new Option(option.flags, option.description);
+    if (option.parse) added.argParser(option.parse);
+    if (option.choices) added.choices(option.choices);
+    command.addOption(added);
+  }
+  return command;
+}
+
+function pipelineOptions(options: any): OrchestratorOptions {
+  configureCache({ mode: options.cacheOnly ? 'only' : options.cache ? 'readwrite' : 'off' });
+  return { draftMode: options.draftMode, researchMode: options.researchMode, redraftMode: options.redraftMode, editorMode: options.editorMode, publishMode: options.publishMode, reuse: options.reuse === false ? false : undefined, speculate: options.speculate,
+    maxRedrafts: options.maxRedrafts, timeBudgetMs: options.timeBudget === undefined ? undefined : options.timeBudget * 1000,
+    tokenBudget: options.tokenBudget, minGain: options.minGain };
+}
+
 const program = new Command();
 
 program
@@ -14,13 +87,129 @@ program
   .description('AI Content Generation Pipeline')
   .version('1.0.0');
 
-program
+withPipelineOptions(program
   .command('run')
   .description('Run the full content generation pipeline')
-  .argument('<topic>', 'The raw topic or idea')
-  .action(async (topic) => {
-    const orchestrator = new Orchestrator();
-    await orchestrator.run(topic);
+  .argument('<topic>', 'The raw topic or idea'))
+  .option('--profile [file]', 'Write a Chrome trace of the run (default: output/<runId>/trace.json)')
+  .action(async (topic, options) => {
+    const orchestrator = new Orchestrator({ ...pipelineOptions(options), profile: options.profile });
+    const result = await orchestrator.run(topic);
+    if (result.status === 'failed') process.exitCode = 1;
+  });
+
+withPipelineOptions(program
+  .command('resume')
+  .description('Continue an interrupted or failed run, reusing its completed stages; pipeline flags override the run\'s own (stages built with other settings are rerun)')
+  .argument('<runId>', 'Run ID (the directory name under output/)'), ['--no-reuse'])
+  .action(async (runId, options) => {
+    const manifest = Orchestrator.loadManifest(runId);
+    if (!manifest?.topic) {
+      console.error(chalk.red(`No resumable run ${runId} (expected output/${runId}/manifest.json)`));
+      process.exitCode = 1;
+      return;
+    }
+    // Flags given on the command line win over the modes the run was started with
+    const overrides = Object.fromEntries(Object.entries(pipelineOptions(options)).filter(([, v]) => v !== undefined));
+    const orchestrator = new Orchestrator({ ...manifest.options, ...overrides, runId });
+    const result = await orchestrator.run(manifest.topic);
+    if (result.status === 'failed') process.exitCode = 1;
+  });
+
+withPipelineOptions(program
+  .command('batch')
+  .description('Run the pipeline for every topic in a JSONL or CSV file')
+  .argument('<file>', 'JSONL (one topic string or {"topic": ...} per line) or CSV with a topic column')
+  .option('-c, --concurrency <n>', 'Maximum number of topics processed at once', count, 4)
+  .option('-o, --out <file>', 'Append NDJSON results to this file instead of stdout')
+  .option('--format <format>', 'Input format: jsonl or csv (default: from the file extension)'))
+  .action(async (file, options) => {
+    const orchestrator = pipelineOptions(options);
+    const summary = await runBatch(file, {
+        concurrency: options.concurrency,
+        out: options.out,
+        format: options.format,
+        orchestrator,
+    });
+    for (const line of formatSummary(liveMetrics.summary())) console.error(chalk.gray(line));
+    for (const line of formatSpeculation(liveMetrics.speculationSummary())) console.error(chalk.gray(line));
+    console.error(chalk.blue.bold(`\nBatch finished in ${(summary.duration_ms / 1000).toFixed(1)}s: ${summary.published} published, ${summary.forced} forced, ${summary.failed} failed (${summary.total} topics, ${summary.reused} reused earlier runs)`));
+    if (summary.failed > 0) process.exitCode = 1;
+  });
+
+withPipelineOptions(program
+  .command('bench')
+  .description('Benchmark the pipeline offline against a local stand-in for the provider APIs')
+  .option('-s, --scenario <name>', 'single, batch or all', 'all')
+  .option('-n, --runs <n>', 'Sequential runs in the single scenario', count, 3)
+  .option('-t, --topics <n>', 'Topics in the batch scenario', count, 8)
+  .option('-c, --concurrency <n>', 'Batch concurrency', count, 4)
+  .option('-p, --provider <name>', 'API dialect to exercise: openai, anthropic, gemini or xai', 'openai')
+  .option('--latency <ms>', 'Median time to first token', number, 400)
+  .option('--jitter <sigma>', 'Log-normal spread of the time to first token', number, 0.3)
+  .option('--provider-latency <list>', 'Per-provider median latency, e.g. openai=2000,anthropic=300', numberMap)
+  .option('--tokens-per-sec <n>', 'Output token rate once streaming', number, 80)
+  .option('--rate-429 <share>', 'Share of requests answered with 429', number, 0)
+  .option('--rate-5xx <share>', 'Share of requests answered with 500/503', number, 0)
+  .option('--editor-rejections <n>', 'Editor rejects drafts up to this version', integer, 1)
+  .option('--seed <n>', 'Seed for injected latency and errors', integer, 1)
+  .option('--label <label>', 'Free-form label stored in the report (e.g. a version)')
+  .option('-o, --out <file>', 'Write the JSON report to this file instead of stdout')
+  .option('--compare <file>', 'Print the change of each metric against an earlier report'), ['--no-cache', '--cache-only', '--no-reuse'])
+  .action(async (options) => {
+    const scenarios: Scenario[] = options.scenario === 'all' ? ['single', 'batch'] : [options.scenario];
+    const report = await runBenchmark({
+        scenarios,
+        runs: options.runs,
+        topics: options.topics,
+        concurrency: options.concurrency,
+        provider: options.provider,
+        label: options.label,
+        server: {
+            latencyMs: options.latency,
+            jitter: options.jitter,
+            providerLatencyMs: options.providerLatency,
+            tokensPerSecond: options.tokensPerSec,
+            rate429: options.rate429,
+            rate5xx: options.rate5xx,
+            editorRejections: options.editorRejections,
+            seed: options.seed,
+        },
+        orchestrator: pipelineOptions(options),
+    });
+    const json = JSON.stringify(report, null, 2);
+    if (options.out) fs.writeFileSync(options.out, json + '\n');
+    else console.log(json);
+
+    if (options.compare) {
+        const baseline = JSON.parse(fs.readFileSync(options.compare, 'utf-8'));
+        for (const r of compareReports(baseline, report)) {
+            const change = `${r.change_pct > 0 ? '+' : ''}${r.change_pct}%`;
+            console.error(`${r.metric.padEnd(56)} ${String(r.baseline).padStart(10)} → ${String(r.current).padStart(10)}  ${change}`);
+        }
+    }
+  });
+
+program
+  .command('metrics')
+  .description('Aggregate the LLM call log (output/metrics.jsonl) across runs')
+  .option('-f, --file <file>', 'JSONL metrics log', process.env.CONTENTFORGE_METRICS_JSONL || 'output/metrics.jsonl')
+  .option('--format <format>', 'table or prom (Prometheus text format)', 'table')
+  .action((options) => {
+    if (!fs.existsSync(options.file)) {
+      console.error(chalk.red(`No metrics log at ${options.file}`));
+      process.exitCode = 1;
+      return;
+    }
+    const registry = new MetricsRegistry();
+    const events = registry.load(options.file);
+    if (options.format === 'prom') {
+      process.stdout.write(registry.toPrometheus());
+      return;
+    }
+    console.log(chalk.blue(`${events} events from ${options.file}\n`));
+    for (const line of formatSummary(registry.summary())) console.log(line);
+    for (const line of formatSpeculation(registry.speculationSummary())) console.log(line);
   });
 
 program
@@ -40,4 +229,7 @@ program
     }
   });
 
-program.parse(process.argv);
\ No newline at end of file
+program.parseAsync(process.argv).catch(err => {
+  console.error(chalk.red(err instanceof Error ? err.message : String(err)));
+  process.exitCode = 1;
+});
\ No newline at end of file
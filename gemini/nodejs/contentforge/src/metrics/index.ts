@@ -0,0 +1,399 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { AsyncLocalStorage } from 'async_hooks';
+import { estimateCost } from './pricing';
+
+export { estimateCost, priceFor } from './pricing';
+
+export type MetricLabels = {
+    agent: string;
+    provider: string;
+    model: string;
+};
+
+// ok: answered by the provider; error: failed after retries; cancelled: aborted (e.g. a hedge
+// that lost the race); cache_hit: answered from the response cache without a provider call
+export type CallOutcome = 'ok' | 'error' | 'cancelled' | 'cache_hit';
+
+// committed: a speculative stage's guessed input matched the real one and its result was used
+export type SpeculationOutcome = 'committed' | 'discarded';
+
+/** One line of the JSONL metrics log. */
+export type MetricEvent = MetricLabels & {
+    ts: string;
+    type: 'call' | 'parse_failure' | 'speculation';
+    outcome?: CallOutcome;
+    // Speculation events: the stage and what became of it (calls, tokens and cost are its own)
+    stage?: string;
+    speculation?: SpeculationOutcome;
+    calls?: number;
+    ms?: number;
+    ttft_ms?: number;
+    input_tokens?: number;
+    output_tokens?: number;
+    retries?: number;
+    cost_usd?: number;
+    // ProviderError kind (or error name) for failed calls
+    error?: string;
+};
+
+export type CallMetric = MetricLabels & {
+    outcome: CallOutcome;
+    ms: number;
+    ttftMs?: number;
+    inputTokens?: number;
+    outputTokens?: number;
+    retries: number;
+    error?: string;
+};
+
+// Provider calls made within `MetricsRegistry.track`
+export type CallUsage = { calls: number; ms: number; inputTokens: number; outputTokens: number; costUsd: number };
+
+export function emptyUsage(): CallUsage {
+    return { calls: 0, ms: 0, inputTokens: 0, outputTokens: 0, costUsd: 0 };
+}
+
+export type SpeculationSummary = {
+    stage: string;
+    committed: number;
+    discarded: number;
+    // What the discarded work cost
+    wasted: CallUsage;
+};
+
+// Upper bounds in seconds, for LLM calls that take from a fraction of a second to minutes
+const BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300];
+
+class Histogram {
+    counts = new Array(BUCKETS.length + 1).fill(0);
+    sum = 0;
+    count = 0;
+    // Recent observations (ms) for the summary table's percentiles
+    private samples: number[] = [];
+    private window = 1000;
+
+    observe(ms: number) {
+        const seconds = ms / 1000;
+        const i = BUCKETS.findIndex(bound => seconds <= bound);
+        this.counts[i === -1 ? BUCKETS.length : i]++;
+        this.sum += seconds;
+        this.count++;
+        this.samples.push(ms);
+        if (this.samples.length > this.window) this.samples.shift();
+    }
+
+    percentile(p: number): number | undefined {
+        if (!this.samples.length) return undefined;
+        const sorted = [...this.samples].sort((a, b) => a - b);
+        return sorted[Math.min(sorted.length - 1, Math.ceil(p * sorted.length) - 1)];
+    }
+}
+
+export type SeriesSummary = MetricLabels & {
+    calls: number;
+    cacheHits: number;
+    errors: number;
+    cancelled: number;
+    retries: number;
+    parseFailures: number;
+    inputTokens: number;
+    outputTokens: number;
+    costUsd: number;
+    // Some calls reported tokens for a model without a known price, so costUsd is a lower bound
+    unpriced: boolean;
+    p50Ms?: number;
+    p95Ms?: number;
+    ttftP50Ms?: number;
+};
+
+class Series {
+    labels: MetricLabels;
+    outcomes: Record<CallOutcome, number> = { ok: 0, error: 0, cancelled: 0, cache_hit: 0 };
+    retries = 0;
+    parseFailures = 0;
+    inputTokens = 0;
+    outputTokens = 0;
+    costUsd = 0;
+    unpriced = false;
+    latency = new Histogram();
+    ttft = new Histogram();
+
+    constructor(labels: MetricLabels) {
+        this.labels = labels;
+    }
+
+    summary(): SeriesSummary {
+        return {
+            ...this.labels,
+            calls: this.outcomes.ok + this.outcomes.error + this.outcomes.cancelled,
+            cacheHits: this.outcomes.cache_hit,
+            errors: this.outcomes.error,
+            cancelled: this.outcomes.cancelled,
+            retries: this.retries,
+            parseFailures: this.parseFailures,
+            inputTokens: this.inputTokens,
+            outputTokens: this.outputTokens,
+            costUsd: this.costUsd,
+            unpriced: this.unpriced,
+            p50Ms: this.latency.percentile(0.5),
+            p95Ms: this.latency.percentile(0.95),
+            ttftP50Ms: this.ttft.percentile(0.5),
+        };
+    }
+}
+
+const escapeLabel = (value: string) => value.replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+
+function labelText(labels: Record<string, string>): string {
+    return `{${Object.entries(labels).map(([k, v]) => `${k}="${escapeLabel(v)}"`).join(',')}}`;
+}
+
+/**
+ * Per agent + provider + model LLM call metrics for the whole process (every run of a batch
+ * included). Each call is also appended to a JSONL log (CONTENTFORGE_METRICS_JSONL, default
+ * output/metrics.jsonl, "off" to disable), from which `contentforge metrics` rebuilds the
+ * same aggregates across processes.
+ */
+export class MetricsRegistry {
+    private series = new Map<string, Series>();
+    private speculation = new Map<string, SpeculationSummary>();
+    private usage = new AsyncLocalStorage<CallUsage[]>();
+    private jsonl?: string | null;
+
+    private seriesFor(labels: MetricLabels): Series {
+        const key = `${labels.agent}\u0000${labels.provider}\u0000${labels.model}`;
+        let series = this.series.get(key);
+        if (!series) {
+            series = new Series({ agent: labels.agent, provider: labels.provider, model: labels.model });
+            this.series.set(key, series);
+        }
+        return series;
+    }
+
+    private get jsonlPath(): string | null {
+        if (this.jsonl === undefined) {
+            const setting = process.env.CONTENTFORGE_METRICS_JSONL;
+            this.jsonl = setting === 'off' ? null : path.resolve(setting || path.join('output', 'metrics.jsonl'));
+        }
+        return this.jsonl;
+    }
+
+    recordCall(call: CallMetric) {
+        const cost = call.inputTokens !== undefined && call.outputTokens !== undefined
+            ? estimateCost(call.model, call.inputTokens, call.outputTokens)
+            : undefined;
+        this.apply({
+            ts: new Date().toISOString(),
+            type: 'call',
+            agent: call.agent,
+            provider: call.provider,
+            model: call.model,
+            outcome: call.outcome,
+            ms: call.ms,
+            ttft_ms: call.ttftMs,
+            input_tokens: call.inputTokens,
+            output_tokens: call.outputTokens,
+            retries: call.retries,
+            cost_usd: cost,
+            error: call.error,
+        }, true);
+        if (call.outcome === 'cache_hit') return;
+        for (const usage of this.usage.getStore() || []) {
+            usage.calls++;
+            usage.ms += call.ms;
+            usage.inputTokens += call.inputTokens || 0;
+            usage.outputTokens += call.outputTokens || 0;
+            usage.costUsd += cost || 0;
+        }
+    }
+
+    // Runs `fn` with every provider call it makes also added to `usage` (and to those of enclosing `track`s)
+    track<T>(usage: CallUsage, fn: () => T): T {
+        return this.usage.run([...(this.usage.getStore() || []), usage], fn);
+    }
+
+    recordSpeculation(stage: string, agent: string, outcome: SpeculationOutcome, usage: CallUsage) {
+        this.apply({
+            ts: new Date().toISOString(),
+            type: 'speculation',
+            agent,
+            provider: '',
+            model: '',
+            stage,
+            speculation: outcome,
+            calls: usage.calls,
+            ms: usage.ms,
+            input_tokens: usage.inputTokens,
+            output_tokens: usage.outputTokens,
+            cost_usd: usage.costUsd,
+        }, true);
+    }
+
+    recordParseFailure(labels: MetricLabels) {
+        this.apply({ ts: new Date().toISOString(), type: 'parse_failure', ...labels }, true);
+    }
+
+    // Adds an event to the aggregates (and, for live events, the JSONL log)
+    apply(event: MetricEvent, log: boolean = false) {
+        if (event.type === 'speculation') {
+            this.applySpeculation(event);
+        } else if (event.type === 'parse_failure') {
+            this.seriesFor(event).parseFailures++;
+        } else if (event.outcome) {
+            const series = this.seriesFor(event);
+            series.outcomes[event.outcome]++;
+            series.retries += event.retries || 0;
+            series.inputTokens += event.input_tokens || 0;
+            series.outputTokens += event.output_tokens || 0;
+            if (event.cost_usd !== undefined) series.costUsd += event.cost_usd;
+            else if (event.input_tokens || event.output_tokens) series.unpriced = true;
+            // Only completed provider calls: cache hits and cancelled hedges would skew the percentiles
+            if ((event.outcome === 'ok' || event.outcome === 'error') && event.ms !== undefined) series.latency.observe(event.ms);
+            if (event.outcome === 'ok' && event.ttft_ms !== undefined) series.ttft.observe(event.ttft_ms);
+        }
+        const file = log ? this.jsonlPath : null;
+        if (file) {
+            try {
+                fs.mkdirSync(path.dirname(file), { recursive: true });
+                fs.appendFileSync(file, JSON.stringify(event) + '\n');
+            } catch (e) { /* metrics must never fail a run */ }
+        }
+    }
+
+    private applySpeculation(event: MetricEvent) {
+        const stage = event.stage || event.agent;
+        let summary = this.speculation.get(stage);
+        if (!summary) this.speculation.set(stage, summary = { stage, committed: 0, discarded: 0, wasted: emptyUsage() });
+        if (event.speculation === 'committed') {
+            summary.committed++;
+            return;
+        }
+        summary.discarded++;
+        summary.wasted.calls += event.calls || 0;
+        summary.wasted.ms += event.ms || 0;
+        summary.wasted.inputTokens += event.input_tokens || 0;
+        summary.wasted.outputTokens += event.output_tokens || 0;
+        summary.wasted.costUsd += event.cost_usd || 0;
+    }
+
+    // Replays a JSONL log into this registry; malformed lines are skipped
+    load(file: string): number {
+        let events = 0;
+        for (const line of fs.readFileSync(file, 'utf-8').split('\n')) {
+            if (!line.trim()) continue;
+            try {
+                this.apply(JSON.parse(line));
+                events++;
+            } catch (e) { /* partial last line of a log still being written */ }
+        }
+        return events;
+    }
+
+    summary(): SeriesSummary[] {
+        return [...this.series.values()].map(s => s.summary());
+    }
+
+    speculationSummary(): SpeculationSummary[] {
+        return [...this.speculation.values()].map(s => ({ ...s, wasted: { ...s.wasted } }));
+    }
+
+    /** Prometheus text exposition format (e.g. for node_exporter's textfile collector). */
+    toPrometheus(): string {
+        const lines: string[] = [];
+        const metric = (name: string, type: string, help: string) => {
+            lines.push(`# HELP contentforge_${name} ${help}`, `# TYPE contentforge_${name} ${type}`);
+        };
+        const all = [...this.series.values()];
+
+        metric('llm_calls_total', 'counter', 'LLM calls by outcome (cache_hit: answered from the response cache)');
+        for (const s of all) {
+            for (const [outcome, n] of Object.entries(s.outcomes)) {
+                if (n) lines.push(`contentforge_llm_calls_total${labelText({ ...s.labels, outcome })} ${n}`);
+            }
+        }
+        metric('llm_retries_total', 'counter', 'Retried provider requests');
+        for (const s of all) lines.push(`contentforge_llm_retries_total${labelText(s.labels)} ${s.retries}`);
+        metric('llm_parse_failures_total', 'counter', 'Responses that did not parse into the agent schema');
+        for (const s of all) lines.push(`contentforge_llm_parse_failures_total${labelText(s.labels)} ${s.parseFailures}`);
+        metric('llm_tokens_total', 'counter', 'Tokens reported by the provider');
+        for (const s of all) {
+            lines.push(`contentforge_llm_tokens_total${labelText({ ...s.labels, direction: 'input' })} ${s.inputTokens}`);
+            lines.push(`contentforge_llm_tokens_total${labelText({ ...s.labels, direction: 'output' })} ${s.outputTokens}`);
+        }
+        metric('llm_cost_usd_total', 'counter', 'Estimated spend from reported tokens and list prices (0 for unpriced models)');
+        for (const s of all) lines.push(`contentforge_llm_cost_usd_total${labelText(s.labels)} ${s.costUsd.toFixed(6)}`);
+        const histogram = (name: string, help: string, pick: (s: Series) => Histogram) => {
+            metric(name, 'histogram', help);
+            for (const s of all) {
+                const h = pick(s);
+                let cumulative = 0;
+                BUCKETS.forEach((bound, i) => {
+                    cumulative += h.counts[i];
+                    lines.push(`contentforge_${name}_bucket${labelText({ ...s.labels, le: String(bound) })} ${cumulative}`);
+                });
+                lines.push(`contentforge_${name}_bucket${labelText({ ...s.labels, le: '+Inf' })} ${h.count}`);
+                lines.push(`contentforge_${name}_sum${labelText(s.labels)} ${h.sum.toFixed(3)}`);
+                lines.push(`contentforge_${name}_count${labelText(s.labels)} ${h.count}`);
+            }
+        };
+        const speculation = [...this.speculation.values()];
+        metric('speculative_stages_total', 'counter', 'Stages started early on a guessed input, by whether the guess held');
+        for (const s of speculation) {
+            lines.push(`contentforge_speculative_stages_total${labelText({ stage: s.stage, outcome: 'committed' })} ${s.committed}`);
+            lines.push(`contentforge_speculative_stages_total${labelText({ stage: s.stage, outcome: 'discarded' })} ${s.discarded}`);
+        }
+        metric('speculative_discarded_tokens_total', 'counter', 'Tokens spent on speculative work that was thrown away');
+        for (const s of speculation) {
+            lines.push(`contentforge_speculative_discarded_tokens_total${labelText({ stage: s.stage, direction: 'input' })} ${s.wasted.inputTokens}`);
+            lines.push(`contentforge_speculative_discarded_tokens_total${labelText({ stage: s.stage, direction: 'output' })} ${s.wasted.outputTokens}`);
+        }
+        metric('speculative_discarded_cost_usd_total', 'counter', 'Estimated spend on speculative work that was thrown away');
+        for (const s of speculation) lines.push(`contentforge_speculative_discarded_cost_usd_total${labelText({ stage: s.stage })} ${s.wasted.costUsd.toFixed(6)}`);
+        histogram('llm_call_duration_seconds', 'LLM call duration including queueing and retries', s => s.latency);
+        histogram('llm_time_to_first_token_seconds', 'Time to the first streamed token (to the full response when not streamed)', s => s.ttft);
+        return lines.join('\n') + '\n';
+    }
+
+    writePrometheus(file: string) {
+        fs.mkdirSync(path.dirname(file), { recursive: true });
+        // Written via rename so a scraper never reads a half-written file
+        fs.writeFileSync(`${file}.tmp`, this.toPrometheus());
+        fs.renameSync(`${file}.tmp`, file);
+    }
+}
+
+export const metrics = new MetricsRegistry();
+
+const seconds = (ms?: number) => ms === undefined ? '-' : `${(ms / 1000).toFixed(1)}s`;
+
+/** End-of-run table: one row per agent + provider + model, plus totals. */
+export function formatSummary(rows: SeriesSummary[]): string[] {
+    const header = ['agent', 'provider:model', 'calls', 'hits', 'p50', 'p95', 'ttft p50', 'tokens in', 'tokens out', 'retries', 'errors', 'cancelled', 'parse fail', 'cost'];
+    // "+": some tokens were for models without a known price (see CONTENTFORGE_PRICES)
+    const cost = (usd: number, unpriced: boolean) => unpriced && usd === 0 ? '?' : `$${usd.toFixed(4)}${unpriced ? '+' : ''}`;
+    const table = rows.map(r => [
+        r.agent, `${r.provider}:${r.model}`, String(r.calls), String(r.cacheHits), seconds(r.p50Ms), seconds(r.p95Ms), seconds(r.ttftP50Ms),
+        String(r.inputTokens), String(r.outputTokens), String(r.retries), String(r.errors), String(r.cancelled), String(r.parseFailures),
+        cost(r.costUsd, r.unpriced),
+    ]);
+    const total = (pick: (r: SeriesSummary) => number) => rows.reduce((n, r) => n + pick(r), 0);
+    const sum = (pick: (r: SeriesSummary) => number) => String(total(pick));
+    table.push([
+        'total', '', sum(r => r.calls), sum(r => r.cacheHits), '', '', '', sum(r => r.inputTokens), sum(r => r.outputTokens),
+        sum(r => r.retries), sum(r => r.errors), sum(r => r.cancelled), sum(r => r.parseFailures),
+        cost(total(r => r.costUsd), rows.some(r => r.unpriced)),
+    ]);
+    const widths = header.map((h, i) => Math.max(h.length, ...table.map(row => row[i].length)));
+    const format = (row: string[]) => row.map((cell, i) => i < 2 ? cell.padEnd(widths[i]) : cell.padStart(widths[i])).join('  ');
+    return [format(header), ...table.map(format)];
+}
+
+/** One line per speculative stage: how often its guess held, and what the discarded work cost. */
+export function formatSpeculation(rows: SpeculationSummary[]): string[] {
+    return rows.map(s => {
+        const w = s.wasted;
+        const wasted = s.discarded ? ` (${w.calls} call${w.calls === 1 ? '' : 's'}, ${w.inputTokens + w.outputTokens} tokens, $${w.costUsd.toFixed(4)}, ${seconds(w.ms)} thrown away)` : '';
+        return `Speculation (${s.stage}): ${s.committed} committed, ${s.discarded} discarded${wasted}`;
+    });
+}
@@ -0,0 +1,59 @@
+import * as fs from 'fs';
+
+// USD per million tokens: [input, output]
+export type ModelPrice = [number, number];
+
+// List prices for the models the adapters default to and their common siblings. Keys match
+// model-name prefixes (the longest match wins), so dated snapshots share their family's price.
+const DEFAULT_PRICES: Record<string, ModelPrice> = {
+    'gpt-4-turbo': [10, 30],
+    'gpt-4o-mini': [0.15, 0.6],
+    'gpt-4o': [2.5, 10],
+    'gpt-4.1-mini': [0.4, 1.6],
+    'gpt-4.1': [2, 8],
+    'gpt-4': [30, 60],
+    'claude-3-opus': [15, 75],
+    'claude-3-5-sonnet': [3, 15],
+    'claude-3-7-sonnet': [3, 15],
+    'claude-3-5-haiku': [0.8, 4],
+    'claude-3-haiku': [0.25, 1.25],
+    'gemini-1.5-pro': [1.25, 5],
+    'gemini-1.5-flash': [0.075, 0.3],
+    'gemini-2.5-pro': [1.25, 10],
+    'gemini-2.5-flash': [0.3, 2.5],
+    'grok-2': [2, 10],
+    'grok-beta': [5, 15],
+};
+
+let prices: Record<string, ModelPrice> | undefined;
+
+// CONTENTFORGE_PRICES adds or overrides entries: inline JSON or a JSON file, {"model-prefix": [input, output]}
+function loadPrices(): Record<string, ModelPrice> {
+    if (prices) return prices;
+    prices = { ...DEFAULT_PRICES };
+    const override = process.env.CONTENTFORGE_PRICES;
+    if (override) {
+        try {
+            const raw = override.trim().startsWith('{') ? override : fs.readFileSync(override, 'utf-8');
+            Object.assign(prices, JSON.parse(raw));
+        } catch (e) {
+            console.error(`Ignoring CONTENTFORGE_PRICES: ${e}`);
+        }
+    }
+    return prices;
+}
+
+export function priceFor(model: string): ModelPrice | undefined {
+    const table = loadPrices();
+    const key = Object.keys(table)
+        .filter(prefix => model.startsWith(prefix))
+        .sort((a, b) => b.length - a.length)[0];
+    return key ? table[key] : undefined;
+}
+
+// Estimated cost of one call, or undefined when the model has no known price
+export function estimateCost(model: string, inputTokens: number, outputTokens: number): number | undefined {
+    const price = priceFor(model);
+    if (!price) return undefined;
+    return (inputTokens * price[0] + outputTokens * price[1]) / 1_000_000;
+}
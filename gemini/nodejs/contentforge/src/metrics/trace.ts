@@ -0,0 +1,152 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { AsyncLocalStorage } from 'async_hooks';
+import { performance } from 'perf_hooks';
+
+/** Chrome trace-event format entry (also loaded by Perfetto and speedscope). */
+export type TraceEvent = {
+    name: string;
+    cat?: string;
+    ph: 'X' | 'i' | 'M';
+    ts: number;
+    dur?: number;
+    pid: number;
+    tid: number;
+    s?: 't';
+    args?: Record<string, unknown>;
+};
+
+type Span = {
+    id: number;
+    parent?: number;
+    name: string;
+    category: string;
+    start: number;
+    end?: number;
+    args?: Record<string, unknown>;
+};
+
+type Instant = { span?: number; name: string; ts: number; args?: Record<string, unknown> };
+
+/**
+ * Records nested spans while a profiled run is in progress. The parent of a span is whatever
+ * span the calling async context is in. Complete ("X") events must nest strictly within a
+ * trace thread, so when the trace is written each span goes on its parent's lane if it fits
+ * there, and otherwise (concurrent siblings, a hedge outliving its caller) on a free lane of
+ * its own. Disabled, `trace` is a plain function call.
+ */
+export class Tracer {
+    private spans: Span[] = [];
+    private instants: Instant[] = [];
+    private context = new AsyncLocalStorage<Span>();
+    private origin = 0;
+    private active = false;
+
+    get enabled(): boolean {
+        return this.active;
+    }
+
+    start() {
+        this.spans = [];
+        this.instants = [];
+        this.origin = performance.now();
+        this.active = true;
+    }
+
+    // Microseconds since `start`
+    now(): number {
+        return Math.round((performance.now() - this.origin) * 1000);
+    }
+
+    trace<T>(name: string, category: string, fn: () => T, args?: Record<string, unknown>): T {
+        if (!this.active) return fn();
+        const span = this.open(name, category, this.now(), args);
+        const end = () => { span.end = this.now(); };
+
+        let result: T;
+        try {
+            result = this.context.run(span, fn);
+        } catch (error) {
+            end();
+            throw error;
+        }
+        if (result instanceof Promise) return result.finally(end) as T;
+        end();
+        return result;
+    }
+
+    // A span measured after the fact (e.g. a queue wait that ends when the task starts)
+    complete(name: string, category: string, start: number, args?: Record<string, unknown>) {
+        if (!this.active) return;
+        this.open(name, category, start, args).end = this.now();
+    }
+
+    instant(name: string, args?: Record<string, unknown>) {
+        if (!this.active) return;
+        this.instants.push({ span: this.context.getStore()?.id, name, ts: this.now(), args });
+    }
+
+    private open(name: string, category: string, start: number, args?: Record<string, unknown>): Span {
+        const span: Span = { id: this.spans.length, parent: this.context.getStore()?.id, name, category, start, args };
+        this.spans.push(span);
+        return span;
+    }
+
+    // Lane (trace thread) per span id, so that spans on one lane nest strictly
+    private assignLanes(spans: Span[]): Map<number, number> {
+        const lanes = new Map<number, number>();
+        const stacks: Span[][] = [];
+        const ordered = [...spans].sort((a, b) => a.start - b.start || (b.end! - b.start) - (a.end! - a.start));
+        for (const span of ordered) {
+            for (const stack of stacks) {
+                while (stack.length && stack[stack.length - 1].end! <= span.start) stack.pop();
+            }
+            let lane = -1;
+            const parentLane = span.parent === undefined ? undefined : lanes.get(span.parent);
+            if (parentLane !== undefined) {
+                const top = stacks[parentLane][stacks[parentLane].length - 1];
+                if (top?.id === span.parent && span.end! <= top.end!) lane = parentLane;
+            }
+            if (lane === -1) lane = stacks.findIndex(stack => stack.length === 0);
+            if (lane === -1) lane = stacks.push([]) - 1;
+            stacks[lane].push(span);
+            lanes.set(span.id, lane);
+        }
+        return lanes;
+    }
+
+    /** Stops recording and writes the trace as JSON, loadable in chrome://tracing or ui.perfetto.dev. */
+    write(file: string, label: string) {
+        this.active = false;
+        const now = this.now();
+        // Spans still open (e.g. a cancelled call that hasn't unwound yet) end at write time
+        for (const span of this.spans) span.end ??= now;
+        const lanes = this.assignLanes(this.spans);
+        const pid = process.pid;
+        const count = Math.max(1, ...lanes.values()) + 1;
+        const events: TraceEvent[] = [
+            { name: 'process_name', ph: 'M', ts: 0, pid, tid: 0, args: { name: label } },
+            ...Array.from({ length: count }, (_, i): TraceEvent => ({
+                name: 'thread_name', ph: 'M', ts: 0, pid, tid: i + 1, args: { name: i === 0 ? 'pipeline' : `concurrent ${i}` },
+            })),
+            ...this.spans.map((span): TraceEvent => ({
+                name: span.name, cat: span.category, ph: 'X', ts: span.start, dur: span.end! - span.start,
+                pid, tid: lanes.get(span.id)! + 1, args: span.args,
+            })),
+            ...this.instants.map((i): TraceEvent => ({
+                name: i.name, ph: 'i', s: 't', ts: i.ts, pid, tid: (i.span === undefined ? 0 : lanes.get(i.span)!) + 1, args: i.args,
+            })),
+        ];
+        fs.mkdirSync(path.dirname(file), { recursive: true });
+        fs.writeFileSync(file, JSON.stringify({ traceEvents: events, displayTimeUnit: 'ms' }));
+        this.spans = [];
+        this.instants = [];
+    }
+}
+
+export const tracer = new Tracer();
+
+// Runs `fn` inside a span when profiling; see Tracer.trace
+export function trace<T>(name: string, category: string, fn: () => T, args?: Record<string, unknown>): T {
+    return tracer.trace(name, category, fn, args);
+}
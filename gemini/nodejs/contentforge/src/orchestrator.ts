@@ -1,133 +1,668 @@
+import * as crypto from 'crypto';
 import * as fs from 'fs';
 import * as path from 'path';
 import chalk from 'chalk';
 import ora from 'ora';
+import { ZodSchema } from 'zod';
 import { BriefAgent } from './agents/brief';
-import { ResearchAgent } from './agents/research';
+import { ResearchAgent, ResearchMode, getKnowledgeStats } from './agents/research';
 import { OutlineAgent } from './agents/outline';
-import { DraftAgent } from './agents/draft';
-import { EditorAgent } from './agents/editor';
-import { PublishAgent } from './agents/publish';
+import { DraftAgent, DraftMode, RedraftMode } from './agents/draft';
+import { getRepairStats } from './agents/repair';
+import { getStructuredStats } from './adapters/structured';
+import { EditorAgent, EditorMode, failingSections, getEditStats } from './agents/editor';
+import { cascadeFor, getCascadeStats, tierConfig } from './agents/cascade';
+import { PublishAgent, PublishInput, PublishMode, metadataHolds } from './agents/publish';
+import { BaseAgent, cancellable } from './agents/base';
+import { estimateTokens, getProjectionStats, measureProjections } from './agents/projection';
+import { responseCache } from './adapters/cache';
+import { preconnect } from './adapters';
+import { transport } from './adapters/transport';
+import { getRateLimitStats } from './adapters/ratelimit';
+import { hedgePolicyFor, hedgeStats } from './adapters/hedge';
+import { CallUsage, emptyUsage, formatSpeculation, formatSummary, metrics } from './metrics';
+import { trace, tracer } from './metrics/trace';
+import { ArtifactKind, ArtifactStore, canonicalJSON, hashContent } from './store/artifacts';
+import { TopicIndex, TopicMatch, briefText } from './store/similarity';
+import { Speculation, StageGraph } from './graph';
+import { CritiqueBudget, CritiqueLoop, CritiqueOutcome, STOP_MESSAGES, meanScore } from './critique';
+import {
+    ArtifactRef, SectionFeedback, PublishedArticle, ContentBrief, ContentBriefSchema, ResearchPackage, ResearchPackageSchema,
+    ArticleOutline, ArticleOutlineSchema, ArticleDraftSchema, EditedArticle, EditedArticleSchema, PublishedArticleSchema,
+} from './types';
+
+// One pipeline stage's outcome; `inputs_hash` covers the refs and settings it was built from
+export type Checkpoint = {
+    stage: string;
+    kind: ArtifactKind;
+    ref?: ArtifactRef;
+    inputs_hash: string;
+    status: 'done' | 'failed';
+    // Reused from an earlier attempt of this run
+    restored?: boolean;
+    error?: string;
+};
+
+export type RunManifest = {
+    run_id: string;
+    topic?: string;
+    status?: 'running' | RunResult['status'];
+    options?: Omit<OrchestratorOptions, 'quiet' | 'runId' | 'profile'>;
+    stages: Checkpoint[];
+    reused?: ReuseReport;
+    // How the draft-edit loop ended
+    critique?: CritiqueOutcome;
+};
+
+// Artifacts taken from earlier runs on similar topics instead of being generated again
+export type ReuseReport = {
+    brief?: { run_id: string; similarity: number };
+    research?: { run_id: string; similarity: number; researched_key_points: string[] };
+};
+
+// off: stages run as soon as their inputs are ready, nothing more; on: publish metadata is
+// written from the outline while the article is drafted; eager: in llm publish mode, each
+// draft is also published while the editor reviews it, in case the editor passes it unchanged
+export type SpeculationMode = 'off' | 'on' | 'eager';
+
+type Staged<T> = { value: T; ref: ArtifactRef };
+
+// Where the draft-edit loop ended, and the publish pass speculated on the last draft
+type Review = { edited: Staged<EditedArticle>; passed: boolean; speculation?: Speculation<PublishInput, PublishedArticle> };
+
+// The stages of a run, by their names in its StageGraph
+type RunStages = {
+    brief: Staged<ContentBrief>;
+    research: Staged<ResearchPackage>;
+    indexed: void;
+    outline: Staged<ArticleOutline>;
+    review: Review;
+    published: { value: PublishedArticle; forced: boolean };
+};
+
+// The fields publishing reads, so that a draft and its edited version compare like for like
+function publishInput(article: PublishInput): PublishInput {
+    return { title: article.title, body: article.body, word_count: article.word_count };
+}
+
+// Minimum estimated similarity to reuse an earlier run's brief (by topic) or seed its research (by brief)
+function reuseThresholds(): { brief: number; research: number } {
+    const read = (name: string, fallback: number) => {
+        const value = parseFloat(process.env[name] || '');
+        return Number.isFinite(value) ? value : fallback;
+    };
+    return { brief: read('CONTENTFORGE_REUSE_BRIEF_THRESHOLD', 0.9), research: read('CONTENTFORGE_REUSE_THRESHOLD', 0.5) };
+}
+
+// Redraft limit, budgets and convergence bar for the draft-edit loop, from the options or the environment
+function critiqueBudget(options: OrchestratorOptions): CritiqueBudget {
+    const read = (name: string) => {
+        const value = parseFloat(process.env[name] || '');
+        return Number.isFinite(value) ? value : undefined;
+    };
+    return {
+        maxRedrafts: options.maxRedrafts ?? read('CONTENTFORGE_MAX_REDRAFTS') ?? 3,
+        timeMs: options.timeBudgetMs ?? read('CONTENTFORGE_TIME_BUDGET_MS'),
+        tokens: options.tokenBudget ?? read('CONTENTFORGE_TOKEN_BUDGET'),
+        minGain: options.minGain ?? read('CONTENTFORGE_MIN_GAIN') ?? 0.25,
+    };
+}
+
+// Providers a run's agents may call: each agent's own provider (or its cascade's) and the hedging fallback
+function configuredProviders(agents: BaseAgent<any, any>[]): string[] {
+    const names = new Set<string>();
+    for (const agent of agents) {
+        const cascade = agent.cascade ?? cascadeFor(agent.name);
+        const primaries = cascade ? cascade.tiers.map(tier => tierConfig(tier).provider) : [agent.modelConfig.provider];
+        for (const name of primaries) names.add(name || process.env.DEFAULT_PROVIDER || 'openai');
+        const fallback = (agent.hedge ?? hedgePolicyFor(agent.name))?.fallback;
+        if (fallback) names.add(fallback.split(':')[0]);
+    }
+    return [...names];
+}
+
+// Process-wide metrics in Prometheus text format, refreshed after every run
+// (CONTENTFORGE_METRICS_PROM, default output/metrics.prom, "off" to disable)
+export function writeMetrics() {
+    const file = process.env.CONTENTFORGE_METRICS_PROM;
+    if (file === 'off') return;
+    try {
+        metrics.writePrometheus(path.resolve(file || path.join('output', 'metrics.prom')));
+    } catch (e) { /* metrics must never fail a run */ }
+}
+
+export type OrchestratorOptions = {
+    // Suppress spinners and console output (used when many runs share a terminal)
+    quiet?: boolean;
+    // Draft the whole article in one call, or write outline sections concurrently
+    draftMode?: DraftMode;
+    // Research in one call, or fan out per list (facets) or per brief key point
+    researchMode?: ResearchMode;
+    // After a failed edit, regenerate the whole draft or only the sections that scored low
+    redraftMode?: RedraftMode;
+    // Editor returns the full edited body, or edit operations applied to the draft locally
+    editorMode?: EditorMode;
+    // Format and count locally, with the model writing only the description and tags (hybrid), or not at all (local)
+    publishMode?: PublishMode;
+    // Reuse briefs and research of earlier runs on near-duplicate topics (default: on unless CONTENTFORGE_REUSE=off)
+    reuse?: boolean;
+    // Start stages early on a guessed input (default: CONTENTFORGE_SPECULATE, else on)
+    speculate?: SpeculationMode;
+    // Redrafts after the first edit (default 3), and the run's time and token budget: no redraft
+    // starts that would likely overrun them (default: no budget)
+    maxRedrafts?: number;
+    timeBudgetMs?: number;
+    tokenBudget?: number;
+    // Rise in the mean editor score a redraft must bring to keep the loop going (default 0.25)
+    minGain?: number;
+    // Continue an earlier run: its valid checkpoints are reused (see `resume`)
+    runId?: string;
+    // Write a Chrome trace of the run to this file (true: output/<runId>/trace.json)
+    profile?: string | boolean;
+};
+
+export type RunResult = {
+    run_id: string;
+    topic: string;
+    status: 'published' | 'published_forced' | 'failed';
+    title?: string;
+    file?: string;
+    duration_ms: number;
+    // One entry per completed agent call, in pipeline order
+    stages: StageTiming[];
+    error?: string;
+    reused?: ReuseReport;
+    critique?: CritiqueOutcome;
+};
+
+export type StageTiming = {
+    agent: string;
+    ms: number;
+    ttft_ms?: number;
+};
 
 export class Orchestrator {
-    private runId: string;
+    readonly runId: string;
     private logDir: string;
+    private store: ArtifactStore;
+    private manifest: RunManifest;
+    // Checkpoints of an earlier attempt of this run, by stage
+    private previous = new Map<string, Checkpoint>();
+    private stages: StageTiming[] = [];
+    private quiet: boolean;
+    private profile?: string;
+    private draftMode?: DraftMode;
+    private researchMode?: ResearchMode;
+    private redraftMode: RedraftMode;
+    private editorMode?: EditorMode;
+    private publishMode?: PublishMode;
+    private reuse: boolean;
+    private speculate: SpeculationMode;
+    private budget: CritiqueBudget;
+    private topics: TopicIndex;
+    // Provider calls of the current run, and when it started, for its budget
+    private usage: CallUsage = emptyUsage();
+    private startedAt = 0;
 
-    constructor() {
+    constructor(options: OrchestratorOptions = {}) {
         const now = new Date();
-        this.runId = `run_${now.getFullYear()}${String(now.getMonth()+1).padStart(2,'0')}${String(now.getDate()).padStart(2,'0')}_${String(now.getHours()).padStart(2,'0')}${String(now.getMinutes()).padStart(2,'0')}${String(now.getSeconds()).padStart(2,'0')}`;
+        // Millisecond timestamp plus a random suffix, so concurrent runs never share an output directory
+        this.runId = options.runId || `run_${now.getFullYear()}${String(now.getMonth()+1).padStart(2,'0')}${String(now.getDate()).padStart(2,'0')}_${String(now.getHours()).padStart(2,'0')}${String(now.getMinutes()).padStart(2,'0')}${String(now.getSeconds()).padStart(2,'0')}_${String(now.getMilliseconds()).padStart(3,'0')}_${crypto.randomBytes(3).toString('hex')}`;
+        this.quiet = options.quiet ?? false;
+        this.draftMode = options.draftMode;
+        this.researchMode = options.researchMode;
+        this.editorMode = options.editorMode;
+        this.publishMode = options.publishMode;
+        this.reuse = options.reuse ?? process.env.CONTENTFORGE_REUSE !== 'off';
+        this.speculate = options.speculate || (process.env.CONTENTFORGE_SPECULATE as SpeculationMode) || 'on';
+        this.redraftMode = options.redraftMode || (process.env.REDRAFT_MODE as RedraftMode) || 'full';
+        this.budget = critiqueBudget(options);
         this.logDir = path.join(process.cwd(), 'output', this.runId);
+        if (options.profile) this.profile = typeof options.profile === 'string' ? options.profile : path.join(this.logDir, 'trace.json');
+        this.store = new ArtifactStore();
+        this.topics = new TopicIndex(this.store);
+        this.manifest = {
+            run_id: this.runId,
+            options: { draftMode: this.draftMode, researchMode: this.researchMode, redraftMode: this.redraftMode, editorMode: this.editorMode, publishMode: this.publishMode, reuse: this.reuse, speculate: this.speculate,
+                maxRedrafts: this.budget.maxRedrafts, timeBudgetMs: this.budget.timeMs, tokenBudget: this.budget.tokens, minGain: this.budget.minGain },
+            stages: [],
+        };
+        if (options.runId) {
+            const previous = Orchestrator.loadManifest(options.runId);
+            for (const checkpoint of previous?.stages || []) this.previous.set(checkpoint.stage, checkpoint);
+            // Restored stages keep the reuse they were built from
+            this.manifest.reused = previous?.reused;
+        }
     }
 
-    private log(stage: string, data: any) {
-        if (!fs.existsSync(this.logDir)) {
+    static loadManifest(runId: string): RunManifest | undefined {
+        const file = path.join(process.cwd(), 'output', runId, 'manifest.json');
+        if (!fs.existsSync(file)) return undefined;
+        return JSON.parse(fs.readFileSync(file, 'utf-8'));
+    }
+
+    // Records a stage's outcome in output/<runId>/manifest.json
+    private record(checkpoint: Checkpoint) {
+        this.manifest.stages = this.manifest.stages.filter(c => c.stage !== checkpoint.stage);
+        this.manifest.stages.push(checkpoint);
+        this.saveManifest();
+    }
+
+    private saveManifest() {
+        trace('write manifest', 'io', () => {
             fs.mkdirSync(this.logDir, { recursive: true });
+            fs.writeFileSync(
+                path.join(this.logDir, 'manifest.json'),
+                JSON.stringify(this.manifest, null, 2)
+            );
+        });
+    }
+
+    /**
+     * Runs one pipeline stage. When resuming, a stage whose checkpoint is complete, was built
+     * from the same inputs and still loads and validates from the artifact store is restored
+     * instead of run again; otherwise `produce` runs and its output becomes the new checkpoint.
+     */
+    private checkpoint<T>(stage: string, kind: ArtifactKind, schema: ZodSchema<T>, inputs: unknown, produce: () => Promise<T>): Promise<{ value: T; ref: ArtifactRef }> {
+        return trace(stage, 'stage', () => this.runStage(stage, kind, schema, inputs, produce));
+    }
+
+    private async runStage<T>(stage: string, kind: ArtifactKind, schema: ZodSchema<T>, inputs: unknown, produce: () => Promise<T>): Promise<{ value: T; ref: ArtifactRef }> {
+        const inputsHash = hashContent(canonicalJSON(inputs));
+        const saved = this.previous.get(stage);
+        if (saved?.status === 'done' && saved.ref && saved.inputs_hash === inputsHash) {
+            try {
+                const value = trace('store.get', 'io', () => this.store.get(kind, saved.ref!, schema));
+                this.record({ stage, kind, ref: saved.ref, inputs_hash: inputsHash, status: 'done', restored: true });
+                this.say(chalk.gray(`  ↺ ${stage} restored from checkpoint`));
+                return { value, ref: saved.ref };
+            } catch (e) { /* missing, corrupt or no longer valid: run the stage again */ }
+        }
+        try {
+            const value = await produce();
+            const ref = trace('store.put', 'io', () => this.store.put(kind, value));
+            this.record({ stage, kind, ref, inputs_hash: inputsHash, status: 'done' });
+            return { value, ref };
+        } catch (error) {
+            this.record({ stage, kind, inputs_hash: inputsHash, status: 'failed', error: error instanceof Error ? error.message : String(error) });
+            throw error;
+        }
+    }
+
+    // The most similar earlier run, if reuse is on and it clears `threshold`
+    private match(by: 'topic' | 'brief', text: string, threshold: number, needResearch: boolean): TopicMatch | undefined {
+        if (!this.reuse) return undefined;
+        const match = trace('similarity lookup', 'cpu', () => this.topics.nearest(by, text, this.runId, needResearch));
+        return match && match.similarity >= threshold ? match : undefined;
+    }
+
+    // An earlier run's brief for a near-identical topic; undefined if its artifact is gone
+    private reuseBrief(topic: string, match: TopicMatch): ContentBrief | undefined {
+        let brief: ContentBrief;
+        try {
+            brief = this.store.get('brief', match.entry.brief_ref, ContentBriefSchema);
+        } catch (e) {
+            return undefined;
+        }
+        this.manifest.reused = { ...this.manifest.reused, brief: { run_id: match.entry.run_id, similarity: match.similarity } };
+        this.say(chalk.gray(`  ↺ Brief reused from ${match.entry.run_id} ("${match.entry.topic}", similarity ${match.similarity.toFixed(2)})`));
+        return { ...brief, topic };
+    }
+
+    // Tops up an earlier run's research for a similar brief; undefined if its artifacts are gone
+    private async seedResearch(spinner: any, agent: ResearchAgent, brief: ContentBrief, match: TopicMatch): Promise<ResearchPackage | undefined> {
+        let seed: ResearchPackage;
+        let seedBrief: ContentBrief;
+        try {
+            seed = this.store.get('research', match.entry.research_ref!, ResearchPackageSchema);
+            seedBrief = this.store.get('brief', match.entry.brief_ref, ContentBriefSchema);
+        } catch (e) {
+            return undefined;
         }
-        fs.writeFileSync(
-            path.join(this.logDir, `${stage}.json`), 
-            JSON.stringify(data, null, 2)
-        );
+        const { research, researched } = await this.step(spinner, 'Topping up research from a similar run...', agent, a => a.topUp(brief, seed, seedBrief));
+        const { run_id } = match.entry;
+        const { similarity } = match;
+        this.manifest.reused = { ...this.manifest.reused, research: { run_id, similarity, researched_key_points: researched } };
+        const reused = brief.key_points.length - researched.length;
+        this.say(chalk.gray(`  ↺ Research seeded from ${run_id} (similarity ${similarity.toFixed(2)}): ${reused}/${brief.key_points.length} key points reused, ${researched.length} researched`));
+        return research;
+    }
+
+    // Runs one agent call under the spinner and reports its timing
+    private async step<A extends BaseAgent<any, any>, T>(spinner: any, label: string, agent: A, run: (agent: A) => Promise<T>): Promise<T> {
+        spinner.start(label);
+        const start = Date.now();
+        const value = await run(agent);
+        spinner.succeed(this.completed(agent, start));
+        return value;
+    }
+
+    private say(message: string) {
+        if (!this.quiet) console.log(message);
+    }
+
+    private writeArticle(published: PublishedArticle): string {
+        const filename = `${published.title.replace(/[^a-z0-9]/gi, '_').toLowerCase()}.md`;
+        trace('write article', 'io', () => fs.writeFileSync(path.join(process.cwd(), 'output', filename), published.markdown));
+        return filename;
+    }
+
+    async run(topic: string): Promise<RunResult> {
+        // Every provider call of the run, speculative ones included, counts against its token budget
+        this.usage = emptyUsage();
+        return metrics.track(this.usage, () => this.execute(topic));
     }
 
-    async run(topic: string) {
-        console.log(chalk.blue.bold(`\n🚀 ContentForge started. Run ID: ${this.runId}\n`));
-        
+    private async execute(topic: string): Promise<RunResult> {
+        const startRun = this.startedAt = Date.now();
+        if (this.profile) tracer.start();
+        // reportStats prints the prompt savings of the input projections
+        if (!this.quiet) measureProjections(true);
+        const finish = (status: RunResult['status'], extra: Partial<RunResult> = {}): RunResult => {
+            this.manifest.status = status;
+            this.saveManifest();
+            writeMetrics();
+            if (this.profile) {
+                tracer.write(this.profile, `contentforge ${this.runId}`);
+                this.say(chalk.gray(`Trace written to ${this.profile} (open in ui.perfetto.dev or chrome://tracing)`));
+            }
+            return { run_id: this.runId, topic, status, duration_ms: Date.now() - startRun, stages: this.stages, reused: this.manifest.reused, critique: this.manifest.critique, ...extra };
+        };
+
+        const resumed = this.previous.size > 0;
+        this.say(chalk.blue.bold(`\n🚀 ContentForge ${resumed ? 'resumed' : 'started'}. Run ID: ${this.runId}\n`));
+        this.manifest.topic = topic;
+        this.manifest.status = 'running';
+
+        // Each stage starts once the stages it names have finished
+        const graph = new StageGraph<RunStages>();
         try {
-            // 1. Brief
-            const spinner = ora('Generating Brief...').start();
-            const startBrief = Date.now();
+            const spinner = ora({ isSilent: this.quiet });
+            const thresholds = reuseThresholds();
             const briefAgent = new BriefAgent();
-            const brief = await briefAgent.run(topic);
-            spinner.succeed(`[BriefAgent] ✓ completed in ${((Date.now() - startBrief)/1000).toFixed(1)}s`);
-            this.log('1_brief', brief);
-
-            // 2. Research
-            spinner.start('Conducting Research...');
-            const startRes = Date.now();
-            const researchAgent = new ResearchAgent();
-            const research = await researchAgent.run(brief);
-            spinner.succeed(`[ResearchAgent] ✓ completed in ${((Date.now() - startRes)/1000).toFixed(1)}s`);
-            this.log('2_research', research);
+            const researchAgent = new ResearchAgent(this.researchMode);
+            const outlineAgent = new OutlineAgent();
+            const draftAgent = new DraftAgent(this.draftMode);
+            const editorAgent = new EditorAgent(this.editorMode);
+            const publishAgent = new PublishAgent(this.publishMode);
+            // Warm up connections to every provider the run may call while the brief request is being built
+            preconnect(configuredProviders([briefAgent, researchAgent, outlineAgent, draftAgent, editorAgent, publishAgent]));
+
+            // 1. Brief (taken from an earlier run when the topic is a near-duplicate of its topic)
+            graph.add('brief', [], () => {
+                const briefMatch = this.match('topic', topic, thresholds.brief, false);
+                return this.checkpoint('1_brief', 'brief', ContentBriefSchema,
+                    briefMatch ? { topic, reuse: briefMatch.entry.brief_ref } : { topic },
+                    async () => (briefMatch && this.reuseBrief(topic, briefMatch))
+                        || this.step(spinner, 'Generating Brief...', briefAgent, agent => agent.run(topic)));
+            });
+
+            // 2. Research (an earlier run's package for a similar brief, topped up with what it lacks)
+            graph.add('research', ['brief'], ({ brief }) => {
+                const seed = this.match('brief', briefText(brief.value), thresholds.research, true);
+                return this.checkpoint('2_research', 'research', ResearchPackageSchema,
+                    seed ? { brief: brief.ref, mode: researchAgent.mode, seed: seed.entry.research_ref } : { brief: brief.ref, mode: researchAgent.mode },
+                    async () => {
+                        const research = (seed && await this.seedResearch(spinner, researchAgent, brief.value, seed))
+                            || await this.step(spinner, 'Conducting Research...', researchAgent, agent => agent.run(brief.value));
+                        research.brief_ref = brief.ref;
+                        return research;
+                    });
+            });
+
+            // For later runs; nothing in this one waits for it, and failing to index doesn't fail the run
+            graph.add('indexed', ['brief', 'research'], ({ brief, research }) => {
+                try {
+                    trace('index topic', 'io', () => this.topics.add(this.runId, topic, brief.ref, brief.value, research.ref));
+                    const knowledge = researchAgent.knowledge;
+                    if (knowledge) trace('ingest research', 'io', () => knowledge.ingest(research.value, this.runId));
+                } catch (e) {
+                    if (!this.quiet) console.error(chalk.yellow(`  › Could not index this run for later runs: ${e instanceof Error ? e.message : e}`));
+                }
+            });
 
             // 3. Outline
-            spinner.start('Creating Outline...');
-            const startOut = Date.now();
-            const outlineAgent = new OutlineAgent();
-            const outline = await outlineAgent.run({ brief, research });
-            spinner.succeed(`[OutlineAgent] ✓ completed in ${((Date.now() - startOut)/1000).toFixed(1)}s`);
-            this.log('3_outline', outline);
+            graph.add('outline', ['brief', 'research'], ({ brief, research }) =>
+                this.checkpoint('3_outline', 'outline', ArticleOutlineSchema,
+                    { brief: brief.ref, research: research.ref },
+                    async () => {
+                        const outline = await this.step(spinner, 'Creating Outline...', outlineAgent, agent => agent.run({ brief: brief.value, research: research.value }));
+                        outline.brief_ref = brief.ref;
+                        outline.research_ref = research.ref;
+                        return outline;
+                    }));
+
+            // Description and tags written from the outline while the article is drafted and edited;
+            // kept if the article ends up with the outline's headings
+            const publishedBefore = this.previous.get('5_published')?.status === 'done' || this.previous.get('5_published_forced')?.status === 'done';
+            const metadata = this.speculate !== 'off' && publishAgent.mode === 'hybrid' && !publishedBefore
+                ? graph.speculate({
+                    name: 'publish metadata',
+                    agent: publishAgent.name,
+                    after: ['brief', 'outline'],
+                    guess: ({ brief, outline }) => publishAgent.metadataFromOutline(brief.value, outline.value),
+                    run: (meta, signal) => cancellable(signal, () => publishAgent.writeMetadata(meta)),
+                    matches: metadataHolds,
+                })
+                : undefined;
 
             // 4. Draft & Editor Loop
-            let draftAgent = new DraftAgent();
-            let editorAgent = new EditorAgent();
-            
-            // Initial Draft
-            let draft = await this.runDraft(draftAgent, spinner, brief, research, outline);
-            let attempts = 0;
-            const maxAttempts = 3;
-
-            while (attempts <= maxAttempts) {
-                spinner.start(`Editing (Attempt ${attempts + 1}/${maxAttempts + 1})...`);
-                const startEdit = Date.now();
-                
-                // Run Editor
-                const edited = await editorAgent.run({ brief, draft });
-                spinner.succeed(`[EditorAgent] ✓ completed in ${((Date.now() - startEdit)/1000).toFixed(1)}s`);
-                this.log(`4_edit_attempt_${attempts}`, edited);
-
-                // Check Threshold
-                if (edited.passed_quality_threshold) {
-                    console.log(chalk.green(`  › Quality Threshold Met! Scores: Clarity ${edited.quality_scores.clarity}/10, Structure ${edited.quality_scores.structure}/10`));
-                    
-                    // 5. Publish
-                    spinner.start('Publishing...');
-                    const startPub = Date.now();
-                    const publishAgent = new PublishAgent();
-                    const published = await publishAgent.run(edited);
-                    
-                    const filename = `${published.title.replace(/[^a-z0-9]/gi, '_').toLowerCase()}.md`;
-                    fs.writeFileSync(path.join(process.cwd(), 'output', filename), published.markdown);
-                    
-                    spinner.succeed(`[PublishAgent] ✓ completed in ${((Date.now() - startPub)/1000).toFixed(1)}s`);
-                    this.log('5_published', published);
-                    
-                    console.log(chalk.green.bold(`\n✨ Done! Saved to /output/${filename}`));
-                    return;
-                } else {
-                    console.log(chalk.yellow(`  › Quality Check Failed. Feedback: ${edited.feedback_for_redraft?.substring(0, 50)}...`));
-                    attempts++;
-                    
-                    if (attempts <= maxAttempts) {
-                        // Pass feedback back into draft
-                        // We attach the feedback to the draft object that acts as input context
-                        draft.feedback_for_redraft = edited.feedback_for_redraft;
-                        draft = await this.runDraft(draftAgent, spinner, brief, research, outline, draft);
-                    } else {
-                        console.log(chalk.red('\nMaximum redraft attempts reached. Proceeding with current version.'));
-                        // Proceed to publish anyway
-                        const publishAgent = new PublishAgent();
-                        const published = await publishAgent.run(edited);
-                        const filename = `${published.title.replace(/[^a-z0-9]/gi, '_').toLowerCase()}.md`;
-                        fs.writeFileSync(path.join(process.cwd(), 'output', filename), published.markdown);
-                        this.log('5_published_forced', published);
-                        return;
+            graph.add('review', ['brief', 'research', 'outline'], ({ brief, research, outline }) =>
+                this.review(spinner, graph, { draft: draftAgent, editor: editorAgent, publish: publishAgent }, brief, research, outline, this.speculate === 'eager' && !publishedBefore));
+
+            // 5. Publish (forced once the redraft attempts are used up)
+            graph.add('published', ['review'], async ({ review }) => {
+                const { edited, passed, speculation } = review;
+                const publish = async (agent: PublishAgent) => {
+                    const early = speculation && await speculation.commit(publishInput(edited.value));
+                    if (early) {
+                        agent.timing = {};
+                        return early;
                     }
-                }
-            }
+                    return agent.run(edited.value, metadata && await metadata.commit(agent.metadataInput(edited.value)));
+                };
+                const { value } = await this.checkpoint(passed ? '5_published' : '5_published_forced', 'published', PublishedArticleSchema,
+                    { edit: edited.ref, mode: publishAgent.mode },
+                    () => passed ? this.step(spinner, 'Publishing...', publishAgent, publish) : publish(publishAgent));
+                return { value, forced: !passed };
+            });
+
+            const { value: article, forced } = await graph.get('published');
+            const filename = this.writeArticle(article);
+            await graph.settled();
+            if (!forced) this.say(chalk.green.bold(`\n✨ Done! Saved to /output/${filename}`));
+            this.reportStats();
+            return finish(forced ? 'published_forced' : 'published', { title: article.title, file: path.join('output', filename) });
 
         } catch (error) {
-            console.error(chalk.red('\nPipeline failed:'), error);
+            // Speculative work still running is discarded once the stages have settled
+            graph.settled().catch(() => {});
+            if (!this.quiet) {
+                console.error(chalk.red('\nPipeline failed:'), error);
+                console.error(chalk.yellow(`Completed stages are checkpointed; continue with: contentforge resume ${this.runId}`));
+            }
+            return finish('failed', { error: error instanceof Error ? error.message : String(error) });
+        }
+    }
+
+    /**
+     * Drafts and edits until the editor passes a draft or the CritiqueLoop stops it (redrafts
+     * used up, scores no longer improving, or budget), then hands over the best edited version.
+     * With `speculate`, each draft is also published while the editor reviews it, in case the
+     * editor passes it unchanged.
+     */
+    private async review(spinner: any, graph: StageGraph<RunStages>, agents: { draft: DraftAgent; editor: EditorAgent; publish: PublishAgent }, brief: Staged<ContentBrief>, research: Staged<ResearchPackage>, outline: Staged<ArticleOutline>, speculate: boolean): Promise<Review> {
+        const { draft: draftAgent, editor: editorAgent, publish: publishAgent } = agents;
+        const loop = new CritiqueLoop(this.budget, this.usage, this.startedAt);
+
+        // Initial Draft
+        let { value: draft, ref: draftRef } = await this.checkpoint('4_draft_v0', 'draft', ArticleDraftSchema,
+            { brief: brief.ref, research: research.ref, outline: outline.ref, mode: draftAgent.mode },
+            async () => {
+                const draft = await this.runDraft(draftAgent, spinner, 0, brief.value, research.value, outline.value);
+                draft.brief_ref = brief.ref;
+                draft.outline_ref = outline.ref;
+                return draft;
+            });
+        let attempts = 0;
+        const maxAttempts = this.budget.maxRedrafts;
+
+        while (true) {
+            const unedited = publishInput(draft);
+            const speculation = speculate && publishAgent.mode === 'llm'
+                ? graph.speculate({ name: 'publish', agent: publishAgent.name, after: [], guess: () => unedited, run: (input, signal) => cancellable(signal, () => publishAgent.run(input)) })
+                : undefined;
+            const { value: edited, ref: editRef } = await this.checkpoint(`4_edit_attempt_${attempts}`, 'edit', EditedArticleSchema,
+                { brief: brief.ref, draft: draftRef, mode: editorAgent.mode },
+                async () => {
+                    const editLabel = `Editing (Attempt ${attempts + 1}/${maxAttempts + 1})...`;
+                    let editedChars = 0;
+                    editorAgent.onField = {
+                        onDelta: (field, delta) => {
+                            if (field !== 'body') return;
+                            editedChars += delta.length;
+                            spinner.text = `${editLabel} ${editedChars} chars`;
+                        },
+                    };
+                    const edited = await this.step(spinner, editLabel, editorAgent, agent => agent.run({ brief: brief.value, draft }));
+                    edited.brief_ref = brief.ref;
+                    edited.draft_ref = draftRef;
+                    return edited;
+                });
+
+            // Check Threshold
+            const stop = loop.add({ attempt: attempts, edited, ref: editRef });
+            if (stop) this.manifest.critique = loop.outcome(stop);
+            if (stop === 'passed') {
+                this.say(chalk.green(`  › Quality Threshold Met! Scores: Clarity ${edited.quality_scores.clarity}/10, Structure ${edited.quality_scores.structure}/10`));
+                return { edited: { value: edited, ref: editRef }, passed: true, speculation };
+            }
+            this.say(chalk.yellow(`  › Quality Check Failed. Feedback: ${edited.feedback_for_redraft?.substring(0, 50)}...`));
+            speculation?.discard();
+            if (stop) {
+                const best = loop.best();
+                const scores = loop.outcome(stop).scores.join(' → ');
+                this.say(chalk.red(`\n${STOP_MESSAGES[stop]} Proceeding with edit ${best.attempt + 1} (mean score ${meanScore(best.edited).toFixed(2)}; scores ${scores}).`));
+                return { edited: { value: best.edited, ref: best.ref }, passed: false };
+            }
+            attempts++;
+
+            // Pass feedback back into draft
+            // We attach the feedback to the draft object that acts as input context
+            const previousDraft = { ...draft, feedback_for_redraft: edited.feedback_for_redraft };
+            const targets = this.redraftMode === 'sections' ? failingSections(edited) : [];
+            ({ value: draft, ref: draftRef } = await this.checkpoint(`4_draft_v${attempts}`, 'draft', ArticleDraftSchema,
+                { previous: draftRef, edit: editRef, mode: draftAgent.mode, redraft: this.redraftMode },
+                async () => {
+                    if (targets.length) {
+                        this.say(chalk.yellow(`  › Redrafting ${targets.length} section${targets.length === 1 ? '' : 's'}: ${targets.map(t => t.heading).join(', ')}`));
+                    }
+                    const draft = await this.runDraft(draftAgent, spinner, attempts, brief.value, research.value, outline.value, previousDraft, targets);
+                    draft.brief_ref = brief.ref;
+                    draft.outline_ref = outline.ref;
+                    return draft;
+                }));
+        }
+    }
+
+    // Prints the per-stage LLM call table, then prompt-token savings from the per-agent input projections and LLM cache counters.
+    private reportStats() {
+        if (this.quiet) return;
+        console.log(chalk.gray('\nLLM calls:'));
+        for (const line of formatSummary(metrics.summary())) console.log(chalk.gray(`  ${line}`));
+        console.log(chalk.gray('\nPrompt input (est. tokens, full → projected):'));
+        for (const [agent, s] of Object.entries(getProjectionStats())) {
+            const full = estimateTokens(s.fullChars);
+            const sent = estimateTokens(s.projectedChars);
+            const saved = full > 0 ? ((1 - sent / full) * 100).toFixed(0) : '0';
+            console.log(chalk.gray(`  ${agent.padEnd(14)} ${String(full).padStart(7)} → ${String(sent).padStart(7)}  (-${saved}%, ${s.calls} call${s.calls === 1 ? '' : 's'})`));
+        }
+        for (const [mode, e] of Object.entries(getEditStats())) {
+            const sent = estimateTokens(e.outputChars);
+            const full = estimateTokens(e.fullOutputChars);
+            const saved = full > 0 ? ((1 - sent / full) * 100).toFixed(0) : '0';
+            const rejected = e.rejected ? `, ${e.rejected} patch${e.rejected === 1 ? '' : 'es'} rejected` : '';
+            console.log(chalk.gray(`Editor output (${mode}): ${e.passes} pass${e.passes === 1 ? '' : 'es'}, ${sent} tokens vs ${full} for full bodies (-${saved}%), ~${((e.fullGenerationMs - e.generationMs) / 1000).toFixed(1)}s saved${rejected}`));
+        }
+        for (const [agent, r] of Object.entries(getRepairStats())) {
+            if (!r.repaired && !r.recalled && !r.failed) continue;
+            const kinds = Object.entries(r.byKind).map(([kind, n]) => `${kind} ${n}`).join(', ');
+            const pct = (n: number) => `${((n / Math.max(1, r.parsed)) * 100).toFixed(0)}%`;
+            console.log(chalk.gray(`JSON repair (${agent}): ${r.repaired}/${r.parsed} repaired locally (${pct(r.repaired)}${kinds ? `: ${kinds}` : ''}), ${r.recalled} targeted re-call${r.recalled === 1 ? '' : 's'} (${pct(r.recalled)}), ${r.failed} failed`));
+        }
+        for (const [agent, c] of Object.entries(getCascadeStats())) {
+            const reasons = Object.entries(c.byReason).map(([reason, n]) => `${reason} ${n}`).join(', ');
+            const tiers = Array.from(c.byTier, n => n || 0).join('/');
+            console.log(chalk.gray(`Cascade (${agent}): ${c.escalated}/${c.calls} calls escalated (${((c.escalated / c.calls) * 100).toFixed(0)}%${reasons ? `: ${reasons}` : ''}), answered per tier ${tiers}`));
+        }
+        const kb = getKnowledgeStats();
+        if (kb.calls > 0) {
+            console.log(chalk.gray(`Research knowledge base: ${kb.calls} call${kb.calls === 1 ? '' : 's'} built on ${kb.retrieved} retrieved items (${kb.kept} kept), ${kb.added} new items`));
+        }
+        for (const line of formatSpeculation(metrics.speculationSummary())) console.log(chalk.gray(line));
+        const so = getStructuredStats();
+        if (so.requests || so.fallbacks.length) {
+            const fallbacks = so.fallbacks.length ? `; schema rejected, using JSON mode for ${so.fallbacks.join(', ')}` : '';
+            console.log(chalk.gray(`Structured output: ${so.requests} native request${so.requests === 1 ? '' : 's'}${fallbacks}`));
+        }
+        const c = responseCache.stats;
+        console.log(chalk.gray(`LLM cache: ${c.memoryHits + c.diskHits} hits (${c.memoryHits} memory, ${c.diskHits} disk), ${c.misses} misses, ${c.coalesced} coalesced`));
+        const t = transport.stats;
+        const reuse = t.requests > 0 ? ((t.reused / t.requests) * 100).toFixed(0) : '0';
+        const handshake = t.connections > 0 ? (t.handshakeMs / t.connections).toFixed(0) : '0';
+        console.log(chalk.gray(`Connections: ${t.requests} requests, ${reuse}% on reused connections, ${t.connections} opened (${t.preconnects} preconnected, avg handshake ${handshake}ms)`));
+        if (hedgeStats.hedged || hedgeStats.failedOver) {
+            console.log(chalk.gray(`Hedging: ${hedgeStats.hedged} calls hedged (${hedgeStats.won} won by the fallback), ${hedgeStats.failedOver} failed over`));
+        }
+        for (const [key, r] of Object.entries(getRateLimitStats())) {
+            if (!r.throttled && !r.rateLimited && !r.serverErrors) continue;
+            console.log(chalk.gray(`Rate limits (${key}): ${r.throttled}/${r.calls} calls queued for ${(r.waitedMs / 1000).toFixed(1)}s, ${r.rateLimited} × 429, ${r.serverErrors} × 5xx, concurrency now ${r.concurrency}`));
         }
     }
 
-    private async runDraft(agent: DraftAgent, spinner: any, brief: any, research: any, outline: any, previousDraft?: any) {
-        spinner.start(previousDraft ? 'Redrafting...' : 'Writing Draft...');
+    // "[XAgent] ✓ completed in N.Ns", plus time to first token when the call streamed
+    private completed(agent: BaseAgent<any, any>, start: number): string {
+        const { ttftMs, totalMs } = agent.timing;
+        this.stages.push({ agent: agent.name, ms: Date.now() - start, ttft_ms: ttftMs });
+        const ttft = ttftMs !== undefined && ttftMs !== totalMs ? ` (first token ${(ttftMs / 1000).toFixed(1)}s)` : '';
+        return `[${agent.name}] ✓ completed in ${((Date.now() - start)/1000).toFixed(1)}s${ttft}`;
+    }
+
+    private async runDraft(agent: DraftAgent, spinner: any, version: number, brief: any, research: any, outline: any, previousDraft?: any, sectionsToRedraft?: SectionFeedback[]) {
+        const label = previousDraft ? 'Redrafting...' : 'Writing Draft...';
+        spinner.start(label);
         const start = Date.now();
+
+        // Stream the body to output/<runId>/draft_v<N>.md while the model is still writing it
+        fs.mkdirSync(this.logDir, { recursive: true });
+        const bodyFd = fs.openSync(path.join(this.logDir, `draft_v${version}.md`), 'w');
+        let bytes = 0;
+        let chars = 0;
+        agent.onField = {
+            onDelta: (field, delta) => {
+                if (field !== 'body') return;
+                bytes += fs.writeSync(bodyFd, delta, bytes);
+                chars += delta.length;
+                spinner.text = `${label} ${chars} chars`;
+            },
+            onValue: (field, value) => {
+                if (field === 'title') spinner.text = `${label} "${value}"`;
+            },
+            onReset: () => {
+                fs.ftruncateSync(bodyFd, 0);
+                bytes = chars = 0;
+            },
+        };
+
         // The DraftAgent expects { brief, research, outline } 
         // If it's a redraft, we pass the previous draft (which contains feedback) as well
-        const input = previousDraft ? { brief, research, outline, previousDraft } : { brief, research, outline };
-        const draft = await agent.run(input as any); 
-        spinner.succeed(`[DraftAgent] ✓ completed in ${((Date.now() - start)/1000).toFixed(1)}s`);
-        return draft;
+        const input = previousDraft ? { brief, research, outline, previousDraft, sectionsToRedraft } : { brief, research, outline };
+        try {
+            const draft = await agent.run(input as any);
+            spinner.succeed(this.completed(agent, start));
+            return draft;
+        } finally {
+            fs.closeSync(bodyFd);
+        }
     }
 }
\ No newline at end of file
@@ -0,0 +1,78 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as path from 'path';
+import { ZodSchema } from 'zod';
+import { ArtifactRef } from '../types';
+
+export type ArtifactKind = 'brief' | 'research' | 'outline' | 'draft' | 'edit' | 'published';
+
+// Serializes with sorted object keys so that equal content always hashes to the same ref.
+export function canonicalJSON(data: unknown): string {
+    return JSON.stringify(data, (_key, value) => {
+        if (value && typeof value === 'object' && !Array.isArray(value)) {
+            const sorted: Record<string, unknown> = {};
+            for (const k of Object.keys(value).sort()) sorted[k] = value[k];
+            return sorted;
+        }
+        return value;
+    });
+}
+
+export function hashContent(serialized: string): ArtifactRef {
+    return crypto.createHash('sha256').update(serialized).digest('hex');
+}
+
+/**
+ * Content-addressed store for pipeline artifacts.
+ * Each object is written once to `<rootDir>/<kind>/<sha256>.json`; stages link to
+ * their inputs through `*_ref` fields, so a run only pays for content it actually produced.
+ */
+export class ArtifactStore {
+    private rootDir: string;
+    private known = new Set<string>();
+
+    constructor(rootDir: string = path.join(process.cwd(), 'output', 'artifacts')) {
+        this.rootDir = rootDir;
+    }
+
+    pathFor(kind: ArtifactKind, ref: ArtifactRef): string {
+        return path.join(this.rootDir, kind, `${ref}.json`);
+    }
+
+    put(kind: ArtifactKind, data: unknown): ArtifactRef {
+        const serialized = canonicalJSON(data);
+        const ref = hashContent(serialized);
+        const key = `${kind}/${ref}`;
+        if (this.known.has(key)) return ref;
+
+        const file = this.pathFor(kind, ref);
+        if (!fs.existsSync(file)) {
+            fs.mkdirSync(path.dirname(file), { recursive: true });
+            // Write-then-rename so concurrent runs never observe a half-written artifact
+            const tmp = `${file}.${process.pid}.${crypto.randomBytes(4).toString('hex')}.tmp`;
+            fs.writeFileSync(tmp, serialized);
+            fs.renameSync(tmp, file);
+        }
+        this.known.add(key);
+        return ref;
+    }
+
+    has(kind: ArtifactKind, ref: ArtifactRef): boolean {
+        return this.known.has(`${kind}/${ref}`) || fs.existsSync(this.pathFor(kind, ref));
+    }
+
+    get<T>(kind: ArtifactKind, ref: ArtifactRef, schema?: ZodSchema<T>): T {
+        const file = this.pathFor(kind, ref);
+        let raw: string;
+        try {
+            raw = fs.readFileSync(file, 'utf-8');
+        } catch (e) {
+            throw new Error(`Artifact not found: ${kind}/${ref}`);
+        }
+        if (hashContent(raw) !== ref) {
+            throw new Error(`Artifact ${kind}/${ref} is corrupt (hash mismatch)`);
+        }
+        const parsed = JSON.parse(raw);
+        return schema ? schema.parse(parsed) : parsed;
+    }
+}
@@ -0,0 +1,280 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as path from 'path';
+import { ResearchPackage, ResearchPackageSchema } from '../types';
+import { tokenize } from '../utils/text';
+
+// The lists of a ResearchPackage that hold reusable knowledge (research gaps are brief-specific)
+export const KNOWLEDGE_KINDS = ['key_facts', 'key_questions_answered', 'supporting_examples', 'counterarguments', 'suggested_sources'] as const;
+export type KnowledgeKind = typeof KNOWLEDGE_KINDS[number];
+
+export type KnowledgeItem = { id: number; kind: KnowledgeKind; text: string };
+export type KnowledgeHit = KnowledgeItem & { score: number };
+
+// BM25 parameters (the usual defaults)
+const K1 = 1.2;
+const B = 0.75;
+// Terms in more than this share of items carry almost no signal and have the longest postings
+const MAX_DOC_FREQUENCY = 0.25;
+// A posting packs the item id and its term frequency into one int; BM25 saturates long before 15
+const TF_BITS = 4;
+const TF_MAX = (1 << TF_BITS) - 1;
+// A new snapshot is written once this many items, and a tenth of the last snapshot, are outside it
+const SNAPSHOT_MIN_ITEMS = 5000;
+const SNAPSHOT_VERSION = 1;
+
+type StoredItem = { h: string; k: KnowledgeKind; t: string; r?: string };
+
+// The first `items` items of the store (ending with the one hashed `last`), `bytes` long
+type SnapshotHeader = { version: number; items: number; bytes: number; last: string; terms: string[]; sizes: number[] };
+
+function itemHash(text: string): string {
+    return crypto.createHash('sha1').update(text.toLowerCase().replace(/\s+/g, ' ').trim()).digest('hex');
+}
+
+/**
+ * Persistent full-text index over every research item the pipeline has produced. Items are
+ * appended to one JSONL file (written once, deduplicated by normalized text) and indexed in
+ * memory: an inverted index of term → (item, term frequency) postings, ranked with BM25.
+ * Ingesting a package appends a few lines; a query walks only the postings of its own terms.
+ * The postings are snapshotted to a binary file now and then, so loading only tokenizes the
+ * items added since. A missing store is rebuilt from the research artifacts under output/.
+ */
+export class KnowledgeBase {
+    private file: string;
+    private snapshotFile: string;
+    private artifactsDir: string;
+    private loaded = false;
+    // Bytes of the store this process has read or appended
+    private bytes = 0;
+    private texts: string[] = [];
+    private kinds: KnowledgeKind[] = [];
+    private lastHash = '';
+    private lengths: number[] = [];
+    private totalLength = 0;
+    // Term ids, and per term id the packed postings of the items containing it (views into the
+    // snapshot until an item is added)
+    private terms = new Map<string, number>();
+    private postings: (number[] | Int32Array)[] = [];
+    private seen = new Set<string>();
+    private snapshotItems = 0;
+    // Per-item accumulators reused across queries; only the touched entries are reset
+    private scores = new Float64Array(0);
+    private matched = new Uint8Array(0);
+
+    constructor(outputDir: string) {
+        this.file = path.join(outputDir, 'research-kb.jsonl');
+        this.snapshotFile = path.join(outputDir, 'research-kb.index');
+        this.artifactsDir = path.join(outputDir, 'artifacts', 'research');
+    }
+
+    get size(): number {
+        this.load();
+        return this.texts.length;
+    }
+
+    private load() {
+        if (this.loaded) return;
+        this.loaded = true;
+        if (!fs.existsSync(this.file)) {
+            this.backfill();
+            return;
+        }
+        const raw = fs.readFileSync(this.file);
+        this.bytes = raw.length;
+        const items: StoredItem[] = [];
+        for (const line of raw.toString('utf-8').split('\n')) {
+            if (!line) continue;
+            try {
+                const item: StoredItem = JSON.parse(line);
+                if (!this.seen.has(item.h)) {
+                    this.seen.add(item.h);
+                    items.push(item);
+                }
+            } catch (e) { /* a line cut short by a crash */ }
+        }
+        const restored = this.restore(items);
+        items.forEach((item, id) => {
+            this.add(item);
+            if (id >= restored) this.post(id, item.t);
+        });
+        this.maybeSnapshot();
+    }
+
+    // Ingests every research package already in the artifact store
+    private backfill() {
+        if (!fs.existsSync(this.artifactsDir)) return;
+        for (const name of fs.readdirSync(this.artifactsDir)) {
+            if (!name.endsWith('.json')) continue;
+            try {
+                const research = ResearchPackageSchema.parse(JSON.parse(fs.readFileSync(path.join(this.artifactsDir, name), 'utf-8')));
+                this.ingest(research);
+            } catch (e) { /* a partial write or an older schema */ }
+        }
+    }
+
+    private add(item: StoredItem) {
+        this.seen.add(item.h);
+        this.texts.push(item.t);
+        this.kinds.push(item.k);
+        this.lastHash = item.h;
+    }
+
+    private post(id: number, text: string) {
+        const tokens = tokenize(text);
+        this.lengths[id] = tokens.length;
+        this.totalLength += tokens.length;
+        // Sorted term ids, so equal terms are adjacent and counting needs no map per item
+        const ids = tokens.map(token => {
+            let termId = this.terms.get(token);
+            if (termId === undefined) {
+                this.terms.set(token, termId = this.postings.length);
+                this.postings.push([]);
+            }
+            return termId;
+        }).sort((a, b) => a - b);
+        for (let i = 0; i < ids.length;) {
+            let j = i + 1;
+            while (j < ids.length && ids[j] === ids[i]) j++;
+            let list = this.postings[ids[i]];
+            if (!Array.isArray(list)) this.postings[ids[i]] = list = Array.from(list);
+            list.push((id << TF_BITS) | Math.min(j - i, TF_MAX));
+            i = j;
+        }
+    }
+
+    // Loads the postings of the snapshot if it still describes the start of `items`; returns how many items it covers
+    private restore(items: StoredItem[]): number {
+        if (!fs.existsSync(this.snapshotFile)) return 0;
+        try {
+            const data = fs.readFileSync(this.snapshotFile);
+            const headerLength = data.readUInt32LE(0);
+            const header: SnapshotHeader = JSON.parse(data.toString('utf-8', 4, 4 + headerLength));
+            // Another layout, or a store that was rebuilt since
+            if (header.version !== SNAPSHOT_VERSION || header.bytes > this.bytes || items[header.items - 1]?.h !== header.last) return 0;
+            // Copied out of the file buffer, which needn't be 4-byte aligned
+            const ints = new Int32Array(data.buffer.slice(data.byteOffset + 4 + headerLength, data.byteOffset + data.length));
+            let at = 0;
+            header.terms.forEach((term, termId) => {
+                this.terms.set(term, termId);
+                this.postings.push(ints.subarray(at, at += header.sizes[termId]));
+            });
+            this.lengths = Array.from(ints.subarray(at, at + header.items));
+            this.totalLength = this.lengths.reduce((sum, length) => sum + length, 0);
+            this.snapshotItems = header.items;
+            return header.items;
+        } catch (e) {
+            // A truncated or unreadable snapshot: index everything from the store instead
+            this.terms.clear();
+            this.postings = [];
+            this.lengths = [];
+            this.totalLength = 0;
+            return 0;
+        }
+    }
+
+    private maybeSnapshot() {
+        const n = this.texts.length;
+        if (n - this.snapshotItems < Math.max(SNAPSHOT_MIN_ITEMS, this.snapshotItems / 10)) return;
+        try {
+            // Another process appended since this one read the store, so item ids no longer follow the file
+            if (fs.statSync(this.file).size !== this.bytes) return;
+            const header: SnapshotHeader = {
+                version: SNAPSHOT_VERSION,
+                items: n,
+                bytes: this.bytes,
+                last: this.lastHash,
+                terms: [...this.terms.keys()],
+                sizes: this.postings.map(list => list.length),
+            };
+            const ints = new Int32Array(header.sizes.reduce((sum, size) => sum + size, 0) + n);
+            let at = 0;
+            for (const list of this.postings) {
+                ints.set(list, at);
+                at += list.length;
+            }
+            ints.set(this.lengths, at);
+            const json = Buffer.from(JSON.stringify(header));
+            const prefix = Buffer.alloc(4);
+            prefix.writeUInt32LE(json.length);
+            const tmp = `${this.snapshotFile}.${process.pid}.tmp`;
+            fs.writeFileSync(tmp, Buffer.concat([prefix, json, Buffer.from(ints.buffer)]));
+            fs.renameSync(tmp, this.snapshotFile);
+            this.snapshotItems = n;
+        } catch (e) { /* the next load indexes the rest itself */ }
+    }
+
+    /** Adds the items of a research package that aren't stored yet. Returns how many were new. */
+    ingest(research: ResearchPackage, runId?: string): number {
+        this.load();
+        const lines: string[] = [];
+        for (const kind of KNOWLEDGE_KINDS) {
+            for (const text of research[kind] || []) {
+                const h = itemHash(text);
+                if (!text.trim() || this.seen.has(h)) continue;
+                const item: StoredItem = { h, k: kind, t: text.trim(), r: runId };
+                this.post(this.texts.length, item.t);
+                this.add(item);
+                lines.push(JSON.stringify(item));
+            }
+        }
+        if (lines.length > 0) {
+            const appended = lines.join('\n') + '\n';
+            fs.mkdirSync(path.dirname(this.file), { recursive: true });
+            fs.appendFileSync(this.file, appended);
+            this.bytes += Buffer.byteLength(appended);
+            this.maybeSnapshot();
+        }
+        return lines.length;
+    }
+
+    /**
+     * The `k` items ranking highest for `query` by BM25. Items must share at least `minTerms`
+     * distinct terms with the query (fewer if the query itself is shorter).
+     */
+    search(query: string, k: number, minTerms: number = 2): KnowledgeHit[] {
+        this.load();
+        const n = this.texts.length;
+        if (n === 0) return [];
+        const terms = [...new Set(tokenize(query))];
+        const required = Math.min(minTerms, terms.length);
+        const average = this.totalLength / n;
+        if (this.scores.length < n) {
+            this.scores = new Float64Array(n * 2);
+            this.matched = new Uint8Array(n * 2);
+        }
+        const { scores, matched } = this;
+        const touched: number[] = [];
+        for (const term of terms) {
+            const termId = this.terms.get(term);
+            if (termId === undefined) continue;
+            const list = this.postings[termId];
+            const df = list.length;
+            if (n >= 100 && df / n > MAX_DOC_FREQUENCY) continue;
+            const idf = Math.log(1 + (n - df + 0.5) / (df + 0.5));
+            for (const posting of list) {
+                const id = posting >>> TF_BITS;
+                const tf = posting & TF_MAX;
+                if (matched[id] === 0) touched.push(id);
+                scores[id] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * this.lengths[id] / average));
+                matched[id]++;
+            }
+        }
+        const hits: KnowledgeHit[] = [];
+        for (const id of touched) {
+            if (matched[id] >= required) hits.push({ id, kind: this.kinds[id], text: this.texts[id], score: scores[id] });
+            scores[id] = 0;
+            matched[id] = 0;
+        }
+        return hits.sort((a, b) => b.score - a.score).slice(0, k);
+    }
+}
+
+const bases = new Map<string, KnowledgeBase>();
+
+// One knowledge base per output directory, shared by every run in the process
+export function knowledgeBase(outputDir: string = path.join(process.cwd(), 'output')): KnowledgeBase {
+    let base = bases.get(outputDir);
+    if (!base) bases.set(outputDir, base = new KnowledgeBase(outputDir));
+    return base;
+}
@@ -0,0 +1,153 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { ArtifactRef, ContentBrief, ContentBriefSchema } from '../types';
+import { ArtifactStore } from './artifacts';
+import { shingles, tokenize } from '../utils/text';
+
+// Signature length: the estimate's standard error is about 1/sqrt(64) = 0.125 at worst, 0.06 near 0.8
+const PERMUTATIONS = 64;
+
+// Fixed per-permutation seeds, so signatures stay comparable across runs and versions
+const SEEDS = Array.from({ length: PERMUTATIONS }, (_, i) => fmix32((i + 1) * 0x9e3779b9));
+
+// 32-bit FNV-1a
+function fnv1a(text: string): number {
+    let h = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        h ^= text.charCodeAt(i);
+        h = Math.imul(h, 0x01000193);
+    }
+    return h >>> 0;
+}
+
+// MurmurHash3 finalizer: turns one hash into an independent-looking one per seed
+function fmix32(h: number): number {
+    h ^= h >>> 16;
+    h = Math.imul(h, 0x85ebca6b);
+    h ^= h >>> 13;
+    h = Math.imul(h, 0xc2b2ae35);
+    h ^= h >>> 16;
+    return h >>> 0;
+}
+
+// Words and word pairs, so both vocabulary and phrasing count
+function features(text: string): Set<string> {
+    return new Set([...tokenize(text), ...shingles(text, 2)]);
+}
+
+/** MinHash signature of a text; empty when the text has no words. */
+export function signature(text: string): number[] {
+    const sig: number[] = [];
+    const hashes = [...features(text)].map(fnv1a);
+    if (hashes.length === 0) return sig;
+    for (const seed of SEEDS) {
+        let min = 0xffffffff;
+        for (const h of hashes) {
+            const v = fmix32(h ^ seed);
+            if (v < min) min = v;
+        }
+        sig.push(min);
+    }
+    return sig;
+}
+
+/** Estimated Jaccard similarity of the feature sets behind two signatures. */
+export function similarity(a: number[], b: number[]): number {
+    if (a.length === 0 || a.length !== b.length) return 0;
+    let same = 0;
+    for (let i = 0; i < a.length; i++) if (a[i] === b[i]) same++;
+    return same / a.length;
+}
+
+// The parts of a brief that decide what research it needs
+export function briefText(brief: ContentBrief): string {
+    return [brief.topic, brief.working_title, brief.purpose, brief.angle, ...brief.key_points].join('\n');
+}
+
+export type TopicEntry = {
+    run_id: string;
+    topic: string;
+    brief_ref: ArtifactRef;
+    research_ref?: ArtifactRef;
+    topic_sig: number[];
+    brief_sig: number[];
+};
+
+export type TopicMatch = { entry: TopicEntry; similarity: number };
+
+/**
+ * Similarity index over the topics and briefs of past runs, kept as one JSON line per run in
+ * output/topic-index.jsonl (appends from concurrent runs don't clash). A missing index is
+ * rebuilt from the run manifests and artifacts already under output/. Lookups are a linear
+ * scan over fixed-size signatures, which stays well under a millisecond for thousands of runs.
+ */
+export class TopicIndex {
+    private file: string;
+    private store: ArtifactStore;
+    private entries?: Map<string, TopicEntry>;
+
+    constructor(store: ArtifactStore, file: string = path.join(process.cwd(), 'output', 'topic-index.jsonl')) {
+        this.store = store;
+        this.file = file;
+    }
+
+    private load(): Map<string, TopicEntry> {
+        if (this.entries) return this.entries;
+        this.entries = new Map();
+        if (!fs.existsSync(this.file)) {
+            this.backfill();
+            return this.entries;
+        }
+        for (const line of fs.readFileSync(this.file, 'utf-8').split('\n')) {
+            if (!line.trim()) continue;
+            try {
+                const entry: TopicEntry = JSON.parse(line);
+                // A resumed run appends again; its latest line wins
+                this.entries.set(entry.run_id, entry);
+            } catch (e) { /* a line cut short by a crash */ }
+        }
+        return this.entries;
+    }
+
+    // Indexes every earlier run whose manifest has a completed brief
+    private backfill() {
+        const outputDir = path.dirname(this.file);
+        if (!fs.existsSync(outputDir)) return;
+        for (const dir of fs.readdirSync(outputDir)) {
+            try {
+                const manifest = JSON.parse(fs.readFileSync(path.join(outputDir, dir, 'manifest.json'), 'utf-8'));
+                const stage = (name: string) => manifest.stages?.find((c: any) => c.stage === name && c.status === 'done' && c.ref);
+                const briefRef = stage('1_brief')?.ref;
+                if (!manifest.topic || !briefRef) continue;
+                const brief = this.store.get('brief', briefRef, ContentBriefSchema);
+                this.add(manifest.run_id || dir, manifest.topic, briefRef, brief, stage('2_research')?.ref);
+            } catch (e) { /* not a run directory, or its artifacts are gone */ }
+        }
+    }
+
+    add(runId: string, topic: string, briefRef: ArtifactRef, brief: ContentBrief, researchRef?: ArtifactRef) {
+        const entry: TopicEntry = {
+            run_id: runId,
+            topic,
+            brief_ref: briefRef,
+            research_ref: researchRef,
+            topic_sig: signature(topic),
+            brief_sig: signature(briefText(brief)),
+        };
+        this.load().set(runId, entry);
+        fs.mkdirSync(path.dirname(this.file), { recursive: true });
+        fs.appendFileSync(this.file, JSON.stringify(entry) + '\n');
+    }
+
+    /** The most similar earlier run by topic or by brief, other than `excludeRunId`. */
+    nearest(by: 'topic' | 'brief', text: string, excludeRunId: string, needResearch: boolean = false): TopicMatch | undefined {
+        const sig = signature(text);
+        let best: TopicMatch | undefined;
+        for (const entry of this.load().values()) {
+            if (entry.run_id === excludeRunId || (needResearch && !entry.research_ref)) continue;
+            const score = similarity(sig, by === 'topic' ? entry.topic_sig : entry.brief_sig);
+            if (!best || score > best.similarity) best = { entry, similarity: score };
+        }
+        return best;
+    }
+}
@@ -3,6 +3,11 @@ import { z } from 'zod';
 // --- Enums & Helpers ---
 export const ContentTypeEnum = z.enum(['Blog Post', 'Article', 'Case Study', 'Whitepaper', 'Opinion Piece']);
 
+// Stages point at their upstream objects by content hash instead of embedding them.
+// The hashes are assigned by the ArtifactStore (src/store/artifacts.ts), never by the LLM.
+export const ArtifactRefSchema = z.string().regex(/^[a-f0-9]{64}$/);
+export type ArtifactRef = z.infer<typeof ArtifactRefSchema>;
+
 // 1. ContentBrief
 export const ContentBriefSchema = z.object({
   topic: z.string(),
@@ -21,7 +26,7 @@ export type ContentBrief = z.infer<typeof ContentBriefSchema>;
 
 // 2. ResearchPackage
 export const ResearchPackageSchema = z.object({
-  brief: ContentBriefSchema,
+  brief_ref: ArtifactRefSchema.optional(),
   key_facts: z.array(z.string()),
   key_questions_answered: z.array(z.string()),
   supporting_examples: z.array(z.string()),
@@ -31,10 +36,23 @@ export const ResearchPackageSchema = z.object({
 });
 export type ResearchPackage = z.infer<typeof ResearchPackageSchema>;
 
+// 2a. ResearchFacet (one list of a ResearchPackage, produced on its own in parallel research)
+export const ResearchFacetSchema = z.object({
+  items: z.array(z.string())
+});
+export type ResearchFacet = z.infer<typeof ResearchFacetSchema>;
+
+// 2b. ResearchExtension (research built on items retrieved from the knowledge base: the ids of
+// retrieved items to keep plus new items only)
+export const ResearchExtensionSchema = ResearchPackageSchema.omit({ brief_ref: true }).extend({
+  keep: z.array(z.string())
+});
+export type ResearchExtension = z.infer<typeof ResearchExtensionSchema>;
+
 // 3. ArticleOutline
 export const ArticleOutlineSchema = z.object({
-  brief: ContentBriefSchema,
-  research: ResearchPackageSchema,
+  brief_ref: ArtifactRefSchema.optional(),
+  research_ref: ArtifactRefSchema.optional(),
   sections: z.array(z.object({
     heading: z.string(),
     points: z.array(z.string()),
@@ -48,8 +66,8 @@ export type ArticleOutline = z.infer<typeof ArticleOutlineSchema>;
 
 // 4. ArticleDraft
 export const ArticleDraftSchema = z.object({
-  brief: ContentBriefSchema,
-  outline: ArticleOutlineSchema,
+  brief_ref: ArtifactRefSchema.optional(),
+  outline_ref: ArtifactRefSchema.optional(),
   title: z.string(),
   body: z.string(),
   word_count: z.number(),
@@ -58,10 +76,25 @@ export const ArticleDraftSchema = z.object({
 });
 export type ArticleDraft = z.infer<typeof ArticleDraftSchema>;
 
+// 4a. DraftSection (one outline section, written on its own in section-parallel drafting)
+export const DraftSectionSchema = z.object({
+  heading: z.string(),
+  body: z.string()
+});
+export type DraftSection = z.infer<typeof DraftSectionSchema>;
+
 // 5. EditedArticle
+// Per-section critique, keyed by the draft's "## " heading
+export const SectionFeedbackSchema = z.object({
+  heading: z.string(),
+  score: z.number().min(1).max(10),
+  feedback: z.string().optional()
+});
+export type SectionFeedback = z.infer<typeof SectionFeedbackSchema>;
+
 export const EditedArticleSchema = z.object({
-  brief: ContentBriefSchema,
-  draft: ArticleDraftSchema,
+  brief_ref: ArtifactRefSchema.optional(),
+  draft_ref: ArtifactRefSchema.optional(),
   title: z.string(),
   body: z.string(),
   word_count: z.number(),
@@ -73,10 +106,28 @@ export const EditedArticleSchema = z.object({
     structure: z.number().min(1).max(10),
   }),
   passed_quality_threshold: z.boolean(),
-  feedback_for_redraft: z.string().optional()
+  feedback_for_redraft: z.string().optional(),
+  section_feedback: z.array(SectionFeedbackSchema).optional()
 });
 export type EditedArticle = z.infer<typeof EditedArticleSchema>;
 
+// 5a. EditPatch (editor output in patch mode: edit operations against the draft body instead of a new body)
+export const EditOperationSchema = z.discriminatedUnion('op', [
+  // Replace the one occurrence of `find` in the body (an empty `replace` deletes it)
+  z.object({ op: z.literal('replace'), find: z.string().min(1), replace: z.string() }),
+  // Insert `text` as new paragraphs directly after the "## " heading line `heading`
+  z.object({ op: z.literal('insert_after_heading'), heading: z.string(), text: z.string().min(1) }),
+]);
+export type EditOperation = z.infer<typeof EditOperationSchema>;
+
+export const EditPatchSchema = EditedArticleSchema
+  .omit({ brief_ref: true, draft_ref: true, title: true, body: true, word_count: true })
+  .extend({
+    title: z.string().optional(),
+    edits: z.array(EditOperationSchema)
+  });
+export type EditPatch = z.infer<typeof EditPatchSchema>;
+
 // 6. PublishedArticle
 export const PublishedArticleSchema = z.object({
   title: z.string(),
@@ -86,4 +137,17 @@ export const PublishedArticleSchema = z.object({
   word_count: z.number(),
   reading_time_minutes: z.number()
 });
-export type PublishedArticle = z.infer<typeof PublishedArticleSchema>;
\ No newline at end of file
+export type PublishedArticle = z.infer<typeof PublishedArticleSchema>;
+
+// The only part of publishing that needs a model (see PublishAgent hybrid mode)
+export const PublishMetadataSchema = PublishedArticleSchema.pick({ description: true, tags: true });
+export type PublishMetadata = z.infer<typeof PublishMetadataSchema>;
+// 7. JsonFix (targeted correction of a response that failed its schema: values for just the failing paths)
+export const JsonFixSchema = z.object({
+  fixes: z.array(z.object({
+    // Dotted path into the object, e.g. "quality_scores.clarity" or "edits.0.find"
+    path: z.string(),
+    value: z.any()
+  }))
+});
+export type JsonFix = z.infer<typeof JsonFixSchema>;
@@ -0,0 +1,116 @@
+import { ZodTypeAny } from 'zod';
+
+export type JsonSchema = { [keyword: string]: unknown };
+
+/**
+ * Target of a conversion:
+ * - json: JSON Schema as accepted by Anthropic tool input schemas (optional fields not required)
+ * - strict: OpenAI strict structured outputs (every field required, optional ones nullable,
+ *   no numeric or length bounds)
+ * - gemini: Gemini's OpenAPI subset (upper-case types, no unions or `const`)
+ */
+export type SchemaDialect = 'json' | 'strict' | 'gemini';
+
+// A zod construct the dialect can't express; the caller falls back to unconstrained JSON
+class Unsupported extends Error {}
+
+const cache = new Map<SchemaDialect, WeakMap<ZodTypeAny, JsonSchema | null>>();
+
+function typed(type: string, dialect: SchemaDialect, nullable: boolean): JsonSchema {
+    if (dialect === 'gemini') return nullable ? { type: type.toUpperCase(), nullable: true } : { type: type.toUpperCase() };
+    return { type: nullable ? [type, 'null'] : type };
+}
+
+function convert(schema: ZodTypeAny, dialect: SchemaDialect, nullable: boolean = false): JsonSchema {
+    const def: any = (schema as any)._def;
+    switch (def.typeName) {
+        case 'ZodOptional':
+        case 'ZodNullable':
+            // Only reached for array items and union members; object fields handle optionality themselves
+            return convert(def.innerType, dialect, dialect !== 'json' || def.typeName === 'ZodNullable');
+        case 'ZodDefault':
+            return convert(def.innerType, dialect, nullable);
+        case 'ZodEffects':
+            return convert(def.schema, dialect, nullable);
+        case 'ZodString':
+            return typed('string', dialect, nullable);
+        case 'ZodBoolean':
+            return typed('boolean', dialect, nullable);
+        case 'ZodNumber': {
+            const isInt = (def.checks || []).some((c: any) => c.kind === 'int');
+            const result = typed(isInt ? 'integer' : 'number', dialect, nullable);
+            if (dialect !== 'strict') {
+                for (const check of def.checks || []) {
+                    if (check.kind === 'min') result.minimum = check.value;
+                    if (check.kind === 'max') result.maximum = check.value;
+                }
+            }
+            return result;
+        }
+        case 'ZodEnum': {
+            const values = [...def.values, ...(nullable && dialect !== 'gemini' ? [null] : [])];
+            return { ...typed('string', dialect, nullable), enum: values };
+        }
+        case 'ZodLiteral':
+            if (typeof def.value !== 'string') throw new Unsupported('non-string literal');
+            return dialect === 'gemini' ? { ...typed('string', dialect, nullable), enum: [def.value] } : { ...typed('string', dialect, nullable), const: def.value };
+        case 'ZodArray': {
+            const result: JsonSchema = { ...typed('array', dialect, nullable), items: convert(def.type, dialect) };
+            if (dialect !== 'strict') {
+                if (def.minLength) result.minItems = def.minLength.value;
+                if (def.maxLength) result.maxItems = def.maxLength.value;
+            }
+            return result;
+        }
+        case 'ZodObject': {
+            const shape = (schema as any).shape as Record<string, ZodTypeAny>;
+            const properties: Record<string, JsonSchema> = {};
+            const required: string[] = [];
+            for (const [key, field] of Object.entries(shape)) {
+                const optional = field.isOptional();
+                const inner = optional ? unwrapOptional(field) : field;
+                properties[key] = convert(inner, dialect, optional && dialect !== 'json');
+                if (!optional || dialect === 'strict') required.push(key);
+            }
+            const result: JsonSchema = { ...typed('object', dialect, nullable), properties, required };
+            if (dialect !== 'gemini') result.additionalProperties = false;
+            return result;
+        }
+        case 'ZodDiscriminatedUnion':
+        case 'ZodUnion': {
+            if (dialect === 'gemini') throw new Unsupported('union');
+            const anyOf = (def.options as ZodTypeAny[]).map(o => convert(o, dialect));
+            return nullable ? { anyOf: [...anyOf, { type: 'null' }] } : { anyOf };
+        }
+        case 'ZodAny':
+        case 'ZodUnknown':
+            if (dialect !== 'json') throw new Unsupported('any');
+            return {};
+        default:
+            throw new Unsupported(def.typeName);
+    }
+}
+
+function unwrapOptional(schema: ZodTypeAny): ZodTypeAny {
+    let current: any = schema;
+    while (current._def.typeName === 'ZodOptional' || current._def.typeName === 'ZodDefault') current = current._def.innerType;
+    return current;
+}
+
+/**
+ * JSON Schema for a zod schema in the given dialect, or undefined when the schema uses
+ * something the dialect can't express (e.g. `z.any()` under OpenAI strict mode). Memoized.
+ */
+export function toJsonSchema(schema: ZodTypeAny, dialect: SchemaDialect = 'json'): JsonSchema | undefined {
+    let memo = cache.get(dialect);
+    if (!memo) cache.set(dialect, memo = new WeakMap());
+    if (!memo.has(schema)) {
+        try {
+            memo.set(schema, convert(schema, dialect));
+        } catch (e) {
+            if (!(e instanceof Unsupported)) throw e;
+            memo.set(schema, null);
+        }
+    }
+    return memo.get(schema) ?? undefined;
+}
@@ -0,0 +1,43 @@
+// Counting semaphore: at most `max` holders at a time, waiters served FIFO.
+export class Semaphore {
+    private active = 0;
+    private waiting: (() => void)[] = [];
+    private max: number;
+
+    constructor(max: number) {
+        if (!Number.isInteger(max) || max < 1) {
+            throw new Error(`Concurrency limit must be a positive integer, got ${max}`);
+        }
+        this.max = max;
+    }
+
+    async acquire(): Promise<() => void> {
+        if (this.active < this.max) {
+            this.active++;
+        } else {
+            // The releasing holder hands its slot straight to us
+            await new Promise<void>(resolve => this.waiting.push(resolve));
+        }
+        let released = false;
+        return () => {
+            if (released) return;
+            released = true;
+            const next = this.waiting.shift();
+            if (next) next();
+            else this.active--;
+        };
+    }
+}
+
+// Wraps async tasks so that no more than `max` of them run concurrently.
+export function createLimiter(max: number) {
+    const semaphore = new Semaphore(max);
+    return async <T>(task: () => Promise<T>): Promise<T> => {
+        const release = await semaphore.acquire();
+        try {
+            return await task();
+        } finally {
+            release();
+        }
+    };
+}
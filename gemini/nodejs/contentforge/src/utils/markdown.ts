@@ -0,0 +1,87 @@
+export type MarkdownSection = { heading: string; body: string };
+
+// Splits a Markdown article on its "## " headings; anything before the first one is the preamble.
+// If the last section ends with paragraphs equal to `tail` (such as the conclusion CTA that
+// section drafting appends without a heading), they are returned as the tail instead.
+export function splitSections(markdown: string, tail: string = ''): { preamble: string; sections: MarkdownSection[]; tail: string } {
+    const parts = markdown.split(/^## +/m);
+    const preamble = parts.shift()!.trim();
+    const sections = parts.map(part => {
+        const newline = part.indexOf('\n');
+        const heading = (newline === -1 ? part : part.slice(0, newline)).trim();
+        const body = newline === -1 ? '' : part.slice(newline + 1).trim();
+        return { heading, body };
+    });
+    const last = sections[sections.length - 1];
+    const ending = tail.trim();
+    if (!last || !ending || !last.body.endsWith(ending)) return { preamble, sections, tail: '' };
+    const rest = last.body.slice(0, -ending.length);
+    // Whole paragraphs only
+    if (rest && !/\n\s*\n\s*$/.test(rest)) return { preamble, sections, tail: '' };
+    last.body = rest.trim();
+    return { preamble, sections, tail: ending };
+}
+
+export function formatSection(section: MarkdownSection): string {
+    return section.body ? `## ${section.heading}\n\n${section.body}` : `## ${section.heading}`;
+}
+
+// Case, punctuation and numbering-insensitive form of a heading, for matching editor feedback to sections.
+export function headingKey(heading: string): string {
+    return heading.toLowerCase().replace(/^[\s#\d.)]+/, '').replace(/[^\p{L}\p{N}]+/gu, ' ').trim();
+}
+
+// ATX heading; models also write "##Heading" without the space. Closing hashes need a space before them ("C#")
+const HEADING = /^(#{1,6})(?:[ \t]+|(?<=##)(?=[^#\s]))(.*?)(?:[ \t]+#+)?[ \t]*$/;
+const FENCE = /^\s*(```|~~~)/;
+
+/**
+ * Publishing cleanup of an article body: the title becomes the only H1, body headings start at
+ * H2 without skipping levels, list bullets use "-", and trailing spaces and runs of blank lines
+ * are removed, with a blank line around every heading. Fenced code is left untouched.
+ */
+export function cleanMarkdown(body: string, title: string): string {
+    const lines = body.replace(/\r\n?/g, '\n').split('\n');
+    const inFence: boolean[] = [];
+    let fence: string | undefined;
+    for (const line of lines) {
+        const marker = line.match(FENCE)?.[1];
+        inFence.push(fence !== undefined || marker !== undefined);
+        if (marker && (fence === undefined || marker === fence)) fence = fence === undefined ? marker : undefined;
+    }
+
+    // The draft opens with "# <title>"; it is replaced by the published title
+    const first = lines.findIndex(line => line.trim() !== '');
+    if (first !== -1 && !inFence[first] && /^#\s/.test(lines[first])) lines[first] = '';
+
+    const levels = lines.map((line, i) => inFence[i] ? 0 : (line.match(HEADING)?.[1].length ?? 0));
+    const shift = 2 - Math.min(7, ...levels.filter(level => level > 0));
+    const out: string[] = [`# ${title.trim()}`, ''];
+    let previous = 1;
+    lines.forEach((line, i) => {
+        if (inFence[i]) {
+            out.push(line);
+            return;
+        }
+        const heading = levels[i] ? line.match(HEADING) : null;
+        if (heading) {
+            const level = Math.min(levels[i] + shift, previous + 1, 6);
+            previous = level;
+            if (out[out.length - 1] !== '') out.push('');
+            out.push(`${'#'.repeat(level)} ${heading[2]}`, '');
+            return;
+        }
+        const text = line.trimEnd().replace(/^(\s*)[*+](\s+)/, '$1-$2');
+        if (text === '' && out[out.length - 1] === '') return;
+        out.push(text);
+    });
+    while (out[out.length - 1] === '') out.pop();
+    return out.join('\n') + '\n';
+}
+
+// YAML front matter; strings are written as JSON, which YAML reads as double-quoted scalars
+export function frontMatter(fields: Record<string, string | number | string[]>): string {
+    const lines = Object.entries(fields).map(([key, value]) =>
+        `${key}: ${Array.isArray(value) ? `[${value.map(v => JSON.stringify(v)).join(', ')}]` : JSON.stringify(value)}`);
+    return `---\n${lines.join('\n')}\n---\n\n`;
+}
@@ -0,0 +1,67 @@
+import { EditOperation } from '../types';
+import { headingKey } from './markdown';
+
+// A patch that no longer applies to the body (anchor missing or ambiguous) or overlaps another edit.
+export class PatchError extends Error {
+    // Position of the offending operation in the edit list
+    readonly index: number;
+
+    constructor(message: string, index: number) {
+        super(`Edit ${index + 1}: ${message}`);
+        this.name = 'PatchError';
+        this.index = index;
+    }
+}
+
+type Span = { start: number; end: number; text: string; index: number };
+
+function occurrences(body: string, needle: string): number[] {
+    const found: number[] = [];
+    for (let at = body.indexOf(needle); at !== -1; at = body.indexOf(needle, at + 1)) found.push(at);
+    return found;
+}
+
+function resolve(body: string, edit: EditOperation, index: number): Span {
+    if (edit.op === 'replace') {
+        const found = occurrences(body, edit.find);
+        if (found.length === 0) throw new PatchError(`text not found: "${edit.find.slice(0, 60)}"`, index);
+        if (found.length > 1) throw new PatchError(`text is ambiguous (${found.length} matches): "${edit.find.slice(0, 60)}"`, index);
+        return { start: found[0], end: found[0] + edit.find.length, text: edit.replace, index };
+    }
+    const key = headingKey(edit.heading);
+    const heading = /^## +(.*)$/gm;
+    const matches: number[] = [];
+    for (let m; (m = heading.exec(body)) !== null;) {
+        if (headingKey(m[1]) === key) matches.push(m.index + m[0].length);
+    }
+    if (matches.length !== 1) {
+        throw new PatchError(`heading ${matches.length ? 'is ambiguous' : 'not found'}: "${edit.heading}"`, index);
+    }
+    return { start: matches[0], end: matches[0], text: `\n\n${edit.text.trim()}`, index };
+}
+
+/**
+ * Applies edit operations to `body`. Every operation is resolved against the original body
+ * (not against the result of earlier edits), so the outcome doesn't depend on their order;
+ * edits whose anchors are missing, ambiguous or overlapping reject the whole patch.
+ */
+export function applyEdits(body: string, edits: EditOperation[]): string {
+    const spans = edits
+        .map((edit, i) => resolve(body, edit, i))
+        // Inserts sort before a replacement starting at the same point
+        .sort((a, b) => a.start - b.start || Number(a.end > a.start) - Number(b.end > b.start) || a.index - b.index);
+
+    for (let i = 1; i < spans.length; i++) {
+        if (spans[i].start < spans[i - 1].end) {
+            throw new PatchError(`overlaps edit ${spans[i - 1].index + 1}`, spans[i].index);
+        }
+    }
+
+    let out = '';
+    let cursor = 0;
+    for (const span of spans) {
+        out += body.slice(cursor, span.start) + span.text;
+        cursor = span.end;
+    }
+    return out + body.slice(cursor);
+}
@@ -0,0 +1,92 @@
+const STOPWORDS = new Set([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'can', 'for', 'from', 'has', 'have',
+    'how', 'in', 'into', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'their', 'this',
+    'to', 'was', 'were', 'what', 'when', 'which', 'while', 'who', 'why', 'will', 'with', 'you', 'your',
+]);
+
+// Lower-cased word tokens without punctuation or common stopwords, with plural "s" stripped.
+export function tokenize(text: string): string[] {
+    const lower = text.toLowerCase();
+    // The ASCII pattern finds the same words several times faster than the Unicode one
+    const words = /^[\x00-\x7f]*$/.test(lower) ? lower.match(/[a-z0-9]+/g) : lower.match(/[\p{L}\p{N}]+/gu);
+    return (words || [])
+        .filter(t => t.length > 1 && !STOPWORDS.has(t))
+        .map(t => t.length > 3 && t.endsWith('s') && !t.endsWith('ss') ? t.slice(0, -1) : t);
+}
+
+export function countWords(markdown: string): number {
+    return (markdown.match(/[\p{L}\p{N}][\p{L}\p{N}'’-]*/gu) || []).length;
+}
+
+// Returns the `k` items sharing the most distinct tokens with `query`, in their original order.
+export function topByOverlap(query: string, items: string[], k: number): string[] {
+    const q = new Set(tokenize(query));
+    return items
+        .map((item, index) => ({ item, index, score: new Set(tokenize(item).filter(t => q.has(t))).size }))
+        .filter(x => x.score > 0)
+        .sort((a, b) => b.score - a.score || a.index - b.index)
+        .slice(0, k)
+        .sort((a, b) => a.index - b.index)
+        .map(x => x.item);
+}
+
+// Word n-gram shingles (falls back to single tokens for very short texts).
+export function shingles(text: string, n: number = 2): Set<string> {
+    const tokens = tokenize(text);
+    if (tokens.length < n) return new Set(tokens);
+    const out = new Set<string>();
+    for (let i = 0; i + n <= tokens.length; i++) out.add(tokens.slice(i, i + n).join(' '));
+    return out;
+}
+
+export function jaccard(a: Set<string>, b: Set<string>): number {
+    if (a.size === 0 && b.size === 0) return 1;
+    let shared = 0;
+    for (const x of a) if (b.has(x)) shared++;
+    return shared / (a.size + b.size - shared);
+}
+
+// Share of the smaller set contained in the larger one.
+export function containment(a: Set<string>, b: Set<string>): number {
+    if (a.size === 0 || b.size === 0) return 0;
+    let shared = 0;
+    for (const x of a) if (b.has(x)) shared++;
+    return shared / Math.min(a.size, b.size);
+}
+
+type Fingerprint = { tokens: Set<string>; grams: Set<string> };
+
+function fingerprint(text: string): Fingerprint {
+    return { tokens: new Set(tokenize(text)), grams: shingles(text) };
+}
+
+// Words mostly contained in the other text, or word pairs overlapping heavily with it
+function near(a: Fingerprint, b: Fingerprint, threshold: number): boolean {
+    return containment(a.tokens, b.tokens) >= threshold || jaccard(a.grams, b.grams) >= threshold - 0.25;
+}
+
+// Keeps the first of any group of near-duplicates (see `near`).
+export function dedupeNear(items: string[], threshold: number = 0.75): string[] {
+    const kept: (Fingerprint & { item: string })[] = [];
+    for (const item of items) {
+        const print = fingerprint(item);
+        if (!kept.some(k => near(print, k, threshold)) && item.trim()) kept.push({ item: item.trim(), ...print });
+    }
+    return kept.map(k => k.item);
+}
+
+// Items with no near-duplicate in `existing`.
+export function notCoveredBy(items: string[], existing: string[], threshold: number = 0.75): string[] {
+    const prints = existing.map(fingerprint);
+    return items.filter(item => {
+        const print = fingerprint(item);
+        return !prints.some(p => near(print, p, threshold));
+    });
+}
+
+// Average adult silent reading speed for non-fiction
+const WORDS_PER_MINUTE = 238;
+
+export function readingTimeMinutes(words: number): number {
+    return Math.max(1, Math.ceil(words / WORDS_PER_MINUTE));
+}
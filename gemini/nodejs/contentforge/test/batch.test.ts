@@ -0,0 +1,70 @@
+import { strict as assert } from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { describe, it } from 'node:test';
+import { parseCsvLine, readTopics, runBatch } from '../src/batch';
+
+function fileWith(name: string, content: string): string {
+    const file = path.join(fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-batch-')), name);
+    fs.writeFileSync(file, content);
+    return file;
+}
+
+async function collect(file: string, format?: 'jsonl' | 'csv'): Promise<string[]> {
+    const topics: string[] = [];
+    for await (const topic of readTopics(file, format)) topics.push(topic);
+    return topics;
+}
+
+describe('parseCsvLine', () => {
+    it('splits on commas and trims fields', () => {
+        assert.deepEqual(parseCsvLine('a, b ,c'), ['a', 'b', 'c']);
+    });
+
+    it('keeps commas and escaped quotes inside quoted fields', () => {
+        assert.deepEqual(parseCsvLine('"Rust, Go and ""Zig""",2'), ['Rust, Go and "Zig"', '2']);
+    });
+
+    it('keeps empty fields', () => {
+        assert.deepEqual(parseCsvLine(',x,'), ['', 'x', '']);
+    });
+});
+
+describe('readTopics', () => {
+    it('reads JSONL strings and objects, skipping blank lines', async () => {
+        const file = fileWith('topics.jsonl', '"First topic"\n\n{"topic": " Second topic ", "id": 2}\n');
+        assert.deepEqual(await collect(file), ['First topic', 'Second topic']);
+    });
+
+    it('reports the line of invalid JSONL', async () => {
+        const file = fileWith('topics.jsonl', '"ok"\n{"title": "no topic"}\n');
+        await assert.rejects(collect(file), /topics\.jsonl:2: expected a string/);
+        const broken = fileWith('broken.jsonl', '{oops\n');
+        await assert.rejects(collect(broken), /broken\.jsonl:1: invalid JSON/);
+    });
+
+    it('uses the CSV topic column named in the header', async () => {
+        const file = fileWith('topics.csv', 'id,Topic\r\n1,"Edge caching, explained"\r\n2,\r\n3,Vector search\r\n');
+        assert.deepEqual(await collect(file), ['Edge caching, explained', 'Vector search']);
+    });
+
+    it('uses the first CSV column without a topic header', async () => {
+        const file = fileWith('topics.csv', 'Serverless cold starts,draft\nQueue design,final\n');
+        assert.deepEqual(await collect(file), ['Serverless cold starts', 'Queue design']);
+    });
+
+    it('takes the format from the argument over the extension', async () => {
+        const file = fileWith('topics.txt', 'topic\nOne\n');
+        assert.deepEqual(await collect(file, 'csv'), ['One']);
+    });
+});
+
+describe('runBatch', () => {
+    it('rejects on an unreadable input and closes the output file', async () => {
+        const file = fileWith('broken.jsonl', '{oops\n');
+        const out = path.join(path.dirname(file), 'results.ndjson');
+        await assert.rejects(runBatch(file, { concurrency: 2, out }), /broken\.jsonl:1: invalid JSON/);
+        assert.equal(fs.readFileSync(out, 'utf-8'), '');
+    });
+});
@@ -0,0 +1,106 @@
+import { strict as assert } from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { describe, it, beforeEach } from 'node:test';
+import { CacheKeyParts, CacheMissError, ResponseCache } from '../src/adapters/cache';
+
+const parts: CacheKeyParts = { provider: 'openai', model: 'gpt-4o', systemPrompt: 'system', userMessage: 'user', temperature: 0.7 };
+
+function cacheIn(dir: string, mode: 'readwrite' | 'only' = 'readwrite'): ResponseCache {
+    const cache = new ResponseCache();
+    cache.configure({ mode, dir, maxMemoryEntries: 2, maxDiskBytes: 1024 * 1024, maxAgeMs: 60_000 });
+    return cache;
+}
+
+describe('ResponseCache.key', () => {
+    it('ignores property order', () => {
+        const reordered = { temperature: 0.7, userMessage: 'user', systemPrompt: 'system', model: 'gpt-4o', provider: 'openai' };
+        assert.equal(ResponseCache.key(parts), ResponseCache.key(reordered));
+    });
+
+    it('separates routes and output modes', () => {
+        const base = ResponseCache.key(parts);
+        assert.notEqual(base, ResponseCache.key({ ...parts, provider: 'anthropic' }));
+        const strict = ResponseCache.key({ ...parts, output: { name: 'DraftAgent', dialect: 'strict', schema: 'a' } });
+        const plain = ResponseCache.key({ ...parts, output: { name: 'DraftAgent', dialect: 'plain', schema: 'a' } });
+        const other = ResponseCache.key({ ...parts, output: { name: 'DraftAgent', dialect: 'strict', schema: 'b' } });
+        assert.equal(new Set([base, strict, plain, other]).size, 4);
+    });
+});
+
+describe('ResponseCache.getOrCall', () => {
+    let dir: string;
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-cache-'));
+    });
+
+    it('shares one call between concurrent callers', async () => {
+        const cache = cacheIn(dir);
+        let calls = 0;
+        const call = async () => {
+            calls++;
+            await new Promise(res => setTimeout(res, 10));
+            return '{"ok":true}';
+        };
+        const key = ResponseCache.key(parts);
+        const [a, b] = await Promise.all([cache.getOrCall(key, call), cache.getOrCall(key, call)]);
+        assert.equal(a, b);
+        assert.equal(calls, 1);
+        assert.equal(cache.stats.coalesced, 1);
+        assert.equal(await cache.getOrCall(key, call), a);
+        assert.equal(cache.stats.memoryHits, 1);
+    });
+
+    it('does not store responses that fail validation', async () => {
+        const cache = cacheIn(dir);
+        const key = ResponseCache.key(parts);
+        await cache.getOrCall(key, async () => 'not json', () => false);
+        assert.equal(cache.stats.writes, 0);
+        assert.equal(await cache.getOrCall(key, async () => 'fresh'), 'fresh');
+    });
+
+    it('stores under the key the call names', async () => {
+        const cache = cacheIn(dir);
+        const requested = ResponseCache.key(parts);
+        const answered = ResponseCache.key({ ...parts, provider: 'anthropic' });
+        await cache.getOrCall(requested, async storeAs => {
+            storeAs(answered);
+            return 'from backup';
+        });
+        assert.equal(await cache.getOrCall(answered, async () => 'miss'), 'from backup');
+        assert.equal(await cache.getOrCall(requested, async () => 'miss'), 'miss');
+    });
+
+    it('reads entries written by an earlier process from disk', async () => {
+        const key = ResponseCache.key(parts);
+        await cacheIn(dir).getOrCall(key, async () => 'persisted');
+        const later = cacheIn(dir);
+        assert.equal(await later.getOrCall(key, async () => 'miss'), 'persisted');
+        assert.equal(later.stats.diskHits, 1);
+    });
+
+    it('fails on a miss in cache-only mode', async () => {
+        const cache = cacheIn(dir, 'only');
+        await assert.rejects(cache.getOrCall(ResponseCache.key(parts), async () => 'never'), CacheMissError);
+    });
+});
+
+describe('ResponseCache.prune', () => {
+    it('evicts the least recently used files beyond the size limit', async () => {
+        const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-cache-'));
+        const cache = cacheIn(dir);
+        const keys = ['a', 'b', 'c'].map(userMessage => ResponseCache.key({ ...parts, userMessage }));
+        for (const [i, key] of keys.entries()) {
+            await cache.getOrCall(key, async () => 'x'.repeat(100));
+            // Oldest first
+            const file = path.join(dir, key.slice(0, 2), `${key}.json`);
+            const time = new Date(Date.now() - (keys.length - i) * 1000);
+            fs.utimesSync(file, time, time);
+        }
+        cache.configure({ maxDiskBytes: 250 });
+        cache.prune();
+        const left = keys.filter(key => fs.existsSync(path.join(dir, key.slice(0, 2), `${key}.json`)));
+        assert.deepEqual(left, [keys[2]]);
+    });
+});
@@ -0,0 +1,184 @@
+import { strict as assert } from 'assert';
+import * as fs from 'fs';
+import * as http from 'http';
+import * as os from 'os';
+import * as path from 'path';
+import { AddressInfo } from 'net';
+import { after, before, beforeEach, describe, it } from 'node:test';
+import { z } from 'zod';
+import { configureCache } from '../src/adapters/cache';
+import { BaseAgent } from '../src/agents/base';
+import { CascadePolicy, EscalationReason, cascadeFor, getCascadeStats, recordCascade, tierConfig } from '../src/agents/cascade';
+
+const ScoreSchema = z.object({ score: z.number(), passed: z.boolean() });
+type Score = z.infer<typeof ScoreSchema>;
+
+// Scores within `margin` of the pass mark (7) are too close to call on a cheap model
+class ScoreAgent extends BaseAgent<string, Score> {
+    name = 'ScoreAgent';
+    modelConfig = {};
+    outputSchema = ScoreSchema;
+    inputProjection = {};
+
+    constructor(cascade?: CascadePolicy) {
+        super('brief.md');
+        this.cascade = cascade;
+    }
+
+    protected escalation(response: string, policy: CascadePolicy): EscalationReason | undefined {
+        const { score } = this.decode(response, ScoreSchema).value;
+        return Math.abs(score - 7) < (policy.margin ?? 1) ? 'borderline' : undefined;
+    }
+
+    async run(input: string): Promise<Score> {
+        return this.parse(await this.callLLM(input));
+    }
+
+    score(input: string, model: string): Promise<string> {
+        return this.callLLM(input, { model: tierConfig(model) });
+    }
+}
+
+// Answers OpenAI chat completions with a fixed reply per model, or an HTTP 400 for `null`
+const replies: Record<string, string | null> = {};
+const calls: string[] = [];
+const server = http.createServer((req, res) => {
+    let body = '';
+    req.on('data', chunk => body += chunk);
+    req.on('end', () => {
+        const { model } = JSON.parse(body);
+        calls.push(model);
+        const reply = replies[model];
+        if (reply === null || reply === undefined) {
+            res.writeHead(400, { 'content-type': 'application/json' });
+            res.end(JSON.stringify({ error: { message: `model ${model} unavailable` } }));
+            return;
+        }
+        res.writeHead(200, { 'content-type': 'application/json' });
+        res.end(JSON.stringify({ choices: [{ index: 0, message: { role: 'assistant', content: reply }, finish_reason: 'stop' }], usage: { prompt_tokens: 10, completion_tokens: 5 } }));
+    });
+});
+
+const answer = (score: number) => JSON.stringify({ score, passed: score >= 7 });
+const tiers: CascadePolicy = { tiers: ['openai:cheap', 'openai:mid', 'openai:strong'], margin: 1 };
+
+describe('BaseAgent cascades', () => {
+    before(async () => {
+        await new Promise<void>(resolve => server.listen(0, '127.0.0.1', resolve));
+        const origin = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+        Object.assign(process.env, { OPENAI_BASE_URL: `${origin}/v1`, OPENAI_API_KEY: 'test', CONTENTFORGE_STREAM: 'false', CONTENTFORGE_METRICS_JSONL: 'off' });
+        configureCache({ mode: 'off' });
+    });
+
+    after(async () => {
+        server.closeAllConnections();
+        await new Promise(resolve => server.close(resolve));
+    });
+
+    beforeEach(() => {
+        calls.length = 0;
+        Object.assign(replies, { cheap: answer(2), mid: answer(9), strong: answer(10) });
+    });
+
+    it('keeps a clear answer from the cheapest tier', async () => {
+        assert.deepEqual(await new ScoreAgent(tiers).run('a'), { score: 2, passed: false });
+        assert.deepEqual(calls, ['cheap']);
+    });
+
+    it('escalates invalid, failed and borderline answers', async () => {
+        replies.cheap = 'not json at all';
+        assert.equal((await new ScoreAgent(tiers).run('b')).score, 9);
+        assert.deepEqual(calls, ['cheap', 'mid']);
+
+        calls.length = 0;
+        replies.cheap = null;
+        replies.mid = answer(7);
+        assert.equal((await new ScoreAgent(tiers).run('c')).score, 10);
+        assert.deepEqual(calls, ['cheap', 'mid', 'strong']);
+    });
+
+    it('returns the last tier as is, and fails only when it fails', async () => {
+        Object.assign(replies, { cheap: answer(7), mid: answer(6.5), strong: answer(7) });
+        assert.equal((await new ScoreAgent(tiers).run('d')).score, 7);
+        replies.strong = null;
+        await assert.rejects(new ScoreAgent(tiers).run('e'), /unavailable/);
+    });
+
+    it('skips the cascade for calls that name their model', async () => {
+        assert.equal(await new ScoreAgent(tiers).score('f', 'openai:strong'), answer(10));
+        assert.deepEqual(calls, ['strong']);
+    });
+
+    it('records the answering tier and the escalation reasons', async () => {
+        const agent = new ScoreAgent({ tiers: ['openai:cheap', 'openai:mid'], margin: 1 });
+        agent.name = 'ScoreAgentStats';
+        await agent.run('g');
+        replies.cheap = answer(7);
+        await agent.run('h');
+        assert.deepEqual(getCascadeStats().ScoreAgentStats, { calls: 2, escalated: 1, byReason: { borderline: 1 }, byTier: [1, 1] });
+    });
+});
+
+describe('cascade configuration', () => {
+    const saved = { ...process.env };
+    const cwd = process.cwd();
+    // Away from any contentforge.config.json in the working directory
+    before(() => process.chdir(fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-cascade-'))));
+    beforeEach(() => {
+        process.env = { ...saved };
+        for (const key of ['CONTENTFORGE_CASCADE', 'CONTENTFORGE_CASCADE_AGENTS', 'CONTENTFORGE_CASCADE_MARGIN', 'CONTENTFORGE_CONFIG']) delete process.env[key];
+    });
+    after(() => {
+        process.env = saved;
+        process.chdir(cwd);
+    });
+
+    function configFile(content: unknown): string {
+        const file = path.join(fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-cascade-')), 'contentforge.config.json');
+        fs.writeFileSync(file, typeof content === 'string' ? content : JSON.stringify(content));
+        return file;
+    }
+
+    it('parses tiers as provider or provider:model', () => {
+        assert.deepEqual(tierConfig('anthropic'), { provider: 'anthropic' });
+        assert.deepEqual(tierConfig('openai:gpt-4o-mini'), { provider: 'openai', model: 'gpt-4o-mini' });
+        assert.deepEqual(tierConfig('gemini:models/gemini-1.5:flash'), { provider: 'gemini', model: 'models/gemini-1.5:flash' });
+    });
+
+    it('reads tiers and agents from the environment', () => {
+        assert.equal(cascadeFor('EditorAgent'), undefined);
+        Object.assign(process.env, { CONTENTFORGE_CASCADE: 'openai:gpt-4o-mini, openai:gpt-4o', CONTENTFORGE_CASCADE_MARGIN: '0.5', CONTENTFORGE_CASCADE_AGENTS: 'EditorAgent' });
+        assert.deepEqual(cascadeFor('EditorAgent'), { tiers: ['openai:gpt-4o-mini', 'openai:gpt-4o'], margin: 0.5 });
+        assert.equal(cascadeFor('DraftAgent'), undefined);
+        process.env.CONTENTFORGE_CASCADE = 'off';
+        assert.equal(cascadeFor('EditorAgent'), undefined);
+    });
+
+    it('prefers the agent entry, then the default of the config file', () => {
+        process.env.CONTENTFORGE_CONFIG = configFile({ cascades: { EditorAgent: { tiers: ['openai:gpt-4o-mini', 'anthropic'], margin: 2 }, default: { tiers: ['xai'] } } });
+        process.env.CONTENTFORGE_CASCADE = 'gemini';
+        assert.deepEqual(cascadeFor('EditorAgent'), { tiers: ['openai:gpt-4o-mini', 'anthropic'], margin: 2 });
+        assert.deepEqual(cascadeFor('DraftAgent'), { tiers: ['xai'] });
+    });
+
+    it('ignores an invalid config file', () => {
+        const error = console.error;
+        const logged: unknown[] = [];
+        console.error = (...args: unknown[]) => logged.push(args.join(' '));
+        try {
+            process.env.CONTENTFORGE_CONFIG = configFile({ cascades: { EditorAgent: { tiers: [] } } });
+            process.env.CONTENTFORGE_CASCADE = 'gemini';
+            assert.deepEqual(cascadeFor('EditorAgent'), { tiers: ['gemini'], margin: undefined });
+            assert.match(String(logged[0]), /Ignoring cascades/);
+        } finally {
+            console.error = error;
+        }
+    });
+
+    it('counts escalations per reason and answers per tier', () => {
+        recordCascade('ConfigTestAgent', 0, []);
+        recordCascade('ConfigTestAgent', 2, ['invalid', 'borderline']);
+        const stats = getCascadeStats().ConfigTestAgent;
+        assert.deepEqual({ ...stats, byTier: Array.from(stats.byTier, n => n || 0) }, { calls: 2, escalated: 1, byReason: { invalid: 1, borderline: 1 }, byTier: [1, 0, 1] });
+    });
+});
@@ -0,0 +1,99 @@
+import { strict as assert } from 'assert';
+import { describe, it } from 'node:test';
+import { Candidate, CritiqueBudget, CritiqueLoop, meanScore } from '../src/critique';
+import { emptyUsage } from '../src/metrics';
+import { EditedArticle } from '../src/types';
+
+// An edit pass with the given scores (clarity, accuracy, tone, structure)
+function candidate(attempt: number, scores: [number, number, number, number], passed: boolean = false): Candidate {
+    const [clarity, accuracy, tone_match, structure] = scores;
+    const edited: EditedArticle = {
+        title: `Attempt ${attempt}`,
+        body: '',
+        word_count: 0,
+        edit_notes: '',
+        quality_scores: { clarity, accuracy, tone_match, structure },
+        passed_quality_threshold: passed,
+    };
+    return { attempt, edited, ref: String(attempt).repeat(64) };
+}
+
+function loop(budget: Partial<CritiqueBudget> = {}, usage = emptyUsage(), runStart = Date.now()): CritiqueLoop {
+    return new CritiqueLoop({ maxRedrafts: 3, minGain: 0.25, ...budget }, usage, runStart);
+}
+
+describe('meanScore', () => {
+    it('averages the quality scores', () => {
+        assert.equal(meanScore(candidate(0, [6, 7, 8, 9]).edited), 7.5);
+    });
+});
+
+describe('CritiqueLoop', () => {
+    it('stops as soon as an edit passes', () => {
+        const critique = loop();
+        assert.equal(critique.add(candidate(0, [6, 6, 6, 6])), undefined);
+        assert.equal(critique.add(candidate(1, [8, 8, 8, 8], true)), 'passed');
+        assert.deepEqual(critique.outcome('passed'), { stop: 'passed', edits: 2, best: 1, scores: [6, 8] });
+    });
+
+    it('stops after the last allowed redraft', () => {
+        const critique = loop({ maxRedrafts: 1 });
+        assert.equal(critique.add(candidate(0, [5, 5, 5, 5])), undefined);
+        assert.equal(critique.add(candidate(1, [6, 6, 6, 6])), 'max_attempts');
+        assert.equal(loop({ maxRedrafts: 0 }).add(candidate(0, [5, 5, 5, 5])), 'max_attempts');
+    });
+
+    it('stops when a redraft does not improve on the best edit, and publishes the best', () => {
+        const critique = loop();
+        critique.add(candidate(0, [6, 6, 7, 7]));
+        assert.equal(critique.add(candidate(1, [5, 6, 7, 8])), 'converged');
+        assert.equal(critique.best().attempt, 0);
+    });
+
+    it('counts a higher lowest score or a big enough mean gain as progress', () => {
+        const critique = loop({ minGain: 0.5 });
+        critique.add(candidate(0, [5, 8, 8, 8]));
+        // Lowest 5 -> 6, mean down
+        assert.equal(critique.add(candidate(1, [6, 6, 6, 6])), undefined);
+        // Same lowest, mean +0.25 < 0.5
+        assert.equal(critique.add(candidate(2, [6, 6, 6, 7])), 'converged');
+        assert.equal(critique.best().attempt, 2);
+    });
+
+    it('prefers the later edit among equals', () => {
+        const critique = loop();
+        critique.add(candidate(0, [6, 6, 6, 6]));
+        critique.add(candidate(1, [6, 6, 6, 6]));
+        assert.equal(critique.best().attempt, 1);
+    });
+
+    it('stops before a redraft would overrun the time budget', () => {
+        const realNow = Date.now;
+        let now = 0;
+        Date.now = () => now;
+        try {
+            const critique = loop({ timeMs: 1000 }, emptyUsage(), 0);
+            now = 400;
+            // 400ms spent, the next cycle should also take about 400ms
+            assert.equal(critique.add(candidate(0, [5, 5, 5, 5])), undefined);
+            now = 800;
+            assert.equal(critique.add(candidate(1, [6, 6, 6, 6])), 'time_budget');
+        } finally {
+            Date.now = realNow;
+        }
+    });
+
+    it('stops before a redraft would overrun the token budget', () => {
+        const usage = emptyUsage();
+        const critique = loop({ tokens: 5000 }, usage);
+        usage.inputTokens += 1500;
+        usage.outputTokens += 500;
+        // 2000 spent, the next cycle should also take about 2000
+        assert.equal(critique.add(candidate(0, [5, 5, 5, 5])), undefined);
+        usage.inputTokens += 1500;
+        usage.outputTokens += 600;
+        // 4100 spent plus about 2100 more
+        assert.equal(critique.add(candidate(1, [6, 6, 6, 6])), 'token_budget');
+        assert.equal(critique.outcome('token_budget').best, 1);
+    });
+});
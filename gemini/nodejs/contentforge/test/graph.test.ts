@@ -0,0 +1,124 @@
+import { strict as assert } from 'assert';
+import { describe, it } from 'node:test';
+import { StageGraph } from '../src/graph';
+import { metrics } from '../src/metrics';
+
+process.env.CONTENTFORGE_METRICS_JSONL = 'off';
+
+const delay = (ms: number) => new Promise(res => setTimeout(res, ms));
+
+type Stages = { brief: string; research: string; outline: string; draft: string; meta: string };
+
+function wasted(stage: string) {
+    return metrics.speculationSummary().find(s => s.stage === stage);
+}
+
+describe('StageGraph', () => {
+    it('passes results to dependents and runs independent stages together', async () => {
+        const graph = new StageGraph<Stages>();
+        const events: string[] = [];
+        graph.add('brief', [], async () => 'brief');
+        graph.add('research', ['brief'], async ({ brief }) => {
+            events.push('research started');
+            await delay(20);
+            events.push('research done');
+            return `${brief}+research`;
+        });
+        graph.add('meta', ['brief'], async ({ brief }) => {
+            events.push('meta started');
+            await delay(20);
+            events.push('meta done');
+            return `${brief}+meta`;
+        });
+        const outline = graph.add('outline', ['research', 'meta'], ({ research, meta }) => `${research}|${meta}`);
+        assert.equal(await outline, 'brief+research|brief+meta');
+        assert.deepEqual(events.slice(0, 2).sort(), ['meta started', 'research started']);
+        await graph.settled();
+    });
+
+    it('rejects unknown and duplicate stages', () => {
+        const graph = new StageGraph<Stages>();
+        graph.add('brief', [], () => 'x');
+        assert.throws(() => graph.add('brief', [], () => 'y'), /already in the graph/);
+        assert.throws(() => graph.get('draft'), /not in the graph/);
+    });
+
+    it('fails dependents and settled() with the first failure', async () => {
+        const graph = new StageGraph<Stages>();
+        graph.add('brief', [], async () => { throw new Error('no brief'); });
+        let ran = false;
+        const research = graph.add('research', ['brief'], () => { ran = true; return 'r'; });
+        await assert.rejects(research, /no brief/);
+        await assert.rejects(graph.settled(), /no brief/);
+        assert.equal(ran, false);
+    });
+});
+
+describe('Speculation', () => {
+    it('commits work whose guessed input matches', async () => {
+        const graph = new StageGraph<Stages>();
+        graph.add('outline', [], () => 'outline v1');
+        let runs = 0;
+        const speculation = graph.speculate({
+            name: 'spec-commit', agent: 'PublishAgent', after: ['outline'],
+            guess: ({ outline }) => ({ headings: outline }),
+            run: async input => { runs++; return `meta for ${input.headings}`; },
+        });
+        assert.equal(await speculation.commit({ headings: 'outline v1' }), 'meta for outline v1');
+        // Settled once
+        assert.equal(await speculation.commit({ headings: 'outline v1' }), undefined);
+        await graph.settled();
+        assert.equal(runs, 1);
+        await delay(0);
+        assert.equal(wasted('spec-commit')?.committed, 1);
+    });
+
+    it('discards and cancels work whose input changed, counting what it cost', async () => {
+        const graph = new StageGraph<Stages>();
+        graph.add('outline', [], () => 'outline v1');
+        let aborted = false;
+        const speculation = graph.speculate({
+            name: 'spec-discard', agent: 'PublishAgent', after: ['outline'],
+            guess: ({ outline }) => outline,
+            run: async (input, signal) => {
+                metrics.recordCall({ agent: 'PublishAgent', provider: 'openai', model: 'gpt-4o', outcome: 'ok', ms: 5, ttftMs: 5, retries: 0, inputTokens: 10, outputTokens: 20 });
+                await new Promise(res => signal.addEventListener('abort', res));
+                aborted = signal.aborted;
+                return input;
+            },
+            matches: (guessed, actual) => guessed.split(' ')[0] === actual.split(' ')[0],
+        });
+        assert.equal(await speculation.commit('draft v2'), undefined);
+        await delay(0);
+        assert.ok(aborted);
+        const summary = wasted('spec-discard');
+        assert.equal(summary?.discarded, 1);
+        assert.equal(summary?.wasted.calls, 1);
+        assert.equal(summary?.wasted.outputTokens, 20);
+        await graph.settled();
+    });
+
+    it('discards work that failed, and anything left uncommitted when the graph settles', async () => {
+        const graph = new StageGraph<Stages>();
+        graph.add('outline', [], () => 'o');
+        const failing = graph.speculate({
+            name: 'spec-failed', agent: 'PublishAgent', after: ['outline'],
+            guess: ({ outline }) => outline,
+            run: async () => { throw new Error('provider down'); },
+        });
+        assert.equal(await failing.commit('o'), undefined);
+
+        let signal: AbortSignal | undefined;
+        graph.speculate({
+            name: 'spec-unused', agent: 'PublishAgent', after: ['outline'],
+            guess: ({ outline }) => outline,
+            run: async (_input, s) => { signal = s; return 'unused'; },
+        });
+        await delay(0);
+        await graph.settled();
+        assert.ok(signal?.aborted);
+        await delay(0);
+        assert.equal(wasted('spec-failed')?.discarded, 1);
+        assert.equal(wasted('spec-unused')?.discarded, 1);
+    });
+});
@@ -0,0 +1,128 @@
+import { strict as assert } from 'assert';
+import { describe, it } from 'node:test';
+import { breaker, hedgePolicyFor, hedged, hedgeStats, latencies } from '../src/adapters/hedge';
+
+type Call = { signal?: AbortSignal; started: boolean };
+
+// A call answering `value` (or failing with it when it is an Error) after `ms`, unless aborted
+function after<T>(ms: number, value: T | Error): { call: (signal: AbortSignal) => Promise<T>; state: Call } {
+    const state: Call = { started: false };
+    const call = (signal: AbortSignal) => new Promise<T>((resolve, reject) => {
+        state.started = true;
+        state.signal = signal;
+        const timer = setTimeout(() => (value instanceof Error ? reject(value) : resolve(value)), ms);
+        signal.addEventListener('abort', () => {
+            clearTimeout(timer);
+            reject(Object.assign(new Error('aborted'), { name: 'AbortError' }));
+        });
+    });
+    return { call, state };
+}
+
+const any = () => true;
+
+describe('hedged', () => {
+    it('keeps a fast primary and never starts the backup', async () => {
+        const primary = after(5, 'primary');
+        const backup = after(5, 'backup');
+        const before = hedgeStats.hedged;
+        assert.deepEqual(await hedged(primary.call, backup.call, 50, any), { value: 'primary', winner: 'primary' });
+        assert.equal(backup.state.started, false);
+        assert.equal(hedgeStats.hedged, before);
+    });
+
+    it('hedges a slow primary after the delay and aborts the loser', async () => {
+        const primary = after(200, 'primary');
+        const backup = after(5, 'backup');
+        const start = Date.now();
+        assert.deepEqual(await hedged(primary.call, backup.call, 20, any), { value: 'backup', winner: 'backup' });
+        assert.ok(Date.now() - start < 150);
+        assert.equal(primary.state.signal?.aborted, true);
+    });
+
+    it('starts the backup at once when the primary fails or is not accepted', async () => {
+        const failing = after<string>(5, new Error('down'));
+        assert.equal((await hedged(failing.call, after(5, 'backup').call, Infinity, any)).winner, 'backup');
+        const unusable = after(5, 'truncated');
+        const result = await hedged(unusable.call, after(5, 'complete').call, Infinity, value => value === 'complete');
+        assert.deepEqual(result, { value: 'complete', winner: 'backup' });
+    });
+
+    it('returns the first value when none is accepted, and the primary error when both fail', async () => {
+        const result = await hedged(after(5, 'a').call, after(10, 'b').call, 0, () => false);
+        assert.deepEqual(result, { value: 'a', winner: 'primary' });
+        await assert.rejects(hedged(after<string>(5, new Error('primary down')).call, after<string>(5, new Error('backup down')).call, 0, any), /primary down/);
+    });
+});
+
+describe('latencies', () => {
+    const policy = { fallback: 'anthropic', percentile: 0.9, minDelayMs: 10 };
+
+    it('uses the minimum delay until enough calls are recorded', () => {
+        latencies.record('hedge-test:few', 500);
+        assert.equal(latencies.delay('hedge-test:few', policy), 10);
+    });
+
+    it('hedges at the configured percentile of recent calls', () => {
+        for (let ms = 10; ms <= 200; ms += 10) latencies.record('hedge-test:many', ms);
+        assert.equal(latencies.delay('hedge-test:many', policy), 180);
+        assert.equal(latencies.delay('hedge-test:many', { ...policy, minDelayMs: 500 }), 500);
+        assert.equal(latencies.delay('hedge-test:many', { ...policy, percentile: undefined }), 10);
+    });
+});
+
+describe('breaker', () => {
+    it('opens after consecutive failures and probes again after the cooldown', () => {
+        const realNow = Date.now;
+        let now = realNow();
+        Date.now = () => now;
+        try {
+            const provider = 'breaker-test';
+            breaker.failure(provider);
+            breaker.failure(provider);
+            assert.equal(breaker.isOpen(provider), false);
+            breaker.failure(provider);
+            assert.equal(breaker.isOpen(provider), true);
+
+            now += 30_001;
+            // Half-open: one probe goes through, and one more failure re-opens the circuit
+            assert.equal(breaker.isOpen(provider), false);
+            breaker.failure(provider);
+            assert.equal(breaker.isOpen(provider), true);
+
+            now += 30_001;
+            assert.equal(breaker.isOpen(provider), false);
+            breaker.success(provider);
+            breaker.failure(provider);
+            assert.equal(breaker.isOpen(provider), false);
+        } finally {
+            Date.now = realNow;
+        }
+    });
+
+    it('resets the count on success', () => {
+        const provider = 'breaker-test-success';
+        breaker.failure(provider);
+        breaker.failure(provider);
+        breaker.success(provider);
+        breaker.failure(provider);
+        breaker.failure(provider);
+        assert.equal(breaker.isOpen(provider), false);
+    });
+});
+
+describe('hedgePolicyFor', () => {
+    it('reads the fallback and limits it to the listed agents', () => {
+        const saved = { ...process.env };
+        try {
+            delete process.env.CONTENTFORGE_FALLBACK;
+            assert.equal(hedgePolicyFor('DraftAgent'), undefined);
+            Object.assign(process.env, { CONTENTFORGE_FALLBACK: 'anthropic', CONTENTFORGE_HEDGE_PERCENTILE: '0.95', CONTENTFORGE_HEDGE_AGENTS: 'DraftAgent, EditorAgent' });
+            delete process.env.CONTENTFORGE_HEDGE_MIN_DELAY_MS;
+            assert.deepEqual(hedgePolicyFor('EditorAgent'), { fallback: 'anthropic', percentile: 0.95, minDelayMs: 2000 });
+            assert.equal(hedgePolicyFor('BriefAgent'), undefined);
+        } finally {
+            process.env = saved;
+        }
+    });
+});
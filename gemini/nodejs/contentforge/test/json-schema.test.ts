@@ -0,0 +1,133 @@
+import { strict as assert } from 'assert';
+import { describe, it } from 'node:test';
+import { z } from 'zod';
+import { toJsonSchema } from '../src/utils/json-schema';
+import { getStructuredStats, nativeSchema, outputMode, rejectsNative } from '../src/adapters/structured';
+import { ProviderError } from '../src/adapters/errors';
+
+const Review = z.object({
+    score: z.number().int().min(1).max(10),
+    verdict: z.enum(['pass', 'fail']),
+    tags: z.array(z.string()).min(1),
+    note: z.string().optional(),
+});
+
+const Edit = z.discriminatedUnion('op', [
+    z.object({ op: z.literal('replace'), find: z.string(), text: z.string() }),
+    z.object({ op: z.literal('delete'), find: z.string() }),
+]);
+
+describe('toJsonSchema', () => {
+    it('keeps bounds and leaves optional fields out of required in the json dialect', () => {
+        assert.deepEqual(toJsonSchema(Review, 'json'), {
+            type: 'object',
+            properties: {
+                score: { type: 'integer', minimum: 1, maximum: 10 },
+                verdict: { type: 'string', enum: ['pass', 'fail'] },
+                tags: { type: 'array', items: { type: 'string' }, minItems: 1 },
+                note: { type: 'string' },
+            },
+            required: ['score', 'verdict', 'tags'],
+            additionalProperties: false,
+        });
+    });
+
+    it('requires every field and makes optional ones nullable in the strict dialect', () => {
+        const schema = toJsonSchema(Review.extend({ tone: z.enum(['dry', 'warm']).optional() }), 'strict')!;
+        assert.deepEqual(schema.required, ['score', 'verdict', 'tags', 'note', 'tone']);
+        const properties = schema.properties as Record<string, Record<string, unknown>>;
+        assert.deepEqual(properties.score, { type: 'integer' });
+        assert.deepEqual(properties.tags, { type: 'array', items: { type: 'string' } });
+        assert.deepEqual(properties.note, { type: ['string', 'null'] });
+        assert.deepEqual(properties.tone, { type: ['string', 'null'], enum: ['dry', 'warm', null] });
+    });
+
+    it('uses upper-case types and a nullable flag in the gemini dialect', () => {
+        const schema = toJsonSchema(Review, 'gemini')!;
+        const properties = schema.properties as Record<string, Record<string, unknown>>;
+        assert.equal(schema.type, 'OBJECT');
+        assert.equal(schema.additionalProperties, undefined);
+        assert.deepEqual(properties.score, { type: 'INTEGER', minimum: 1, maximum: 10 });
+        assert.deepEqual(properties.note, { type: 'STRING', nullable: true });
+        assert.deepEqual(schema.required, ['score', 'verdict', 'tags']);
+    });
+
+    it('expresses unions and literals where the dialect allows them', () => {
+        const json = toJsonSchema(Edit, 'json')!;
+        const options = json.anyOf as Record<string, any>[];
+        assert.equal(options.length, 2);
+        assert.deepEqual(options[1].properties.op, { type: 'string', const: 'delete' });
+        assert.equal(toJsonSchema(Edit, 'gemini'), undefined);
+        assert.deepEqual((toJsonSchema(z.object({ op: z.literal('keep') }), 'gemini')!.properties as any).op, { type: 'STRING', enum: ['keep'] });
+    });
+
+    it('returns undefined for what a dialect cannot express, and memoizes', () => {
+        const Loose = z.object({ data: z.unknown() });
+        assert.equal(toJsonSchema(Loose, 'strict'), undefined);
+        assert.deepEqual((toJsonSchema(Loose, 'json')!.properties as any).data, {});
+        assert.equal(toJsonSchema(Review, 'strict'), toJsonSchema(Review, 'strict'));
+    });
+});
+
+describe('nativeSchema', () => {
+    const Draft = z.object({ title: z.string(), brief_ref: z.string().optional(), sections: z.array(z.object({ body: z.string(), outline_ref: z.string() })) });
+    const config = { output: { name: 'Draft Agent!', schema: Draft } };
+
+    it('sends the first dialect the schema converts to, without artifact links', () => {
+        const native = nativeSchema('openai', 'gpt-4o', config, ['strict', 'json'])!;
+        assert.equal(native.name, 'Draft_Agent_');
+        assert.equal(native.dialect, 'strict');
+        assert.deepEqual(Object.keys(native.schema.properties as object), ['title', 'sections']);
+        assert.deepEqual(native.schema.required, ['title', 'sections']);
+        assert.deepEqual((native.schema.properties as any).sections.items.required, ['body']);
+
+        const loose = { output: { name: 'Loose', schema: z.object({ data: z.unknown() }) } };
+        assert.equal(nativeSchema('openai', 'gpt-4o', loose, ['strict', 'json'])!.dialect, 'json');
+    });
+
+    it('uses plain JSON mode for models without structured output, or when turned off', () => {
+        assert.equal(nativeSchema('openai', 'gpt-3.5-turbo', config, ['strict']), undefined);
+        assert.equal(nativeSchema('gemini', 'gemini-pro', config, ['gemini']), undefined);
+        assert.equal(nativeSchema('openai', 'gpt-4o', undefined, ['strict']), undefined);
+        process.env.CONTENTFORGE_STRUCTURED_OUTPUT = 'off';
+        try {
+            assert.equal(nativeSchema('openai', 'gpt-4o', config, ['strict']), undefined);
+        } finally {
+            delete process.env.CONTENTFORGE_STRUCTURED_OUTPUT;
+        }
+    });
+
+    it('falls back to plain JSON mode for a model once it rejects a schema', () => {
+        const error = new ProviderError('xai', 'Invalid response_format: json_schema not supported', 'bad_request', 400);
+        assert.equal(rejectsNative('xai', 'grok-test', new ProviderError('xai', 'schema', 'server', 500)), false);
+        assert.equal(rejectsNative('xai', 'grok-test', new ProviderError('xai', 'prompt too long', 'bad_request', 400)), false);
+        assert.ok(nativeSchema('xai', 'grok-test', config, ['strict']));
+        assert.equal(rejectsNative('xai', 'grok-test', error), true);
+        assert.equal(nativeSchema('xai', 'grok-test', config, ['strict']), undefined);
+        assert.deepEqual(getStructuredStats().fallbacks, ['xai:grok-test']);
+    });
+});
+
+describe('outputMode', () => {
+    const config = { output: { name: 'Review', schema: Review } };
+
+    it('names the dialect and fingerprints the schema for cache keys', () => {
+        const strict = outputMode('openai', 'gpt-4o', config, ['strict'])!;
+        const gemini = outputMode('gemini', 'gemini-1.5-pro', config, ['gemini'])!;
+        const plain = outputMode('openai', 'gpt-3.5-turbo', config, ['strict'])!;
+        assert.equal(strict.dialect, 'strict');
+        assert.equal(gemini.dialect, 'gemini');
+        assert.equal(plain.dialect, 'plain');
+        assert.equal(new Set([strict.schema, gemini.schema, plain.schema]).size, 3);
+        assert.deepEqual(outputMode('openai', 'gpt-4o', config, ['strict']), strict);
+        assert.equal(outputMode('openai', 'gpt-4o', undefined, ['strict']), undefined);
+    });
+
+    it('does not count as a structured request', () => {
+        const before = getStructuredStats().requests;
+        outputMode('openai', 'gpt-4o', config, ['strict']);
+        assert.equal(getStructuredStats().requests, before);
+        nativeSchema('openai', 'gpt-4o', config, ['strict']);
+        assert.equal(getStructuredStats().requests, before + 1);
+    });
+});
@@ -0,0 +1,77 @@
+import { strict as assert } from 'assert';
+import { describe, it } from 'node:test';
+import { JsonFieldStream } from '../src/agents/json-stream';
+
+type Seen = { deltas: Record<string, string>; values: Record<string, unknown>; resets: number };
+
+function listen(): { stream: JsonFieldStream; seen: Seen } {
+    const seen: Seen = { deltas: {}, values: {}, resets: 0 };
+    const stream = new JsonFieldStream({
+        onDelta: (field, delta) => { seen.deltas[field] = (seen.deltas[field] || '') + delta; },
+        onValue: (field, value) => { seen.values[field] = value; },
+        onReset: () => { seen.resets++; },
+    });
+    return { stream, seen };
+}
+
+const article = {
+    title: 'Caching "at the edge"',
+    body: '# Intro\n\nTabs\tand unicode: café 🚀, slashes \\ and {braces}, [brackets].',
+    word_count: 12,
+    tags: ['cdn', 'latency, p99', { nested: [1, 2] }],
+    published: true,
+    extra: null,
+};
+const json = JSON.stringify(article, null, 2);
+
+describe('JsonFieldStream', () => {
+    it('reports every top-level field whatever the chunking', () => {
+        for (const size of [1, 2, 3, 7, json.length]) {
+            const { stream, seen } = listen();
+            for (let i = 0; i < json.length; i += size) stream.write(json.slice(i, i + size));
+            assert.deepEqual(seen.values, article, `chunks of ${size}`);
+            assert.equal(seen.deltas.title, article.title);
+            assert.equal(seen.deltas.body, article.body);
+            assert.equal(seen.deltas.word_count, undefined);
+        }
+    });
+
+    it('decodes escapes split across chunks', () => {
+        const { stream, seen } = listen();
+        for (const chunk of ['{"body": "a\\', 'nb \\u00', 'e9 \\"q\\"', '"}']) stream.write(chunk);
+        assert.equal(seen.values.body, 'a\nb é "q"');
+        assert.equal(seen.deltas.body, 'a\nb é "q"');
+    });
+
+    it('streams string deltas before the field is complete', () => {
+        const { stream, seen } = listen();
+        stream.write('{"body": "Hello, wor');
+        assert.equal(seen.deltas.body, 'Hello, wor');
+        assert.equal(seen.values.body, undefined);
+        stream.write('ld"}');
+        assert.equal(seen.values.body, 'Hello, world');
+    });
+
+    it('skips a leading code fence and anything after the object', () => {
+        const { stream, seen } = listen();
+        stream.write('```json\n{"a": 1, "b": "x"}\n```\n{"c": 2}');
+        assert.deepEqual(seen.values, { a: 1, b: 'x' });
+    });
+
+    it('starts over after reset', () => {
+        const { stream, seen } = listen();
+        stream.write('{"title": "First att');
+        stream.reset();
+        seen.deltas = {};
+        stream.write('{"title": "Second"}');
+        assert.equal(seen.resets, 1);
+        assert.equal(seen.deltas.title, 'Second');
+        assert.equal(seen.values.title, 'Second');
+    });
+
+    it('leaves malformed values to the full parse', () => {
+        const { stream, seen } = listen();
+        stream.write('{"score": 8/10, "ok": true}');
+        assert.deepEqual(seen.values, { ok: true });
+    });
+});
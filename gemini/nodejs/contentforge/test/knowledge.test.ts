@@ -0,0 +1,85 @@
+import { strict as assert } from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { describe, it } from 'node:test';
+import { KnowledgeBase } from '../src/store/knowledge';
+import { ResearchPackage } from '../src/types';
+
+function research(parts: Partial<ResearchPackage>): ResearchPackage {
+    return { key_facts: [], key_questions_answered: [], supporting_examples: [], counterarguments: [], suggested_sources: [], ...parts };
+}
+
+function tempDir(): string {
+    return fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-kb-'));
+}
+
+const facts = research({
+    key_facts: [
+        'CDN edge caching cuts page latency for distant users',
+        'Cache invalidation is the hardest part of edge caching',
+        'Sourdough starters need daily feeding',
+    ],
+    counterarguments: ['Edge caching adds cost for dynamic pages'],
+    research_gaps: ['Edge caching benchmarks for 2026'],
+});
+
+describe('KnowledgeBase', () => {
+    it('stores each item once, ignoring case and spacing', () => {
+        const kb = new KnowledgeBase(tempDir());
+        assert.equal(kb.ingest(facts, 'run-1'), 4);
+        assert.equal(kb.ingest(research({ key_facts: ['  cdn EDGE caching cuts page latency   for distant users', ' '] })), 0);
+        assert.equal(kb.size, 4);
+    });
+
+    it('ranks by BM25 and requires shared terms', () => {
+        const kb = new KnowledgeBase(tempDir());
+        kb.ingest(facts);
+        const hits = kb.search('edge caching latency', 10);
+        assert.equal(hits[0].text, 'CDN edge caching cuts page latency for distant users');
+        assert.ok(hits.every((hit, i) => i === 0 || hit.score <= hits[i - 1].score));
+        assert.ok(!hits.some(hit => hit.text.startsWith('Sourdough')));
+        assert.deepEqual(kb.search('edge caching', 1).map(hit => hit.kind), ['key_facts']);
+        // One shared term is not enough by default, but a one-term query needs only one
+        assert.deepEqual(kb.search('sourdough bread', 10), []);
+        assert.equal(kb.search('sourdough', 10).length, 1);
+        assert.equal(kb.search('sourdough bread', 10, 1).length, 1);
+    });
+
+    it('reloads items from its file in another process', () => {
+        const dir = tempDir();
+        new KnowledgeBase(dir).ingest(facts);
+        const kb = new KnowledgeBase(dir);
+        assert.equal(kb.size, 4);
+        assert.equal(kb.search('cache invalidation', 1)[0].text, 'Cache invalidation is the hardest part of edge caching');
+        assert.equal(kb.ingest(facts), 0);
+    });
+
+    it('rebuilds a missing store from research artifacts', () => {
+        const dir = tempDir();
+        fs.mkdirSync(path.join(dir, 'artifacts', 'research'), { recursive: true });
+        fs.writeFileSync(path.join(dir, 'artifacts', 'research', 'a.json'), JSON.stringify(facts));
+        fs.writeFileSync(path.join(dir, 'artifacts', 'research', 'broken.json'), '{');
+        assert.equal(new KnowledgeBase(dir).size, 4);
+    });
+
+    it('answers the same from a snapshot as from a full reindex', () => {
+        const dir = tempDir();
+        const words = ['cache', 'edge', 'latency', 'queue', 'shard', 'index', 'replica', 'vector', 'token', 'stream', 'batch', 'cold'];
+        const items = Array.from({ length: 5200 }, (_, i) =>
+            `item${i} ${words[i % 12]} ${words[(i * 7) % 12]} ${words[(i * 5 + 3) % 12]} group${i % 97}`);
+        new KnowledgeBase(dir).ingest(research({ key_facts: items }));
+        assert.ok(fs.existsSync(path.join(dir, 'research-kb.index')));
+
+        const query = 'edge latency group42';
+        const restored = new KnowledgeBase(dir).search(query, 5);
+        fs.unlinkSync(path.join(dir, 'research-kb.index'));
+        const reindexed = new KnowledgeBase(dir).search(query, 5);
+        assert.equal(restored.length, 5);
+        assert.deepEqual(restored, reindexed);
+
+        // A snapshot that no longer matches the store is ignored
+        fs.writeFileSync(path.join(dir, 'research-kb.index'), Buffer.from([1, 2, 3]));
+        assert.deepEqual(new KnowledgeBase(dir).search(query, 5), reindexed);
+    });
+});
@@ -0,0 +1,69 @@
+import { strict as assert } from 'assert';
+import { describe, it } from 'node:test';
+import { cleanMarkdown, formatSection, frontMatter, headingKey, splitSections } from '../src/utils/markdown';
+
+describe('splitSections', () => {
+    const body = '# Title\n\nHook.\n\n## One\n\nFirst.\n\n## Two\nSecond.\n\nMore.\n\n## Empty';
+
+    it('splits on "## " headings with the text before them as the preamble', () => {
+        assert.deepEqual(splitSections(body), {
+            preamble: '# Title\n\nHook.',
+            sections: [
+                { heading: 'One', body: 'First.' },
+                { heading: 'Two', body: 'Second.\n\nMore.' },
+                { heading: 'Empty', body: '' },
+            ],
+            tail: '',
+        });
+    });
+
+    it('returns whole trailing paragraphs matching the tail separately', () => {
+        const cta = 'Try it today.\n\nShare your results.';
+        const { sections, tail } = splitSections(`# T\n\n## One\n\nFirst.\n\n## Last\n\nBody.\n\n${cta}\n`, cta);
+        assert.equal(tail, cta);
+        assert.deepEqual(sections[1], { heading: 'Last', body: 'Body.' });
+        // Part of a paragraph is not the tail
+        assert.equal(splitSections('## Last\n\nBody. Share your results.', 'Share your results.').tail, '');
+    });
+
+    it('round-trips through formatSection', () => {
+        const { preamble, sections } = splitSections(body);
+        assert.equal([preamble, ...sections.map(formatSection)].join('\n\n'), body.replace('## Two\n', '## Two\n\n'));
+    });
+});
+
+describe('headingKey', () => {
+    it('ignores case, numbering and punctuation', () => {
+        assert.equal(headingKey('2. Why It Matters!'), headingKey('why it matters'));
+        assert.equal(headingKey('## 1) Café—Costs'), 'café costs');
+        assert.notEqual(headingKey('Costs'), headingKey('Benefits'));
+    });
+});
+
+describe('cleanMarkdown', () => {
+    it('makes the title the only H1 and starts body headings at H2', () => {
+        const out = cleanMarkdown('# Draft title\n\n### Deep start\nText\n##### Skipped levels\nMore', 'Final Title');
+        assert.equal(out, '# Final Title\n\n## Deep start\n\nText\n\n### Skipped levels\n\nMore\n');
+    });
+
+    it('normalizes bullets, trailing spaces and blank lines', () => {
+        const out = cleanMarkdown('Intro   \n\n\n\n* one\n+ two\n  * nested\r\n##No space', 'T');
+        assert.equal(out, '# T\n\nIntro\n\n- one\n- two\n  - nested\n\n## No space\n');
+    });
+
+    it('leaves fenced code untouched', () => {
+        const code = '```md\n# not a heading\n* not a bullet   \n```';
+        assert.equal(cleanMarkdown(`## Code\n\n${code}`, 'T'), `# T\n\n## Code\n\n${code}\n`);
+    });
+
+    it('keeps "C#" in a heading', () => {
+        assert.equal(cleanMarkdown('## Learning C#', 'T'), '# T\n\n## Learning C#\n');
+    });
+});
+
+describe('frontMatter', () => {
+    it('writes strings as JSON and lists inline', () => {
+        assert.equal(frontMatter({ title: 'Say "hi": now', words: 3, tags: ['a', 'b c'] }),
+            '---\ntitle: "Say \\"hi\\": now"\nwords: 3\ntags: ["a", "b c"]\n---\n\n');
+    });
+});
@@ -0,0 +1,70 @@
+import { strict as assert } from 'assert';
+import { describe, it } from 'node:test';
+import { PatchError, applyEdits } from '../src/utils/patch';
+
+const body = [
+    '# Edge Caching',
+    '',
+    'Caching moves content closer to readers.',
+    '',
+    '## Why It Matters',
+    '',
+    'Latency drops. Costs drop.',
+    '',
+    '## 2. How to Start',
+    '',
+    'Pick a CDN.',
+].join('\n');
+
+describe('applyEdits', () => {
+    it('replaces spans and inserts after headings', () => {
+        const out = applyEdits(body, [
+            { op: 'replace', find: 'Latency drops.', replace: 'Latency drops sharply.' },
+            { op: 'insert_after_heading', heading: 'how to start', text: 'First, measure.\n' },
+            { op: 'replace', find: 'Pick a CDN.', replace: '' },
+        ]);
+        assert.equal(out, body
+            .replace('Latency drops.', 'Latency drops sharply.')
+            .replace('## 2. How to Start', '## 2. How to Start\n\nFirst, measure.')
+            .replace('Pick a CDN.', ''));
+    });
+
+    it('resolves every edit against the original body, whatever the order', () => {
+        const edits = [
+            { op: 'replace' as const, find: 'Costs drop.', replace: 'Latency drops.' },
+            { op: 'replace' as const, find: 'Latency drops.', replace: 'Faster.' },
+        ];
+        const expected = body.replace('Latency drops. Costs drop.', 'Faster. Latency drops.');
+        assert.equal(applyEdits(body, edits), expected);
+        assert.equal(applyEdits(body, [...edits].reverse()), expected);
+    });
+
+    it('puts an insert ahead of a replacement starting at the same point', () => {
+        const out = applyEdits('## A\nold', [
+            { op: 'replace', find: '\nold', replace: '\nnew' },
+            { op: 'insert_after_heading', heading: 'A', text: 'added' },
+        ]);
+        assert.equal(out, '## A\n\nadded\nnew');
+    });
+
+    it('rejects missing and ambiguous anchors', () => {
+        assert.throws(() => applyEdits(body, [{ op: 'replace', find: 'nowhere', replace: 'x' }]), /Edit 1: text not found/);
+        assert.throws(() => applyEdits(body, [
+            { op: 'replace', find: 'Caching moves', replace: 'x' },
+            { op: 'replace', find: 'drop', replace: 'x' },
+        ]), (e: unknown) => e instanceof PatchError && e.index === 1 && /ambiguous \(2 matches\)/.test(e.message));
+        assert.throws(() => applyEdits(body, [{ op: 'insert_after_heading', heading: 'Conclusion', text: 'x' }]), /heading not found/);
+        assert.throws(() => applyEdits(`${body}\n\n## Why it matters`, [{ op: 'insert_after_heading', heading: 'Why It Matters', text: 'x' }]), /heading is ambiguous/);
+    });
+
+    it('rejects overlapping edits', () => {
+        assert.throws(() => applyEdits(body, [
+            { op: 'replace', find: 'Latency drops. Costs', replace: 'x' },
+            { op: 'replace', find: 'Costs drop.', replace: 'y' },
+        ]), (e: unknown) => e instanceof PatchError && e.index === 1 && /overlaps edit 1/.test(e.message));
+    });
+
+    it('returns the body unchanged without edits', () => {
+        assert.equal(applyEdits(body, []), body);
+    });
+});
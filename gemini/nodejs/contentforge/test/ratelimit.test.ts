@@ -0,0 +1,119 @@
+import { strict as assert } from 'assert';
+import { describe, it } from 'node:test';
+import { RateLimiter } from '../src/adapters/ratelimit';
+import { ProviderError, isRetryable, retryDelayFrom } from '../src/adapters/errors';
+
+const delay = (ms: number) => new Promise(res => setTimeout(res, ms));
+
+function limiter(options: { rpm?: number; tpm?: number; maxConcurrency?: number } = {}): RateLimiter {
+    return new RateLimiter({ rpm: Infinity, tpm: Infinity, maxConcurrency: 8, ...options });
+}
+
+const throttled = (retryAfterMs?: number) => new ProviderError('openai', 'slow down', 'rate_limit', 429, retryAfterMs);
+
+// Starts a call and resolves with the time it began running
+function startedAt(l: RateLimiter, tokens: number, actual?: number): Promise<number> {
+    return l.run(tokens, async () => Date.now(), actual === undefined ? undefined : () => actual);
+}
+
+describe('RateLimiter', () => {
+    it('runs at most the concurrency limit at once, in FIFO order', async () => {
+        const l = limiter({ maxConcurrency: 2 });
+        let active = 0;
+        let peak = 0;
+        const order: number[] = [];
+        await Promise.all([0, 1, 2, 3, 4].map(i => l.run(1, async () => {
+            order.push(i);
+            peak = Math.max(peak, ++active);
+            await delay(10);
+            active--;
+        })));
+        assert.equal(peak, 2);
+        assert.deepEqual(order, [0, 1, 2, 3, 4]);
+        assert.equal(l.stats.calls, 5);
+        assert.equal(l.stats.throttled, 3);
+    });
+
+    it('halves the concurrency on throttling and grows it back on success', async () => {
+        const l = limiter({ maxConcurrency: 8 });
+        for (const expected of [4, 2, 1, 1]) {
+            await assert.rejects(l.run(1, async () => { throw throttled(); }));
+            assert.equal(l.concurrency, expected);
+        }
+        assert.equal(l.stats.rateLimited, 4);
+        // +1/limit per success: 1 → 2 → 2.5 → 2.9 → 3.24
+        const grown = [];
+        for (let i = 0; i < 4; i++) {
+            await l.run(1, async () => undefined);
+            grown.push(l.concurrency);
+        }
+        assert.deepEqual(grown, [2, 2, 2, 3]);
+    });
+
+    it('halves on server errors but not on client errors', async () => {
+        const l = limiter({ maxConcurrency: 8 });
+        await assert.rejects(l.run(1, async () => { throw new ProviderError('openai', 'bad', 'bad_request', 400); }));
+        await assert.rejects(l.run(1, async () => { throw new Error('not a provider error'); }));
+        assert.equal(l.concurrency, 8);
+        await assert.rejects(l.run(1, async () => { throw new ProviderError('openai', 'oops', 'server', 500); }));
+        assert.equal(l.concurrency, 4);
+        assert.equal(l.stats.serverErrors, 1);
+    });
+
+    it('holds every call back until the server retry hint has passed', async () => {
+        const l = limiter();
+        const failed = Date.now();
+        await assert.rejects(l.run(1, async () => { throw throttled(60); }));
+        assert.ok(await startedAt(l, 1) - failed >= 55);
+    });
+
+    it('waits for the token bucket to refill', async () => {
+        // 60000 tokens per minute: one token per millisecond, starting full
+        const l = limiter({ tpm: 60_000 });
+        const start = Date.now();
+        await startedAt(l, 60_000);
+        assert.ok(await startedAt(l, 50) - start >= 45);
+        assert.ok(l.stats.waitedMs >= 45);
+    });
+
+    it('refunds tokens a call estimated but did not use', async () => {
+        const l = limiter({ tpm: 60_000 });
+        const start = Date.now();
+        await startedAt(l, 60_000, 10);
+        assert.ok(await startedAt(l, 1000) - start < 40);
+    });
+
+    it('limits requests per minute', async () => {
+        // 600 requests per minute: a burst of 600, then one every 100ms
+        const l = limiter({ rpm: 600, maxConcurrency: 1000 });
+        const start = Date.now();
+        const started = await Promise.all(Array.from({ length: 603 }, () => startedAt(l, 1)));
+        assert.ok(Math.max(...started) - start >= 200);
+    });
+});
+
+describe('ProviderError', () => {
+    it('classifies HTTP statuses', async () => {
+        const kinds = await Promise.all([429, 529, 503, 504, 500, 401, 400].map(async status =>
+            (await ProviderError.fromResponse('openai', new Response('', { status }))).kind));
+        assert.deepEqual(kinds, ['rate_limit', 'overloaded', 'overloaded', 'timeout', 'server', 'auth', 'bad_request']);
+    });
+
+    it('retries throttling, server and connection failures only', () => {
+        assert.equal(isRetryable(throttled()), true);
+        assert.equal(isRetryable(new ProviderError('openai', 'down', 'server', 502)), true);
+        assert.equal(isRetryable(new ProviderError('openai', 'key', 'auth', 401)), false);
+        assert.equal(isRetryable(Object.assign(new Error('reset'), { code: 'ECONNRESET' })), true);
+        assert.equal(isRetryable(new Error('bug')), false);
+    });
+});
+
+describe('retryDelayFrom', () => {
+    it('reads seconds, milliseconds and reset durations', () => {
+        assert.equal(retryDelayFrom(new Headers({ 'retry-after': '2' })), 2000);
+        assert.equal(retryDelayFrom(new Headers({ 'retry-after-ms': '250', 'retry-after': '2' })), 250);
+        assert.equal(retryDelayFrom(new Headers({ 'x-ratelimit-reset-requests': '1m30s' })), 90_000);
+        assert.equal(retryDelayFrom(new Headers({ 'x-ratelimit-reset-tokens': '250ms' })), 250);
+        assert.equal(retryDelayFrom(new Headers()), undefined);
+    });
+});
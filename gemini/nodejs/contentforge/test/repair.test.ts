@@ -0,0 +1,142 @@
+import { strict as assert } from 'assert';
+import { describe, it } from 'node:test';
+import { z } from 'zod';
+import { JsonRepairError, closeTruncated, coerce, decodeJson, extractLargestObject, lenient, setPath } from '../src/agents/repair';
+
+const Verdict = z.object({
+    title: z.string(),
+    score: z.number().int().min(1).max(10),
+    passed: z.boolean(),
+    tone: z.enum(['formal', 'casual']),
+    tags: z.array(z.string()),
+    note: z.string().optional(),
+});
+
+describe('lenient', () => {
+    it('rewrites near-JSON into JSON', () => {
+        const text = "{title: 'It\\'s fine', // comment\n /* block */ passed: True, extra: None, tags: [“a”, 'b',],}";
+        assert.deepEqual(JSON.parse(lenient(text)), { title: "It's fine", passed: true, extra: null, tags: ['a', 'b'] });
+    });
+
+    it('escapes raw control characters inside strings only', () => {
+        assert.deepEqual(JSON.parse(lenient('{"body": "line one\nline\ttwo"}')), { body: 'line one\nline\ttwo' });
+    });
+
+    it('leaves apostrophes in prose alone', () => {
+        assert.equal(JSON.parse(lenient('{"body": "Here\'s why"}')).body, "Here's why");
+    });
+});
+
+describe('extractLargestObject', () => {
+    it('finds the JSON in surrounding prose', () => {
+        const text = 'Sure! {"a": 1} Here is the article: {"title": "x", "nested": {"b": "}"}} Hope it helps.';
+        assert.equal(extractLargestObject(text), '{"title": "x", "nested": {"b": "}"}}');
+        assert.equal(extractLargestObject('no object'), undefined);
+    });
+});
+
+describe('closeTruncated', () => {
+    it('closes a cut-off string, array and object', () => {
+        assert.deepEqual(JSON.parse(closeTruncated('{"title": "Edge", "tags": ["cdn", "lat')!), { title: 'Edge', tags: ['cdn', 'lat'] });
+    });
+
+    it('drops dangling keys, commas and partial literals', () => {
+        assert.deepEqual(JSON.parse(closeTruncated('{"a": 1, "b": tr')!), { a: 1 });
+        assert.deepEqual(JSON.parse(closeTruncated('{"a": 1, "b":')!), { a: 1 });
+        assert.deepEqual(JSON.parse(closeTruncated('{"a": [1, 2.')!), { a: [1] });
+        assert.deepEqual(JSON.parse(closeTruncated('{"a": 1, "key')!), { a: 1 });
+    });
+
+    it('leaves complete JSON alone', () => {
+        assert.equal(closeTruncated('{"a": 1}'), undefined);
+        assert.equal(closeTruncated('no object'), undefined);
+    });
+});
+
+describe('coerce', () => {
+    it('nudges values towards the schema', () => {
+        const value = coerce({ title: 42, score: '8/10', passed: 'yes', tone: 'Formal ', tags: 'solo', note: null }, Verdict);
+        assert.deepEqual(value, { title: '42', score: 8, passed: true, tone: 'formal', tags: ['solo'] });
+    });
+
+    it('clamps and rounds numbers to the bounds', () => {
+        assert.equal(coerce('11', Verdict.shape.score), 10);
+        assert.equal(coerce(0, Verdict.shape.score), 1);
+        assert.equal(coerce(7.6, Verdict.shape.score), 8);
+        assert.equal(coerce('high', Verdict.shape.score), 'high');
+    });
+});
+
+describe('decodeJson', () => {
+    const valid = { title: 'Edge', score: 8, passed: true, tone: 'casual', tags: ['cdn'] };
+
+    it('accepts valid JSON without repairs, fenced or not', () => {
+        assert.deepEqual(decodeJson(JSON.stringify(valid), Verdict), { value: valid, repairs: [] });
+        assert.deepEqual(decodeJson('```json\n' + JSON.stringify(valid) + '\n```', Verdict).repairs, []);
+    });
+
+    it('keeps code fences inside string values', () => {
+        const withCode = { ...valid, note: 'Run:\n```bash\nnpm test\n```\nthen ```json``` output' };
+        assert.deepEqual(decodeJson(JSON.stringify(withCode), Verdict), { value: withCode, repairs: [] });
+        assert.deepEqual(decodeJson('```json\n' + JSON.stringify(withCode, null, 2) + '\n```\n', Verdict), { value: withCode, repairs: [] });
+        assert.equal(decodeJson('Sure:\n```json\n' + JSON.stringify(withCode) + '\n```', Verdict).value.note, withCode.note);
+    });
+
+    it('drops null optional fields sent by strict structured output', () => {
+        assert.deepEqual(decodeJson(JSON.stringify({ ...valid, note: null }), Verdict), { value: valid, repairs: [] });
+    });
+
+    it('reports the repairs it needed', () => {
+        assert.deepEqual(decodeJson("{title: 'Edge', score: '8', passed: true, tone: 'casual', tags: ['cdn'],}", Verdict).repairs, ['lenient', 'coerce']);
+        assert.deepEqual(decodeJson(`Here you go: ${JSON.stringify(valid)} Enjoy!`, Verdict).repairs, ['extract']);
+        const truncated = JSON.stringify({ ...valid, tags: ['cdn', 'latency'] }).slice(0, -5);
+        const closed = decodeJson(truncated, Verdict);
+        assert.deepEqual(closed.repairs, ['close']);
+        assert.deepEqual(closed.value.tags, ['cdn', 'laten']);
+    });
+
+    it('throws with the best partial value and the fields still failing', () => {
+        try {
+            decodeJson('{"title": "Edge", "score": "high", "passed": true, "tone": "casual"}', Verdict);
+            assert.fail('expected a JsonRepairError');
+        } catch (e) {
+            assert.ok(e instanceof JsonRepairError);
+            assert.deepEqual(e.issues.map(issue => issue.path).sort(), ['score', 'tags']);
+            assert.equal((e.partial as { title: string }).title, 'Edge');
+        }
+    });
+
+    it('throws when there is no JSON at all', () => {
+        assert.throws(() => decodeJson('I cannot help with that.', Verdict), JsonRepairError);
+    });
+});
+
+describe('setPath', () => {
+    const Scored = z.object({
+        scores: z.object({ clarity: z.number() }),
+        edits: z.array(z.object({ find: z.string() })),
+    });
+
+    it('writes paths the schema declares, creating objects on the way', () => {
+        const target: Record<string, unknown> = { edits: [{ find: 'a' }] };
+        assert.equal(setPath(target, 'scores.clarity', 7, Scored), true);
+        assert.equal(setPath(target, 'edits.0.find', 'b', Scored), true);
+        assert.deepEqual(target, { edits: [{ find: 'b' }], scores: { clarity: 7 } });
+    });
+
+    it('drops paths outside the schema', () => {
+        const target: Record<string, unknown> = {};
+        assert.equal(setPath(target, 'scores.tone', 'dry', Scored), false);
+        assert.equal(setPath(target, 'edits.first.find', 'b', Scored), false);
+        assert.deepEqual(target, {});
+    });
+
+    it('never writes through prototype keys', () => {
+        const Open = z.object({ meta: z.record(z.unknown()) });
+        for (const path of ['__proto__.polluted', 'meta.__proto__.polluted', 'meta.constructor.prototype.polluted']) {
+            assert.equal(setPath({ meta: {} }, path, true, Open), false);
+        }
+        assert.equal(setPath({}, '__proto__.polluted', true, z.record(z.unknown())), false);
+        assert.equal(({} as Record<string, unknown>).polluted, undefined);
+    });
+});
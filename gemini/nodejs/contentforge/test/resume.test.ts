@@ -0,0 +1,95 @@
+import { strict as assert } from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { after, before, describe, it } from 'node:test';
+import { MockProviderServer } from '../src/bench/server';
+import { configureCache } from '../src/adapters/cache';
+import { Orchestrator, OrchestratorOptions, RunManifest } from '../src/orchestrator';
+
+// Runs against the local stand-in for the provider APIs, in a temporary working directory
+const server = new MockProviderServer({ latencyMs: 1, jitter: 0, tokensPerSecond: 1_000_000, editorRejections: 0, articleWords: 300 });
+const options: OrchestratorOptions = { quiet: true, reuse: false, speculate: 'off', publishMode: 'local' };
+const cwd = process.cwd();
+
+function manifestOf(runId: string): RunManifest {
+    return Orchestrator.loadManifest(runId)!;
+}
+
+function saveManifest(manifest: RunManifest) {
+    fs.writeFileSync(path.join('output', manifest.run_id, 'manifest.json'), JSON.stringify(manifest, null, 2));
+}
+
+async function resume(runId: string) {
+    const manifest = manifestOf(runId);
+    const requests = server.stats.requests;
+    const result = await new Orchestrator({ ...manifest.options, quiet: true, runId }).run(manifest.topic!);
+    const restored = manifestOf(runId).stages.filter(c => c.restored).map(c => c.stage);
+    return { result, restored, calls: server.stats.requests - requests };
+}
+
+describe('checkpoints and resume', () => {
+    before(async () => {
+        process.chdir(fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-resume-')));
+        const origin = await server.start();
+        Object.assign(process.env, MockProviderServer.baseUrls(origin), {
+            OPENAI_API_KEY: 'test', DEFAULT_PROVIDER: 'openai', CONTENTFORGE_RESEARCH_KB: 'off', CONTENTFORGE_METRICS_JSONL: 'off',
+        });
+        configureCache({ mode: 'off' });
+    });
+
+    after(async () => {
+        await server.stop();
+        process.chdir(cwd);
+    });
+
+    it('records every stage of a run in its manifest', async () => {
+        const result = await new Orchestrator(options).run('Checkpointed topic');
+        assert.equal(result.status, 'published');
+        const manifest = manifestOf(result.run_id);
+        assert.equal(manifest.status, 'published');
+        assert.equal(manifest.options?.publishMode, 'local');
+        assert.deepEqual(manifest.stages.map(c => c.stage), ['1_brief', '2_research', '3_outline', '4_draft_v0', '4_edit_attempt_0', '5_published']);
+        assert.ok(manifest.stages.every(c => c.status === 'done' && c.ref && !c.restored));
+    });
+
+    it('restores a finished run without calling a provider', async () => {
+        const first = await new Orchestrator(options).run('Finished topic');
+        const { result, restored, calls } = await resume(first.run_id);
+        assert.equal(calls, 0);
+        assert.equal(result.status, 'published');
+        assert.equal(result.file, first.file);
+        assert.deepEqual(restored, manifestOf(first.run_id).stages.map(c => c.stage));
+    });
+
+    it('reruns a failed stage and everything after it', async () => {
+        const first = await new Orchestrator(options).run('Interrupted topic');
+        const manifest = manifestOf(first.run_id);
+        const outline = manifest.stages.findIndex(c => c.stage === '3_outline');
+        manifest.stages = manifest.stages.slice(0, outline + 1);
+        manifest.stages[outline] = { ...manifest.stages[outline], status: 'failed', ref: undefined, error: 'timeout' };
+        manifest.status = 'failed';
+        saveManifest(manifest);
+
+        const { result, restored, calls } = await resume(first.run_id);
+        assert.equal(result.status, 'published');
+        assert.deepEqual(restored, ['1_brief', '2_research']);
+        assert.ok(calls > 0);
+        assert.equal(manifestOf(first.run_id).stages.find(c => c.stage === '3_outline')?.status, 'done');
+    });
+
+    it('reruns a stage whose artifact is missing or whose inputs changed', async () => {
+        const first = await new Orchestrator(options).run('Tampered topic');
+        const manifest = manifestOf(first.run_id);
+        const research = manifest.stages.find(c => c.stage === '2_research')!;
+        fs.rmSync(path.join('output', 'artifacts', 'research', `${research.ref}.json`));
+        const draft = manifest.stages.find(c => c.stage === '4_draft_v0')!;
+        draft.inputs_hash = 'changed';
+        saveManifest(manifest);
+
+        const { restored } = await resume(first.run_id);
+        assert.ok(restored.includes('1_brief'));
+        assert.ok(!restored.includes('2_research'));
+        assert.ok(!restored.includes('4_draft_v0'));
+    });
+});
@@ -0,0 +1,100 @@
+import { strict as assert } from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { describe, it } from 'node:test';
+import { ArtifactStore } from '../src/store/artifacts';
+import { TopicIndex, briefText, signature, similarity } from '../src/store/similarity';
+import { ContentBrief } from '../src/types';
+
+function brief(topic: string): ContentBrief {
+    return {
+        topic,
+        working_title: topic,
+        target_audience: 'Engineers',
+        purpose: 'Explain the trade-offs',
+        angle: 'Practical',
+        content_type: 'Blog Post',
+        tone: ['clear'],
+        key_points: ['What it is', 'When to use it', 'Costs', 'Pitfalls'],
+        what_to_avoid: 'Hype',
+        estimated_word_count: 1200,
+        success_criteria: ['Reader can decide'],
+    };
+}
+
+describe('signature and similarity', () => {
+    it('scores identical texts 1 and unrelated texts near 0', () => {
+        const text = 'Edge caching strategies for global web applications';
+        assert.equal(similarity(signature(text), signature(text)), 1);
+        assert.ok(similarity(signature(text), signature('Sourdough baking schedules for busy parents')) < 0.1);
+    });
+
+    it('ranks a near-duplicate above a related but different topic', () => {
+        const base = signature('Edge caching strategies for global web applications');
+        const near = similarity(base, signature('Edge caching strategies for global web apps'));
+        const related = similarity(base, signature('Database caching strategies for backend services'));
+        assert.ok(near > related, `${near} <= ${related}`);
+        assert.ok(near > 0.5);
+    });
+
+    it('is stable across calls and empty without words', () => {
+        assert.deepEqual(signature('Vector search'), signature('Vector search'));
+        assert.equal(signature('Vector search').length, 64);
+        assert.deepEqual(signature('  ...  '), []);
+        assert.equal(similarity([], []), 0);
+    });
+
+    it('reads the topic, title, purpose, angle and key points of a brief', () => {
+        const text = briefText(brief('Edge caching'));
+        for (const part of ['Edge caching', 'Explain the trade-offs', 'Practical', 'Pitfalls']) assert.ok(text.includes(part));
+        assert.ok(!text.includes('Engineers'));
+    });
+});
+
+describe('TopicIndex', () => {
+    function indexIn(dir: string): TopicIndex {
+        return new TopicIndex(new ArtifactStore(path.join(dir, 'artifacts')), path.join(dir, 'topic-index.jsonl'));
+    }
+    const ref = (c: string) => c.repeat(64);
+
+    it('finds the nearest earlier run, skipping the current one and runs without research', () => {
+        const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-topics-'));
+        const index = indexIn(dir);
+        index.add('run-1', 'Edge caching strategies for web apps', ref('a'), brief('Edge caching strategies for web apps'), ref('b'));
+        index.add('run-2', 'Sourdough baking for beginners', ref('c'), brief('Sourdough baking for beginners'));
+        index.add('run-3', 'Edge caching strategies for web applications', ref('d'), brief('Edge caching strategies for web applications'));
+
+        const match = index.nearest('topic', 'Edge caching strategies for web applications', 'run-3');
+        assert.equal(match?.entry.run_id, 'run-1');
+        assert.notEqual(index.nearest('topic', 'Sourdough baking for beginners', 'none', true)?.entry.run_id, 'run-2');
+        assert.equal(index.nearest('brief', briefText(brief('Sourdough baking for beginners')), 'none')?.entry.run_id, 'run-2');
+    });
+
+    it('reloads entries from its file, keeping the latest line per run', () => {
+        const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-topics-'));
+        const first = indexIn(dir);
+        first.add('run-1', 'Old topic about gardening', ref('a'), brief('Old topic about gardening'));
+        first.add('run-1', 'Kubernetes autoscaling', ref('a'), brief('Kubernetes autoscaling'), ref('b'));
+        fs.appendFileSync(path.join(dir, 'topic-index.jsonl'), '{"run_id": "cut sho');
+
+        const match = indexIn(dir).nearest('topic', 'Kubernetes autoscaling', 'none');
+        assert.equal(match?.similarity, 1);
+        assert.equal(match?.entry.research_ref, ref('b'));
+    });
+
+    it('rebuilds a missing index from run manifests', () => {
+        const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'contentforge-topics-'));
+        const store = new ArtifactStore(path.join(dir, 'artifacts'));
+        const briefRef = store.put('brief', brief('Serverless cold starts'));
+        fs.mkdirSync(path.join(dir, 'run-9'));
+        fs.writeFileSync(path.join(dir, 'run-9', 'manifest.json'), JSON.stringify({
+            run_id: 'run-9',
+            topic: 'Serverless cold starts',
+            stages: [{ stage: '1_brief', status: 'done', ref: briefRef }],
+        }));
+        const match = new TopicIndex(store, path.join(dir, 'topic-index.jsonl')).nearest('topic', 'Serverless cold starts', 'none');
+        assert.equal(match?.entry.run_id, 'run-9');
+        assert.equal(match?.entry.brief_ref, briefRef);
+    });
+});